@@ -0,0 +1,7 @@
+"""
+Shared Python helpers for the beer_analysis dbt project.
+
+The dbt Python models in models/analysis/python import from this package.
+On Snowflake the package is zipped and uploaded to a stage, then attached to
+the Python models through the `imports` config in dbt_project.yml.
+"""
@@ -0,0 +1,108 @@
+"""
+One-way ANOVA from sufficient statistics.
+
+Both the classic F-test and Welch's ANOVA only need, per group, the count, the
+sum and the sum of squares of the observations. These can be computed inside
+the warehouse with a GROUP BY, so testing seasonality (12 monthly groups) needs
+12 rows per series instead of every individual rating.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def _group_moments(counts, sums, sums_sq):
+    counts = np.asarray(counts, dtype='float64')
+    sums = np.asarray(sums, dtype='float64')
+    sums_sq = np.asarray(sums_sq, dtype='float64')
+    keep = counts > 0
+    counts, sums, sums_sq = counts[keep], sums[keep], sums_sq[keep]
+    means = sums / counts
+    # Within-group sum of squared deviations: Σx² - (Σx)²/n
+    within_ss = np.maximum(sums_sq - sums * means, 0.0)
+    return counts, means, within_ss
+
+
+def one_way_anova(counts, sums, sums_sq):
+    """
+    Classic one-way ANOVA (same result as scipy.stats.f_oneway on the raw groups).
+
+    Returns f_statistic, p_value, df_between, df_within and eta_squared
+    (share of total variance explained by group membership).
+    """
+    counts, means, within_ss = _group_moments(counts, sums, sums_sq)
+    k, n = len(counts), counts.sum()
+    if k < 2 or n <= k:
+        return {'f_statistic': np.nan, 'p_value': np.nan, 'df_between': k - 1,
+                'df_within': n - k, 'eta_squared': np.nan}
+
+    grand_mean = (counts * means).sum() / n
+    ss_between = (counts * (means - grand_mean) ** 2).sum()
+    ss_within = within_ss.sum()
+    df_between, df_within = k - 1, n - k
+
+    f_statistic = (ss_between / df_between) / (ss_within / df_within)
+    return {
+        'f_statistic': f_statistic,
+        'p_value': stats.f.sf(f_statistic, df_between, df_within),
+        'df_between': df_between,
+        'df_within': df_within,
+        'eta_squared': ss_between / (ss_between + ss_within),
+    }
+
+
+def welch_anova(counts, sums, sums_sq):
+    """
+    Welch's one-way ANOVA, which does not assume equal variances across groups.
+
+    Groups with fewer than 2 observations or zero variance are left out.
+    Returns f_statistic, p_value, df_between and df_within (Welch-adjusted).
+    """
+    counts, means, within_ss = _group_moments(counts, sums, sums_sq)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variances = within_ss / (counts - 1)
+    keep = (counts > 1) & (variances > 0)
+    counts, means, variances = counts[keep], means[keep], variances[keep]
+    k = len(counts)
+    if k < 2:
+        return {'f_statistic': np.nan, 'p_value': np.nan, 'df_between': k - 1, 'df_within': np.nan}
+
+    weights = counts / variances
+    weighted_mean = (weights * means).sum() / weights.sum()
+    between = (weights * (means - weighted_mean) ** 2).sum() / (k - 1)
+    correction = ((1 - weights / weights.sum()) ** 2 / (counts - 1)).sum()
+
+    f_statistic = between / (1 + 2 * (k - 2) / (k ** 2 - 1) * correction)
+    df_within = (k ** 2 - 1) / (3 * correction)
+    return {
+        'f_statistic': f_statistic,
+        'p_value': stats.f.sf(f_statistic, k - 1, df_within),
+        'df_between': k - 1,
+        'df_within': df_within,
+    }
+
+
+def anova_by_group(df, group_col, count_col='N', sum_col='RATING_SUM', sum_sq_col='RATING_SUM_SQ'):
+    """
+    Classic and Welch ANOVA for every series in a long table of group moments.
+
+    df has one row per (series, group), e.g. (beer_style, month); `group_col`
+    names the series column. Returns one row per series.
+    """
+    results = []
+    for key, rows in df.groupby(group_col, sort=True):
+        classic = one_way_anova(rows[count_col], rows[sum_col], rows[sum_sq_col])
+        welch = welch_anova(rows[count_col], rows[sum_col], rows[sum_sq_col])
+        results.append({
+            group_col: key,
+            'total_ratings': int(rows[count_col].sum()),
+            'groups': int((rows[count_col] > 0).sum()),
+            'f_statistic': classic['f_statistic'],
+            'p_value': classic['p_value'],
+            'eta_squared': classic['eta_squared'],
+            'welch_f_statistic': welch['f_statistic'],
+            'welch_p_value': welch['p_value'],
+            'welch_df_within': welch['df_within'],
+        })
+    return pd.DataFrame(results)
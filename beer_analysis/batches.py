@@ -0,0 +1,69 @@
+"""
+Batch iteration over dbt relations.
+
+`dbt.ref(...)` returns a Snowpark DataFrame on Snowflake. Snowpark can stream a
+result set as a sequence of pandas DataFrames with `to_pandas_batches()`, so the
+Python models never need to hold a whole table in driver memory.
+
+`iter_arrow_batches` streams pyarrow RecordBatches instead, for consumers that
+only need numeric columns as numpy arrays (the regression Gram matrices): it
+skips building a pandas frame per batch. Relations without native Arrow
+batches are converted from their pandas batches.
+
+Either way peak memory is set by the batch size (Snowpark's result chunks, or
+`--batch-rows` for the local runner), not by the size of the table; whatever is
+computed from the batches (sums, counts, Gram matrices) has to be combined
+batch by batch rather than collected.
+"""
+
+
+def iter_batches(relation, columns=None):
+    """
+    Yield the rows of a dbt relation as a stream of pandas DataFrames.
+
+    Only the requested columns are selected, so the projection is pushed down
+    into the warehouse. Relations without batch support fall back to a single
+    `to_pandas()` batch.
+    """
+    if columns is not None:
+        relation = relation.select(*columns)
+
+    if hasattr(relation, 'to_pandas_batches'):
+        for batch in relation.to_pandas_batches():
+            yield batch
+    else:
+        yield relation.to_pandas()
+
+
+def iter_arrow_batches(relation, columns=None):
+    """
+    Yield the rows of a dbt relation as pyarrow RecordBatches (column names upper-cased).
+
+    Uses the relation's `to_arrow_batches()` when it has one, otherwise
+    converts each pandas batch of `iter_batches`.
+    """
+    import pyarrow as pa
+
+    if columns is not None:
+        relation = relation.select(*columns)
+
+    if hasattr(relation, 'to_arrow_batches'):
+        batches = relation.to_arrow_batches()
+    else:
+        batches = (pa.RecordBatch.from_pandas(batch, preserve_index=False) for batch in iter_batches(relation))
+    for batch in batches:
+        names = [str(name).upper() for name in batch.schema.names]
+        yield batch if names == batch.schema.names else pa.RecordBatch.from_arrays(batch.columns, names=names)
+
+
+def batch_column(batch, name):
+    """
+    Column `name` of a pyarrow RecordBatch.
+
+    `schema.get_field_index` returns -1 for a missing (or duplicated) name, and
+    `batch.column(-1)` would silently return the last column instead.
+    """
+    index = batch.schema.get_field_index(name)
+    if index < 0:
+        raise KeyError(f"Column {name!r} not in batch (columns: {batch.schema.names})")
+    return batch.column(index)
@@ -0,0 +1,160 @@
+"""
+Poisson bootstrap for the feature importance regressions.
+
+Resampling reviews with replacement and refitting would copy the data once per
+replicate. Instead, the streaming pass (beer_analysis.regression) spreads the
+rows at random over `n_blocks` per-block Gram matrices. A replicate draws one
+Poisson(1) weight per block - the streaming equivalent of "how many times was
+this row drawn" - and its Gram matrix is the weighted sum of the blocks, so
+every replicate is a small matrix product plus a closed-form fit. Nothing is
+re-read and no rows are copied.
+
+Replicates run in fixed-size chunks across a process pool, each chunk with its
+own seed from one SeedSequence, so results are reproducible for a given seed
+regardless of the number of processes.
+
+Reported per feature:
+- percentile CIs for the ranking coefficient and the importance percentage
+- rank_stability: share of replicates in which the feature keeps its rank
+- top_rank_share: share of replicates in which the feature ranks first
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from beer_analysis.instrumentation import stage
+from beer_analysis.regression import fit_from_gram, ranking_coefficients
+
+DEFAULT_BLOCKS = 1024
+DEFAULT_CONFIDENCE = 0.95
+# Replicates per task; smaller chunks cost more in process start-up than they save
+CHUNK_REPLICATES = 250
+
+
+def importance_shares(coefficients):
+    """Importance percentages from ranking coefficients (last axis = features)."""
+    abs_importance = np.abs(coefficients)
+    return abs_importance / abs_importance.sum(axis=-1, keepdims=True) * 100
+
+
+def importance_ranks(importance):
+    """Descending ranks with ties sharing the lowest rank (pandas method='min')."""
+    importance = np.asarray(importance)
+    return (importance[..., None, :] > importance[..., :, None]).sum(axis=-1) + 1
+
+
+def _replicate_chunk(block_grams, replicates, seed, basis):
+    """Fit `replicates` Poisson-weighted replicates; returns coefficients and R²."""
+    rng = np.random.default_rng(seed)
+    n_blocks, size, _ = block_grams.shape
+    weights = rng.poisson(1.0, size=(replicates, n_blocks)).astype(float)
+    grams = (weights @ block_grams.reshape(n_blocks, -1)).reshape(replicates, size, size)
+
+    coefficients = np.full((replicates, size - 2), np.nan)
+    r_squared = np.full(replicates, np.nan)
+    for r, gram in enumerate(grams):
+        try:
+            fit = fit_from_gram(gram)
+        except np.linalg.LinAlgError:
+            continue
+        coefficients[r] = ranking_coefficients(fit, basis)
+        r_squared[r] = fit['r_squared']
+    return coefficients, r_squared
+
+
+def bootstrap_replicates(block_grams, replicates=1000, basis='standardized', seed=0, processes=None):
+    """
+    Run the Poisson bootstrap over per-block Gram matrices.
+
+    Returns {'coefficients': (R, p), 'importance': (R, p), 'ranks': (R, p),
+    'r_squared': (R,)}. processes=None uses every CPU when there are enough
+    replicates to be worth it; processes=1 runs in-process.
+    """
+    block_grams = np.asarray(block_grams, dtype=float)
+
+    # Fixed-size chunks, each with an independent random stream
+    chunk_sizes = [min(CHUNK_REPLICATES, replicates - start) for start in range(0, replicates, CHUNK_REPLICATES)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, min(processes, len(chunk_sizes)))
+
+    if processes == 1:
+        chunks = [_replicate_chunk(block_grams, size, chunk_seed, basis)
+                  for size, chunk_seed in zip(chunk_sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(_replicate_chunk, block_grams, size, chunk_seed, basis)
+                       for size, chunk_seed in zip(chunk_sizes, seeds)]
+            chunks = [future.result() for future in futures]
+
+    coefficients = np.concatenate([chunk[0] for chunk in chunks])
+    r_squared = np.concatenate([chunk[1] for chunk in chunks])
+    valid = ~np.isnan(r_squared)
+    coefficients, r_squared = coefficients[valid], r_squared[valid]
+    importance = importance_shares(coefficients)
+    return {
+        'coefficients': coefficients,
+        'importance': importance,
+        'ranks': importance_ranks(importance),
+        'r_squared': r_squared,
+    }
+
+
+def add_bootstrap_columns(table, boot, confidence=DEFAULT_CONFIDENCE):
+    """
+    Add bootstrap columns to an importance_table output (features first, MODEL_SUMMARY last).
+
+    For the MODEL_SUMMARY row the coefficient CI is the CI of R² (the value that
+    row carries in standardized_coefficient).
+    """
+    table = table.copy()
+    tail = (1 - confidence) / 2 * 100
+    bounds = [tail, 100 - tail]
+    p = boot['coefficients'].shape[1]
+
+    coefficient_ci = np.percentile(boot['coefficients'], bounds, axis=0)
+    importance_ci = np.percentile(boot['importance'], bounds, axis=0)
+    r_squared_ci = np.percentile(boot['r_squared'], bounds)
+    point_ranks = table['rank'].iloc[:p].to_numpy()
+
+    table['coefficient_ci_lower'] = np.append(coefficient_ci[0], r_squared_ci[0])
+    table['coefficient_ci_upper'] = np.append(coefficient_ci[1], r_squared_ci[1])
+    table['importance_ci_lower'] = np.append(importance_ci[0], np.nan)
+    table['importance_ci_upper'] = np.append(importance_ci[1], np.nan)
+    table['rank_stability'] = np.append((boot['ranks'] == point_ranks).mean(axis=0), np.nan)
+    table['top_rank_share'] = np.append((boot['ranks'] == 1).mean(axis=0), np.nan)
+    table['bootstrap_replicates'] = len(boot['r_squared'])
+    return table
+
+
+def bootstrap_importance(table, block_grams, replicates=1000, basis='standardized',
+                         confidence=DEFAULT_CONFIDENCE, seed=0, processes=None):
+    """Bootstrap an importance table: run the replicates and add the CI / rank stability columns."""
+    with stage('bootstrap') as record:
+        boot = bootstrap_replicates(block_grams, replicates, basis=basis, seed=seed, processes=processes)
+        return record.output(add_bootstrap_columns(table, boot, confidence))
+
+
+def bootstrap_settings(config):
+    """
+    Bootstrap keyword arguments for `feature_importance` from a model's dbt config.
+
+    `config` is a mapping (or `dbt.config`) with bootstrap_replicates (0 = off),
+    bootstrap_blocks, bootstrap_processes and bootstrap_seed; values rendered
+    from `{{ var(...) }}` arrive as strings and missing ones as None. On
+    Snowflake, models must read the keys with literal `dbt.config.get("...")`
+    calls - dbt only passes a Python model the config keys it finds that way.
+    """
+    def setting(key, default):
+        value = config.get(key, default)
+        return default if value in (None, '', 'None') else int(value)
+
+    return {
+        'bootstrap_replicates': setting('bootstrap_replicates', 0),
+        'bootstrap_blocks': setting('bootstrap_blocks', DEFAULT_BLOCKS),
+        'processes': setting('bootstrap_processes', None),
+        'seed': setting('bootstrap_seed', 0),
+    }
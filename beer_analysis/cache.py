@@ -0,0 +1,304 @@
+"""
+Input-fingerprint result cache for the Python models.
+
+A Python model recomputes its output on every `dbt run`, even when nothing it
+reads has changed. With a ResultCache the model first fingerprints its inputs:
+- every upstream ref: row count, max review_time (REVIEW_TIME or
+  MAX_REVIEW_TIME, when the relation has one) and an order-independent content
+  hash computed inside the warehouse (HASH_AGG on Snowflake, a sum of row
+  hashes on DuckDB), so only one row per ref is transferred. Floating-point
+  columns are rounded to HASH_DECIMALS first: incremental models recompute
+  their latest rows on every run, and parallel float sums differ in the last
+  bits, which must not count as changed input
+- the model's own code and the source of the loaded beer_analysis modules
+- the parameters the output depends on (e.g. the bootstrap config)
+
+If an earlier run stored an output under the same fingerprint, the model
+returns that table (`session.table(...)`) and dbt copies it into place inside
+the warehouse; otherwise the model runs and its output is stored. A reused
+output gets the time of the hit as its ANALYSIS_DATE (REFRESH_COLUMNS), like a
+recomputed one; when it was computed is kept in the registry (created_at):
+
+    cache = ResultCache(dbt, session, model, ["seasonality_cube"], params={...}, **cache_settings(
+        dbt.config.get("result_cache"),
+        dbt.config.get("result_cache_max_entries"),
+        dbt.config.get("result_cache_retention_days"),
+    ))
+    cached = cache.lookup()
+    if cached is not None:
+        return cached
+    ...
+    return cache.store(metrics.output(results))
+
+dbt hands a Python model only the config keys its source reads with literal
+`dbt.config.get("...")` calls (it finds them by parsing the code), so every
+model spells out these three calls, and the bootstrap and invocation_id ones,
+rather than passing `dbt.config` or a key list to a helper. The local runner
+passes the whole config and would not notice a missing call.
+
+Entries live next to the model: <MODEL>__CACHE_<fingerprint> holds an output and
+the <MODEL>__CACHE registry its fingerprint, creation and last-use times and hit
+count. Eviction runs on every lookup: entries unused for `retention_days` are
+dropped, then all but the `max_entries` most recently used.
+"""
+
+import datetime
+import hashlib
+import json
+import marshal
+import re
+
+from beer_analysis.instrumentation import model_name, stage
+
+DEFAULT_MAX_ENTRIES = 3
+DEFAULT_RETENTION_DAYS = 30
+TIME_COLUMNS = ('REVIEW_TIME', 'MAX_REVIEW_TIME')
+HASH_DECIMALS = 6
+FLOAT_TYPES = ('DOUBLE', 'FLOAT', 'REAL')
+REFRESH_COLUMNS = ('ANALYSIS_DATE',)
+
+
+def cache_settings(enabled=None, max_entries=None, retention_days=None):
+    """
+    ResultCache keyword arguments from a model's result_cache,
+    result_cache_max_entries and result_cache_retention_days configs, which
+    arrive as strings (rendered from `{{ var(...) }}`) or None.
+    """
+    def setting(value, default):
+        return default if value in (None, '', 'None') else value
+
+    enabled = str(setting(enabled, True)).strip().lower() not in ('false', '0', 'no', 'off')
+    return {
+        'enabled': enabled,
+        'max_entries': int(setting(max_entries, DEFAULT_MAX_ENTRIES)),
+        'retention_days': float(setting(retention_days, DEFAULT_RETENTION_DAYS)),
+    }
+
+
+def cache_prefix(name):
+    """Prefix of every table the cache keeps for a model (registry and entries)."""
+    return re.sub(r'\W', '_', str(name)).upper() + '__CACHE'
+
+
+def _is_snowpark(relation):
+    return type(relation).__module__.startswith('snowflake.snowpark')
+
+
+def _hash_expressions(columns):
+    """Hash inputs for (quoted name, is floating point) columns, floats rounded to HASH_DECIMALS."""
+    return ', '.join(
+        f"round({name}, {HASH_DECIMALS})" if is_float else name
+        for name, is_float in columns
+    )
+
+
+def relation_fingerprint(relation):
+    """Row count, max review time and content hash of a relation, computed where it lives."""
+    columns = [str(column).strip('"').upper() for column in relation.columns]
+    time_column = next((column for column in TIME_COLUMNS if column in columns), None)
+
+    if _is_snowpark(relation):
+        from snowflake.snowpark import functions as F
+        from snowflake.snowpark.types import DoubleType, FloatType
+
+        hashed = _hash_expressions(
+            (field.name, isinstance(field.datatype, (DoubleType, FloatType)))
+            for field in relation.schema.fields
+        )
+        row = relation.select(
+            F.count(F.lit(1)).alias('ROW_COUNT'),
+            (F.max(F.col(time_column)) if time_column else F.lit(None)).alias('MAX_TIME'),
+            F.sql_expr(f'hash_agg({hashed})').alias('CONTENT_HASH'),
+        ).collect()[0]
+        values = (row[0], row[1], row[2])
+    else:
+        described = relation.connection.cursor().sql(relation.sql)
+        hashed = _hash_expressions(
+            ('t."' + name.replace('"', '""') + '"', str(column_type) in FLOAT_TYPES)
+            for name, column_type in zip(described.columns, described.types)
+        )
+        max_time = f"max(t.{time_column})" if time_column else 'null'
+        values = relation.connection.cursor().execute(
+            f"select count(*), {max_time}, sum(hash({hashed})) from ({relation.sql}) t"
+        ).fetchone()
+    return {'rows': str(values[0]), 'max_review_time': str(values[1]), 'content_hash': str(values[2])}
+
+
+def _code_digest(function):
+    """Hash of a function's compiled code (changes with its source)."""
+    return hashlib.sha256(marshal.dumps(function.__code__)).hexdigest()
+
+
+def package_digest():
+    """
+    Hash of the source of every beer_analysis module (the shared code models depend on).
+
+    Modules are listed with pkgutil rather than taken from sys.modules, so the
+    digest does not depend on what earlier models happened to import; the local
+    runner subpackage is left out.
+    """
+    import importlib.util
+    import pkgutil
+
+    import beer_analysis
+
+    digest = hashlib.sha256()
+    names = ['beer_analysis'] + sorted(
+        info.name for info in pkgutil.iter_modules(beer_analysis.__path__, 'beer_analysis.')
+        if not info.ispkg
+    )
+    for name in names:
+        try:
+            spec = importlib.util.find_spec(name)
+            source = spec.loader.get_source(name)
+        except Exception:
+            source = None
+        digest.update(name.encode())
+        digest.update((source or '').encode())
+    return digest.hexdigest()
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _timestamp(value):
+    return f"'{value.strftime('%Y-%m-%d %H:%M:%S.%f')}'::timestamp"
+
+
+class ResultCache:
+    """
+    Output cache of one Python model, keyed by the fingerprint of its inputs.
+
+    model: the model function (its compiled code is part of the fingerprint)
+    refs: names of the upstream refs the output is computed from
+    params: JSON-serialisable settings the output depends on
+    """
+
+    def __init__(self, dbt, session, model, refs, params=None, enabled=True,
+                 max_entries=DEFAULT_MAX_ENTRIES, retention_days=DEFAULT_RETENTION_DAYS):
+        self.dbt = dbt
+        self.session = session
+        self.model = model
+        self.refs = list(refs)
+        self.params = params or {}
+        self.enabled = enabled and max_entries > 0
+        self.max_entries = max_entries
+        self.retention_days = retention_days
+        self.model_name = model_name(dbt)
+        self._fingerprint = None
+
+        parts = [getattr(dbt.this, 'database', None), getattr(dbt.this, 'schema', None)]
+        self.namespace = '.'.join(str(part) for part in parts if part)
+        self.registry = self.table_name(cache_prefix(self.model_name))
+
+    def table_name(self, table):
+        return f"{self.namespace}.{table}" if self.namespace else table
+
+    def entry_name(self, fingerprint):
+        """Unqualified name of an entry table (the registry stores these, so a cloned schema still resolves)."""
+        return f"{cache_prefix(self.model_name)}_{fingerprint[:16].upper()}"
+
+    def fingerprint(self):
+        if self._fingerprint is None:
+            with stage('fingerprint'):
+                inputs = {
+                    'model': _code_digest(self.model),
+                    'package': package_digest(),
+                    'params': self.params,
+                    'refs': {name: relation_fingerprint(self.dbt.ref(name)) for name in sorted(self.refs)},
+                }
+                encoded = json.dumps(inputs, sort_keys=True, default=str).encode()
+                self._fingerprint = hashlib.sha256(encoded).hexdigest()
+        return self._fingerprint
+
+    def _sql(self, query):
+        return self.session.sql(query).collect()
+
+    def _ensure_registry(self):
+        if self.namespace and not _is_snowpark(self.session):
+            # dbt creates the model's schema on Snowflake; a local worker database starts empty
+            self._sql(f"create schema if not exists {self.namespace}")
+        self._sql(
+            f"create table if not exists {self.registry} ("
+            "fingerprint varchar, cache_table varchar, row_count bigint, "
+            "created_at timestamp, last_used_at timestamp, hits integer)"
+        )
+
+    def lookup(self):
+        """The stored output for the current inputs (a table relation), or None."""
+        if not self.enabled:
+            return None
+        fingerprint = self.fingerprint()
+        with stage('cache_lookup'):
+            self._ensure_registry()
+            self.evict()
+            found = self._sql(f"select cache_table from {self.registry} where fingerprint = '{fingerprint}'")
+            if not found:
+                print(f"Result cache miss - {self.model_name} ({fingerprint[:12]})")
+                return None
+            table = self.table_name(found[0][0])
+            try:
+                self._sql(f"select count(*) from {table}")
+            except Exception:
+                # The entry's table is gone; forget it and recompute
+                self._sql(f"delete from {self.registry} where fingerprint = '{fingerprint}'")
+                return None
+            self._sql(
+                f"update {self.registry} set last_used_at = {_timestamp(_now())}, hits = hits + 1 "
+                f"where fingerprint = '{fingerprint}'"
+            )
+        print(f"Result cache hit - {self.model_name} reuses {table}, inputs unchanged")
+        return self._refreshed(table)
+
+    def _refreshed(self, table):
+        """The stored output with REFRESH_COLUMNS set to now (local time, like the models' datetime.now())."""
+        relation = self.session.table(table)
+        if _is_snowpark(relation):
+            names = relation.columns
+        else:
+            # Stored names as written (the local relation upper-cases its columns)
+            names = ['"' + name.replace('"', '""') + '"' for name in relation.connection.cursor().sql(relation.sql).columns]
+        columns = [name for name in names if name.strip('"').upper() in REFRESH_COLUMNS]
+        if not columns:
+            return relation
+        now = _timestamp(datetime.datetime.now())
+        replaced = ', '.join(f"{now} as {column}" for column in columns)
+        return self.session.sql(f"select * replace ({replaced}) from {table}")
+
+    def store(self, output):
+        """Save `output` (a pandas DataFrame) under the current fingerprint; returns it as a table relation."""
+        if not self.enabled:
+            return output
+        fingerprint = self.fingerprint()
+        name = self.entry_name(fingerprint)
+        table = self.table_name(name)
+        with stage('cache_store'):
+            self._ensure_registry()
+            self.session.create_dataframe(output).write.mode('overwrite').save_as_table(table)
+            now = _timestamp(_now())
+            self._sql(f"delete from {self.registry} where fingerprint = '{fingerprint}'")
+            self._sql(
+                f"insert into {self.registry} (fingerprint, cache_table, row_count, created_at, last_used_at, hits) "
+                f"values ('{fingerprint}', '{name}', {len(output)}, {now}, {now}, 0)"
+            )
+            self.evict(keep=fingerprint)
+        return self.session.table(table)
+
+    def evict(self, keep=None):
+        """
+        Drop entries unused for retention_days, then all but the max_entries most
+        recently used; the entry with fingerprint `keep` always stays.
+        """
+        cutoff = _now() - datetime.timedelta(days=self.retention_days)
+        entries = self._sql(f"select fingerprint, cache_table, last_used_at from {self.registry} order by last_used_at desc")
+        entries = [entry for entry in entries if entry[0] != keep]
+        capacity = self.max_entries - (1 if keep else 0)
+        expired = [
+            (fingerprint, name) for position, (fingerprint, name, last_used) in enumerate(entries)
+            if position >= capacity or (last_used is not None and last_used < cutoff)
+        ]
+        for fingerprint, name in expired:
+            self._sql(f"drop table if exists {self.table_name(name)}")
+            self._sql(f"delete from {self.registry} where fingerprint = '{fingerprint}'")
+        return len(expired)
@@ -0,0 +1,245 @@
+"""
+Stage-level timing and memory instrumentation for Python models.
+
+A model opts in by running its body inside `model_metrics`:
+
+    from beer_analysis.instrumentation import model_metrics, stage
+
+    def model(dbt, session):
+        with model_metrics(dbt, session, dbt.config.get("invocation_id")) as metrics:
+            with stage('load') as load:
+                df = load.input(dbt.ref("seasonality_cube").to_pandas())
+            with stage('transform'):
+                ...
+            return metrics.output(results)
+
+Every `stage(name)` block records wall time, rows in / out, bytes read and the
+peak RSS of the process (sampled on a thread). `stage` can be used anywhere,
+including the shared helpers (beer_analysis.regression marks its read / solve /
+bootstrap steps), and costs nothing when no instrumented model is running.
+Nested stages are recorded as 'parent/child'.
+
+When the model finishes (or fails), one row per stage plus a 'total' row is
+appended to the run metrics table (RUN_METRICS next to the model, in the
+model's database and schema), keyed by model name and dbt invocation id.
+The invocation id comes from the model's `invocation_id` config, which
+dbt_project.yml sets to `{{ invocation_id }}`; it must be read with a literal
+`dbt.config.get("invocation_id")` call for dbt to pass it to the model (see
+beer_analysis.cache). Every model body that runs inside `model_metrics` has its
+stages recorded this way; the models do not repeat it.
+"""
+
+import contextvars
+import datetime
+import os
+import platform
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+RUN_METRICS_TABLE = 'RUN_METRICS'
+SAMPLE_INTERVAL = 0.005
+
+_current = contextvars.ContextVar('beer_analysis_model_metrics', default=None)
+
+
+def current_rss():
+    """Resident set size of this process in bytes (the peak so far where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return peak_rss()
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes."""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if platform.system() == 'Darwin' else peak * 1024
+
+
+class PeakMemory:
+    """Context manager sampling the process RSS on a thread; `.peak` holds the maximum in bytes."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self):
+        self.start = self.peak = current_rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+
+def data_size(data):
+    """(rows, bytes) of a pandas / pyarrow / numpy object; bytes is None when unknown."""
+    if hasattr(data, 'memory_usage'):
+        usage = data.memory_usage(deep=True)
+        return len(data), int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if hasattr(data, 'nbytes'):
+        rows = data.num_rows if hasattr(data, 'num_rows') else len(data)
+        return rows, int(data.nbytes)
+    return len(data), None
+
+
+class Stage:
+    """One timed block; `input` / `output` record what went in and came out."""
+
+    def __init__(self, name, order=None):
+        self.name = name
+        self.order = order
+        self.status = 'success'
+        self.started_at = None
+        self.seconds = 0.0
+        self.rows_in = None
+        self.rows_out = None
+        self.bytes = None
+        self.peak_memory = None
+        self.memory_growth = None
+
+    def input(self, data):
+        """Count `data` (a frame, table or batch) as read by this stage; returns it unchanged."""
+        rows, size = data_size(data)
+        self.rows_in = (self.rows_in or 0) + rows
+        if size is not None:
+            self.bytes = (self.bytes or 0) + size
+        return data
+
+    def output(self, data):
+        """Count `data` as produced by this stage; returns it unchanged."""
+        rows, _ = data_size(data)
+        self.rows_out = (self.rows_out or 0) + rows
+        return data
+
+
+class ModelMetrics:
+    """Stages recorded for one model run."""
+
+    def __init__(self, model_name, invocation_id=None):
+        self.model_name = model_name
+        self.invocation_id = str(invocation_id) if invocation_id else str(uuid.uuid4())
+        self.stages = []
+        self._path = []
+
+    @contextmanager
+    def stage(self, name, root=False):
+        """Record a stage; `root` marks the model-wide 'total' stage, which is not part of stage paths."""
+        record = Stage(name if root else '/'.join(self._path + [name]), order=len(self.stages))
+        self.stages.append(record)
+        if not root:
+            self._path.append(name)
+        record.started_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        start = time.perf_counter()
+        try:
+            with PeakMemory() as memory:
+                yield record
+        except BaseException:
+            record.status = 'error'
+            raise
+        finally:
+            record.seconds = time.perf_counter() - start
+            record.peak_memory = memory.peak
+            record.memory_growth = memory.peak - memory.start
+            if not root:
+                self._path.pop()
+
+    def output(self, data):
+        """Record the model's result on the 'total' stage; returns it unchanged."""
+        return self.stages[0].output(data) if self.stages else data
+
+    def to_frame(self):
+        import pandas as pd
+
+        mb = 2 ** 20
+        return pd.DataFrame({
+            'invocation_id': self.invocation_id,
+            'model_name': self.model_name,
+            'stage': [record.name for record in self.stages],
+            'stage_order': [record.order for record in self.stages],
+            'status': [record.status for record in self.stages],
+            'started_at': pd.to_datetime([record.started_at for record in self.stages]),
+            'seconds': [record.seconds for record in self.stages],
+            'rows_in': pd.array([record.rows_in for record in self.stages], dtype='Int64'),
+            'rows_out': pd.array([record.rows_out for record in self.stages], dtype='Int64'),
+            'bytes': pd.array([record.bytes for record in self.stages], dtype='Int64'),
+            'peak_memory_mb': [record.peak_memory / mb for record in self.stages],
+            'memory_growth_mb': [record.memory_growth / mb for record in self.stages],
+        })
+
+    def summary(self):
+        parts = [f"{record.name} {record.seconds:.2f}s" for record in self.stages[1:] if '/' not in record.name]
+        total = self.stages[0] if self.stages else None
+        peak = f", peak {total.peak_memory / 2 ** 20:,.0f} MB" if total else ''
+        return f"{self.model_name}: {', '.join(parts) or 'no stages'}{peak}"
+
+    def write(self, session, table):
+        """Append the stage rows to `table` (column names upper-cased, like the SQL models)."""
+        frame = self.to_frame()
+        frame.columns = [column.upper() for column in frame.columns]
+        session.create_dataframe(frame).write.mode('append').save_as_table(table)
+
+
+@contextmanager
+def stage(name):
+    """
+    Time a block as a stage of the running instrumented model.
+
+    Yields a Stage either way; outside `model_metrics` nothing is recorded.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield Stage(name)
+        return
+    with metrics.stage(name) as record:
+        yield record
+
+
+def metrics_table(dbt, table=RUN_METRICS_TABLE):
+    """Fully qualified run metrics table next to the model (`dbt.this`)."""
+    parts = [getattr(dbt.this, 'database', None), getattr(dbt.this, 'schema', None), table]
+    return '.'.join(str(part) for part in parts if part)
+
+
+def model_name(dbt):
+    return str(getattr(dbt.this, 'identifier', None) or dbt.this).strip('"').split('"."')[-1]
+
+
+@contextmanager
+def model_metrics(dbt, session, invocation_id=None, table=RUN_METRICS_TABLE, write=True):
+    """
+    Instrument a model body: yields a ModelMetrics whose 'total' stage spans the block.
+
+    On exit the stages are appended to the run metrics table; a failure to
+    write them is reported but never fails the model.
+    """
+    metrics = ModelMetrics(model_name(dbt), invocation_id)
+    token = _current.set(metrics)
+    try:
+        with metrics.stage('total', root=True):
+            yield metrics
+    finally:
+        _current.reset(token)
+        print(f"Run metrics - {metrics.summary()}")
+        if write:
+            try:
+                metrics.write(session, metrics_table(dbt, table))
+            except Exception as error:
+                print(f"Could not write run metrics to {metrics_table(dbt, table)}: {error}")
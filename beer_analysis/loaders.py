@@ -0,0 +1,95 @@
+"""
+Compact, dtype-encoded loader for stg_beer_reviews.
+
+A default `to_pandas()` of the reviews gives float64 ratings, int64 timestamps
+and object-dtype strings - and at 1.5M+ rows the strings dominate memory.
+`load_reviews` reads only the requested columns, batch by batch, and encodes
+each batch before the next one arrives:
+- ratings (REVIEW_*)        -> Int8 half-point codes (rating * 2, so 4.5 -> 9);
+                               a batch with any off-grid rating (e.g. 4.25) keeps that
+                               column as float64 rating * 2, so nothing is rounded away
+- REVIEW_TIME               -> UInt32 unix seconds
+- BEER_ABV                  -> float32
+- BEER_NAME / BREWERY_NAME / BEER_STYLE -> categorical (dictionary codes)
+
+Use `decode_ratings` to turn codes (or means of codes) back into the 1-5 scale.
+"""
+
+import numpy as np
+import pandas as pd
+
+from beer_analysis.batches import iter_batches
+
+RATING_COLS = ['REVIEW_OVERALL', 'REVIEW_AROMA', 'REVIEW_APPEARANCE', 'REVIEW_PALATE', 'REVIEW_TASTE']
+CATEGORICAL_COLS = ['BEER_NAME', 'BREWERY_NAME', 'BEER_STYLE']
+RATING_SCALE = 2  # half-point ratings are stored as integer codes of rating * 2
+
+
+def encode_batch(df):
+    """Encode one pandas batch of reviews into compact dtypes (column names upper-cased)."""
+    encoded = {}
+    for column in df.columns:
+        name = str(column).upper()
+        values = df[column]
+        if name in RATING_COLS:
+            scaled = pd.to_numeric(values, errors='coerce').astype('float64').to_numpy() * RATING_SCALE
+            codes = np.round(scaled)
+            valid = ~np.isnan(scaled)
+            if np.array_equal(codes[valid], scaled[valid]) and np.all(np.abs(codes[valid]) <= 127):
+                encoded[name] = pd.array(codes, dtype='Int8')
+            else:
+                # Not half points: keep exact float codes (decode_ratings still applies)
+                encoded[name] = scaled
+        elif name == 'REVIEW_TIME':
+            encoded[name] = pd.array(pd.to_numeric(values, errors='coerce'), dtype='UInt32')
+        elif name == 'BEER_ABV':
+            encoded[name] = pd.to_numeric(values, errors='coerce').astype('float32').values
+        elif name in CATEGORICAL_COLS:
+            encoded[name] = pd.Categorical(values)
+        else:
+            encoded[name] = values.values
+    return pd.DataFrame(encoded)
+
+
+def _concat(batches):
+    """Concatenate encoded batches, merging the categorical dictionaries."""
+    if len(batches) == 1:
+        return batches[0]
+    columns = {}
+    for name in batches[0].columns:
+        parts = [batch[name] for batch in batches]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            columns[name] = pd.api.types.union_categoricals(parts)
+        else:
+            columns[name] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def iter_encoded_batches(relation, columns=None):
+    """Stream a relation as compact-encoded pandas batches (see `encode_batch`)."""
+    for batch in iter_batches(relation, columns):
+        yield encode_batch(batch)
+
+
+def load_reviews(relation, columns=None, compact=True):
+    """
+    Load reviews from a dbt relation, reading only `columns`.
+
+    compact=True returns the encoded dtypes described in the module docstring;
+    compact=False returns the plain pandas frame (still column-pruned).
+    """
+    if not compact:
+        return relation.select(*columns).to_pandas() if columns else relation.to_pandas()
+
+    batches = list(iter_encoded_batches(relation, columns))
+    if not batches:
+        return pd.DataFrame(columns=[str(column).upper() for column in columns or []])
+    return _concat(batches)
+
+
+def decode_ratings(values):
+    """Half-point codes (or aggregates of codes such as means) back to the 1-5 rating scale."""
+    if isinstance(values, (pd.Series, pd.DataFrame)):
+        return values.astype('float64') / RATING_SCALE
+    return np.asarray(values, dtype='float64') / RATING_SCALE
+
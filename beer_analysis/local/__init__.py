@@ -0,0 +1,12 @@
+"""
+Offline local execution backend for the dbt project.
+
+Runs every SQL and Python model on DuckDB over Parquet files instead of
+Snowflake, so the heavy Python steps can be profiled on one machine:
+
+    python -m beer_analysis.local run --data-dir data --database target/local.duckdb
+"""
+
+from beer_analysis.local.project import Model, Project
+from beer_analysis.local.runner import LocalRunner, ModelResult
+from beer_analysis.local.runtime import LocalDbt, LocalRelation, LocalSession, LocalThis
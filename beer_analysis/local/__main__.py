@@ -0,0 +1,135 @@
+"""
+Command line entry point for the local runner.
+
+    python -m beer_analysis.local run --data-dir data [--select +seasonality_decomposition] [--workers 4]
+    python -m beer_analysis.local ls
+    python -m beer_analysis.local generate --rows 10000000 --out-dir data/beer_reviews_raw
+    python -m beer_analysis.local bench --scales 1e5 1e6 1e7 --baseline target/bench/baseline.json
+"""
+
+import argparse
+import json
+import sys
+
+import yaml
+
+from beer_analysis.local.project import Project
+from beer_analysis.local.runner import LocalRunner
+from beer_analysis.local.runtime import DEFAULT_BATCH_ROWS
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m beer_analysis.local', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--project-dir', default='.', help='dbt project root (default: current directory)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run models against DuckDB over Parquet')
+    run.add_argument('--data-dir', default='data', help='directory with <source table>.parquet files')
+    run.add_argument('--database', default='target/local.duckdb', help="DuckDB file for outputs (':memory:' for none)")
+    run.add_argument('--select', '-s', nargs='+', help='models to run; +name adds upstream, name+ adds downstream')
+    run.add_argument('--exclude', nargs='+', help='models to leave out')
+    run.add_argument('--vars', help='YAML/JSON dict overriding project vars')
+    run.add_argument('--schema', default='prep', help='target schema for models without a custom schema')
+    run.add_argument('--export-dir', help='also write every output as Parquet under this directory')
+    run.add_argument('--fail-fast', action='store_true')
+    run.add_argument('--results-json', help='write per-model status and timings to this file')
+    run.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS,
+                     help='rows per batch streamed to Python models (bounds their memory)')
+    run.add_argument('--workers', '-j', type=int, default=1,
+                     help='run independent Python models in this many worker processes')
+    run.add_argument('--memory-budget', type=float,
+                     help='MB the parallel Python workers may use together (default: 80%% of available RAM)')
+
+    ls = commands.add_parser('ls', help='list models in execution order')
+    ls.add_argument('--select', '-s', nargs='+')
+
+    generate = commands.add_parser('generate', help='write synthetic beer_reviews_raw Parquet chunks')
+    generate.add_argument('--rows', type=float, required=True, help='number of reviews (e.g. 1e8)')
+    generate.add_argument('--out-dir', default='data/beer_reviews_raw', help='directory for part-*.parquet files')
+    generate.add_argument('--chunk-rows', type=float, default=1e6, help='rows per Parquet file')
+    generate.add_argument('--workers', type=int, help='processes (default: all CPUs)')
+    generate.add_argument('--seed', type=int, default=0)
+    generate.add_argument('--beers', type=int, help='catalogue size (default: rows / 25)')
+    generate.add_argument('--seasonal-amplitude', type=float, default=0.05,
+                          help='monthly rating swing injected per style season (0 = no seasonality)')
+    generate.add_argument('--volume-seasonality', type=float, default=0.08, help='monthly swing in review volume')
+
+    bench = commands.add_parser('bench', help='benchmark models on synthetic data at several scales')
+    bench.add_argument('--scales', type=float, nargs='+', default=[1e5, 1e6, 1e7], help='numbers of reviews')
+    bench.add_argument('--models', '-m', nargs='+', help='models to time (default: Python + heavy SQL models)')
+    bench.add_argument('--repeats', type=int, default=3, help='runs per model; the median is reported')
+    bench.add_argument('--data-root', default='target/bench/data', help='cache for the generated datasets')
+    bench.add_argument('--output', default='target/bench/latest.json', help='results JSON to write')
+    bench.add_argument('--baseline', help='results JSON to compare against')
+    bench.add_argument('--threshold', type=float, default=0.10, help='relative slowdown flagged as a regression')
+    bench.add_argument('--memory-threshold', type=float, help='relative peak RSS growth flagged (default: --threshold)')
+    bench.add_argument('--vars', help='YAML/JSON dict overriding project vars')
+    bench.add_argument('--threads', type=int, help='DuckDB threads')
+    bench.add_argument('--seed', type=int, default=0, help='seed of the synthetic datasets')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'generate':
+        from beer_analysis.synthetic import GeneratorConfig, generate
+
+        config = GeneratorConfig(
+            args.rows, chunk_rows=args.chunk_rows, seed=args.seed, n_beers=args.beers,
+            seasonal_amplitude=args.seasonal_amplitude, volume_seasonality=args.volume_seasonality,
+        )
+        generate(args.out_dir, config, workers=args.workers)
+        return 0
+
+    if args.command == 'bench':
+        from beer_analysis.local import bench
+
+        results = bench.run_benchmarks(
+            args.project_dir, scales=args.scales, models=args.models, repeats=args.repeats,
+            data_root=args.data_root, vars=yaml.safe_load(args.vars) if args.vars else None,
+            threads=args.threads, seed=args.seed,
+        )
+        bench.save_results(results, args.output)
+        print(f"\nResults written to {args.output}")
+        if args.baseline:
+            rows = bench.compare(results, bench.load_results(args.baseline), args.threshold, args.memory_threshold)
+            print('\n' + bench.format_comparison(rows))
+            return 1 if any(row['regression'] for row in rows) else 0
+        return 0
+
+    if args.command == 'ls':
+        project = Project(args.project_dir)
+        for layer_number, layer in enumerate(project.layers(project.select(args.select)), start=1):
+            for name in layer:
+                model = project.models[name]
+                print(f"{layer_number:>2}  {model.language:<6} {name}  <- {', '.join(project.upstream(name)) or '-'}")
+        return 0
+
+    runner = LocalRunner(
+        args.project_dir,
+        args.data_dir,
+        database=args.database,
+        vars=yaml.safe_load(args.vars) if args.vars else None,
+        schema=args.schema,
+        batch_rows=args.batch_rows,
+    )
+    try:
+        results = runner.run(select=args.select, exclude=args.exclude, fail_fast=args.fail_fast,
+                             workers=args.workers, memory_budget_mb=args.memory_budget)
+        if args.export_dir:
+            runner.export_parquet(args.export_dir, [result.name for result in results if result.status == 'success'])
+    finally:
+        runner.close()
+
+    if args.results_json:
+        with open(args.results_json, 'w') as handle:
+            json.dump([result.as_dict() for result in results], handle, indent=2)
+
+    counts = {status: sum(result.status == status for result in results) for status in ('success', 'error', 'skipped')}
+    print(f"\nDone. PASS={counts['success']} ERROR={counts['error']} SKIP={counts['skipped']}")
+    return 1 if counts['error'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
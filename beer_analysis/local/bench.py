@@ -0,0 +1,308 @@
+"""
+Benchmarks for the Python models and the heavy SQL models on synthetic data.
+
+For every scale (number of reviews) a synthetic beer_reviews_raw is generated
+once under data_root/<rows>/ (beer_analysis.synthetic) and reused by later runs.
+Each scale runs in a fresh child process on an in-memory DuckDB database: the
+upstream models are built once (untimed), then every benchmarked model is run
+`repeats` times. Recorded per model and scale:
+- wall time (median over the repeats, plus every run)
+- per-stage times from the runner (render/execute for SQL; import/model/write
+  for Python; count), medians over the repeats
+- peak RSS of the process while the model ran, sampled from /proc, and its
+  growth over the RSS at the start of the run
+Creating a view does no work, so views are also read in full ('evaluate' stage).
+The result cache is switched off, so every repeat recomputes the Python models.
+
+Results are written as JSON. `compare` checks them against a baseline file and
+flags models whose median time or peak RSS grew by more than a threshold:
+
+    python -m beer_analysis.local bench --scales 1e5 1e6 1e7 --output target/bench/latest.json
+    python -m beer_analysis.local bench --scales 1e6 --baseline target/bench/baseline.json
+"""
+
+import contextlib
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from beer_analysis.instrumentation import PeakMemory, peak_rss
+
+DEFAULT_SCALES = (100_000, 1_000_000, 10_000_000)
+DEFAULT_REPEATS = 3
+DEFAULT_THRESHOLD = 0.10
+# Changes smaller than this are noise whatever their relative size
+MIN_SECONDS = 0.05
+MIN_RSS_MB = 16
+
+# SQL models worth timing next to the Python models
+HEAVY_SQL_MODELS = [
+    'dim_beer',
+    'fct_reviews',
+    'int_beer_stats',
+    'int_reco_highest_overall',
+    'int_reco_balanced_excellence',
+    'int_reco_statistical_confidence',
+    'int_reco_style_diversity',
+    'overall_rankings',
+    'feature_importance_segment_stats',
+    'seasonality_cube',
+    'seasonality_cube_daily',
+]
+
+RESULTS_VERSION = 1
+
+
+def default_models(project):
+    """Every Python model plus the heavy SQL models, in execution order."""
+    names = {name for name, model in project.models.items() if model.language == 'python'}
+    names.update(name for name in HEAVY_SQL_MODELS if name in project.models)
+    return project.order(names)
+
+
+def dataset_dir(data_root, rows):
+    return os.path.join(data_root, str(rows))
+
+
+def ensure_dataset(data_root, rows, seed=0, workers=None):
+    """
+    Generate the synthetic source table for a scale unless it already exists.
+
+    Returns the data directory to hand to the runner (holds beer_reviews_raw/).
+    """
+    from beer_analysis.synthetic import GeneratorConfig, generate
+
+    data_dir = dataset_dir(data_root, rows)
+    marker_path = os.path.join(data_dir, 'dataset.json')
+    marker = {'rows': rows, 'seed': seed}
+    if os.path.isfile(marker_path):
+        with open(marker_path) as handle:
+            if json.load(handle) == marker:
+                return data_dir
+
+    print(f"Generating {rows:,} synthetic reviews in {data_dir}")
+    generate(os.path.join(data_dir, 'beer_reviews_raw'), GeneratorConfig(rows, seed=seed), workers=workers,
+             verbose=False)
+    with open(marker_path, 'w') as handle:
+        json.dump(marker, handle)
+    return data_dir
+
+
+def _median_stages(runs):
+    names = sorted({name for run in runs for name in run})
+    return {name: statistics.median(run.get(name, 0.0) for run in runs) for name in names}
+
+
+def _benchmark_model(runner, name, repeats):
+    model = runner.project.models[name]
+    seconds, stages, peaks, growths = [], [], [], []
+    result = None
+    for _ in range(repeats):
+        # Every repeat is a full build, including for incremental models
+        if model.materialized == 'incremental':
+            runner.connection.execute(f"drop table if exists {runner.relation_name(name)}")
+        # Models print progress lines; keep the benchmark output readable
+        with PeakMemory() as memory, contextlib.redirect_stdout(io.StringIO()):
+            result = runner.run_model(name)
+            if result.status == 'success' and result.materialized == 'view':
+                start = time.perf_counter()
+                runner.connection.execute(
+                    f"create or replace temp table __bench_evaluate as select * from {runner.relation_name(name)}"
+                )
+                runner.connection.execute("drop table __bench_evaluate")
+                result.stages['evaluate'] = time.perf_counter() - start
+                result.seconds += result.stages['evaluate']
+        if result.status != 'success':
+            break
+        seconds.append(result.seconds)
+        stages.append(result.stages)
+        peaks.append(memory.peak)
+        growths.append(memory.peak - memory.start)
+
+    if result.status != 'success':
+        return {'status': result.status, 'error': result.error, 'language': model.language}
+    return {
+        'status': 'success',
+        'language': model.language,
+        'materialized': result.materialized,
+        'rows': result.rows,
+        'seconds': statistics.median(seconds),
+        'runs': seconds,
+        'stages': _median_stages(stages),
+        'peak_rss_mb': max(peaks) / 2 ** 20,
+        'rss_growth_mb': max(growths) / 2 ** 20,
+    }
+
+
+def run_scale(project_dir, data_dir, models, repeats=DEFAULT_REPEATS, vars=None, threads=None):
+    """Benchmark `models` on one dataset in this process; returns the scale's result dict."""
+    from beer_analysis.local.runner import LocalRunner
+
+    # Repeats of an unchanged model would all be result cache hits (beer_analysis.cache)
+    vars = {**(vars or {}), 'result_cache': False}
+    runner = LocalRunner(project_dir, data_dir, database=':memory:', vars=vars, threads=threads)
+    try:
+        # Build everything the benchmarked models read, untimed
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            setup = runner.run(select=['+' + name for name in models], verbose=False)
+        setup_seconds = time.perf_counter() - start
+        failed = {result.name: result.error for result in setup if result.status != 'success'}
+
+        results = {}
+        for name in models:
+            if name in failed:
+                results[name] = {'status': 'error', 'error': failed[name],
+                                 'language': runner.project.models[name].language}
+                continue
+            results[name] = _benchmark_model(runner, name, repeats)
+    finally:
+        runner.close()
+
+    return {
+        'setup_seconds': setup_seconds,
+        'peak_rss_mb': peak_rss() / 2 ** 20,
+        'models': results,
+    }
+
+
+def environment():
+    import duckdb
+    import numpy
+    import pandas
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'duckdb': duckdb.__version__,
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__,
+    }
+
+
+def run_benchmarks(project_dir='.', scales=DEFAULT_SCALES, models=None, repeats=DEFAULT_REPEATS,
+                   data_root='target/bench/data', vars=None, threads=None, seed=0, verbose=True):
+    """
+    Benchmark `models` (default: `default_models`) at every scale.
+
+    Each scale runs in a freshly spawned process so its memory peak is its own.
+    Returns the results document (see module docstring).
+    """
+    from beer_analysis.local.project import Project
+
+    project = Project(project_dir)
+    models = project.order(set(models)) if models else default_models(project)
+    unknown = set(models) - set(project.models)
+    if unknown:
+        raise KeyError(f"Unknown models: {', '.join(sorted(unknown))}")
+
+    document = {
+        'version': RESULTS_VERSION,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'repeats': repeats,
+        'vars': vars or {},
+        'scales': [],
+    }
+    context = multiprocessing.get_context('spawn')
+    for rows in scales:
+        rows = int(rows)
+        data_dir = ensure_dataset(data_root, rows, seed)
+        if verbose:
+            print(f"\n== {rows:,} reviews ==")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            scale = executor.submit(run_scale, project.root, data_dir, models, repeats, vars, threads).result()
+        scale = {'rows': rows, **scale}
+        document['scales'].append(scale)
+        if verbose:
+            print(format_scale(scale))
+    return document
+
+
+def format_scale(scale):
+    lines = [f"{'model':<40} {'seconds':>9} {'peak MB':>9} {'+MB':>7}  slowest stage"]
+    for name, result in scale['models'].items():
+        if result['status'] != 'success':
+            lines.append(f"{name:<40} {'ERROR':>9} {'':>9} {'':>7}  {result['error'].splitlines()[0][:60]}")
+            continue
+        stage, stage_seconds = max(result['stages'].items(), key=lambda item: item[1], default=('-', 0.0))
+        lines.append(f"{name:<40} {result['seconds']:>9.3f} {result['peak_rss_mb']:>9.0f} {result['rss_growth_mb']:>7.0f}  "
+                     f"{stage} {stage_seconds:.3f}s")
+    lines.append(f"setup {scale['setup_seconds']:.1f}s, process peak RSS {scale['peak_rss_mb']:.0f} MB")
+    return '\n'.join(lines)
+
+
+def save_results(document, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as handle:
+        json.dump(document, handle, indent=2)
+
+
+def load_results(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def _change(current, baseline):
+    return (current - baseline) / baseline if baseline else float('inf')
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD, memory_threshold=None,
+            min_seconds=MIN_SECONDS, min_rss_mb=MIN_RSS_MB):
+    """
+    Compare two results documents model by model at the scales both contain.
+
+    Returns a list of dicts (rows, model, metric, baseline, current, change,
+    regression). A metric regresses when it grew by more than `threshold`
+    (time) / `memory_threshold` (peak RSS, default: threshold) and by more
+    than the absolute noise floor; a model that succeeded in the baseline and
+    fails now is always a regression.
+    """
+    memory_threshold = threshold if memory_threshold is None else memory_threshold
+    baseline_scales = {scale['rows']: scale for scale in baseline['scales']}
+    rows = []
+    for scale in current['scales']:
+        base_scale = baseline_scales.get(scale['rows'])
+        if base_scale is None:
+            continue
+        for name, result in scale['models'].items():
+            base = base_scale['models'].get(name)
+            if base is None or base['status'] != 'success':
+                continue
+            entry = {'rows': scale['rows'], 'model': name}
+            if result['status'] != 'success':
+                rows.append({**entry, 'metric': 'status', 'baseline': 'success', 'current': result['status'],
+                             'change': None, 'regression': True})
+                continue
+            for metric, limit, floor in (('seconds', threshold, min_seconds),
+                                         ('peak_rss_mb', memory_threshold, min_rss_mb)):
+                change = _change(result[metric], base[metric])
+                rows.append({
+                    **entry, 'metric': metric, 'baseline': base[metric], 'current': result[metric],
+                    'change': change,
+                    'regression': change > limit and result[metric] - base[metric] > floor,
+                })
+    return rows
+
+
+def format_comparison(rows):
+    lines = [f"{'rows':>11} {'model':<40} {'metric':<12} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for row in rows:
+        if row['metric'] == 'status':
+            lines.append(f"{row['rows']:>11,} {row['model']:<40} {'status':<12} {'success':>10} "
+                         f"{row['current']:>10} {'':>8}  REGRESSION")
+            continue
+        flag = '  REGRESSION' if row['regression'] else ''
+        lines.append(f"{row['rows']:>11,} {row['model']:<40} {row['metric']:<12} {row['baseline']:>10.3f} "
+                     f"{row['current']:>10.3f} {row['change']:>+7.1%}{flag}")
+    regressions = sum(row['regression'] for row in rows)
+    lines.append(f"\n{regressions} regression(s) in {len(rows)} comparisons")
+    return '\n'.join(lines)
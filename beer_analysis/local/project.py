@@ -0,0 +1,172 @@
+"""
+Discovery of the dbt project on disk: models, their refs and their configs.
+
+Only what the local runner needs is parsed here - model files under models/,
+`ref()` / `source()` calls, the `models:` config tree and `vars:` from
+dbt_project.yml, and the macros directory.
+"""
+
+import os
+import re
+
+import yaml
+
+SQL_REF_PATTERN = re.compile(r"""\bref\(\s*['"]([\w\-]+)['"]\s*\)""")
+PY_REF_PATTERN = re.compile(r"""\bdbt\.ref\(\s*['"]([\w\-]+)['"]\s*\)""")
+SOURCE_PATTERN = re.compile(r"""\bsource\(\s*['"]([\w\-]+)['"]\s*,\s*['"]([\w\-]+)['"]\s*\)""")
+JINJA_COMMENT_PATTERN = re.compile(r"\{#.*?#\}", re.DOTALL)
+
+
+class Model:
+    """One model file (SQL or Python) and what it depends on."""
+
+    def __init__(self, name, path, language, relative_dir, refs, sources, config):
+        self.name = name
+        self.path = path
+        self.language = language
+        self.relative_dir = relative_dir
+        self.refs = refs
+        self.sources = sources
+        self.config = config
+
+    @property
+    def materialized(self):
+        return self.config.get('materialized', 'view')
+
+    def read(self):
+        with open(self.path, encoding='utf-8') as handle:
+            return handle.read()
+
+    def __repr__(self):
+        return f"Model({self.name!r}, {self.language})"
+
+
+class Project:
+    """A dbt project directory: models, the ref DAG, vars and macros."""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        with open(os.path.join(self.root, 'dbt_project.yml'), encoding='utf-8') as handle:
+            self.project_config = yaml.safe_load(handle)
+        self.name = self.project_config['name']
+        self.vars = dict(self.project_config.get('vars') or {})
+        self.models = self._discover_models()
+
+    # -- discovery ---------------------------------------------------------
+
+    def _model_paths(self):
+        return [os.path.join(self.root, path) for path in self.project_config.get('model-paths', ['models'])]
+
+    def _discover_models(self):
+        models = {}
+        for model_root in self._model_paths():
+            for directory, _, files in os.walk(model_root):
+                for file_name in sorted(files):
+                    stem, extension = os.path.splitext(file_name)
+                    if extension not in ('.sql', '.py'):
+                        continue
+                    path = os.path.join(directory, file_name)
+                    relative_dir = os.path.relpath(directory, model_root)
+                    language = 'python' if extension == '.py' else 'sql'
+                    with open(path, encoding='utf-8') as handle:
+                        text = handle.read()
+                    if language == 'sql':
+                        text = JINJA_COMMENT_PATTERN.sub('', text)
+                        refs = SQL_REF_PATTERN.findall(text)
+                    else:
+                        refs = PY_REF_PATTERN.findall(text)
+                    models[stem] = Model(
+                        name=stem,
+                        path=path,
+                        language=language,
+                        relative_dir=relative_dir,
+                        refs=sorted(set(refs)),
+                        sources=sorted(set(SOURCE_PATTERN.findall(text))),
+                        config=self._folder_config(relative_dir, language),
+                    )
+        return models
+
+    def _folder_config(self, relative_dir, language):
+        """Merge `+key` configs from dbt_project.yml along the model's folder path."""
+        config = {'materialized': 'view'}
+        if language == 'python':
+            config['materialized'] = 'table'
+        node = (self.project_config.get('models') or {}).get(self.name) or {}
+        parts = [] if relative_dir in ('', '.') else relative_dir.split(os.sep)
+        for part in [None] + parts:
+            if part is not None:
+                node = node.get(part) if isinstance(node, dict) else None
+                if not isinstance(node, dict):
+                    break
+            for key, value in node.items():
+                if key.startswith('+'):
+                    config[key[1:]] = value
+        return config
+
+    def macros_source(self):
+        """Concatenated text of every macro file, prepended to each SQL model."""
+        chunks = []
+        for macro_path in self.project_config.get('macro-paths', ['macros']):
+            macro_dir = os.path.join(self.root, macro_path)
+            if not os.path.isdir(macro_dir):
+                continue
+            for file_name in sorted(os.listdir(macro_dir)):
+                if file_name.endswith('.sql'):
+                    with open(os.path.join(macro_dir, file_name), encoding='utf-8') as handle:
+                        chunks.append(handle.read())
+        return '\n'.join(chunks)
+
+    # -- DAG ---------------------------------------------------------------
+
+    def upstream(self, name):
+        return [ref for ref in self.models[name].refs if ref in self.models]
+
+    def downstream(self, name):
+        return sorted(other.name for other in self.models.values() if name in other.refs)
+
+    def select(self, selectors=None):
+        """
+        Resolve model selectors. `name` selects one model, `+name` also selects
+        everything it depends on and `name+` everything that depends on it.
+        """
+        if not selectors:
+            return set(self.models)
+        selected = set()
+        for selector in selectors:
+            name = selector.strip('+')
+            if name not in self.models:
+                raise KeyError(f"Unknown model: {name}")
+            selected.add(name)
+            if selector.startswith('+'):
+                selected |= self._walk(name, self.upstream)
+            if selector.endswith('+'):
+                selected |= self._walk(name, self.downstream)
+        return selected
+
+    def _walk(self, name, neighbours):
+        seen, stack = set(), [name]
+        while stack:
+            for other in neighbours(stack.pop()):
+                if other not in seen:
+                    seen.add(other)
+                    stack.append(other)
+        return seen
+
+    def layers(self, names=None):
+        """Topologically sorted layers; models in one layer are independent."""
+        names = set(self.models) if names is None else set(names)
+        pending = {name: set(self.upstream(name)) & names for name in names}
+        layers = []
+        while pending:
+            ready = sorted(name for name, deps in pending.items() if not deps)
+            if not ready:
+                raise ValueError(f"Cycle in ref graph between: {sorted(pending)}")
+            layers.append(ready)
+            for name in ready:
+                del pending[name]
+            for deps in pending.values():
+                deps.difference_update(ready)
+        return layers
+
+    def order(self, names=None):
+        return [name for layer in self.layers(names) for name in layer]
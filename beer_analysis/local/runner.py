@@ -0,0 +1,342 @@
+"""
+Offline execution of the whole dbt DAG on DuckDB.
+
+The source table (beer_reviews_raw) is read from Parquet files, SQL models are
+rendered with Jinja (ref/source/config/var/is_incremental plus the project
+macros) and executed in DuckDB, and Python models are imported and called with
+a LocalDbt / LocalSession pair. Every model lands as a table or view in a local
+DuckDB database file, in the same schema it would get on Snowflake.
+"""
+
+import importlib.util
+import os
+import sys
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+
+import duckdb
+import jinja2
+
+from beer_analysis.local.project import Project
+from beer_analysis.local.runtime import DEFAULT_BATCH_ROWS, LocalDbt, LocalRelation, LocalSession, quote
+
+
+class Target:
+    """What `{{ target }}` exposes to SQL models during a local run."""
+
+    def __init__(self, schema):
+        self.type = 'duckdb'
+        self.name = 'local'
+        self.schema = schema
+        self.database = 'local'
+
+
+def load_python_module(model):
+    """Import a Python model file as a fresh module."""
+    module_name = f"_local_dbt_model_{model.name}"
+    spec = importlib.util.spec_from_file_location(module_name, model.path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@contextmanager
+def timed(stages, name):
+    """Add the wall time of the block to stages[name] (seconds)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - start
+
+
+class ModelResult:
+    def __init__(self, name, status, seconds=0.0, rows=None, error=None, materialized=None, stages=None):
+        self.name = name
+        self.materialized = materialized
+        self.status = status
+        self.seconds = seconds
+        self.rows = rows
+        self.error = error
+        self.stages = stages or {}
+
+    def as_dict(self):
+        return {
+            'model': self.name,
+            'status': self.status,
+            'seconds': self.seconds,
+            'rows': self.rows,
+            'error': self.error,
+            'stages': self.stages,
+        }
+
+
+class LocalRunner:
+    """
+    Run models of a dbt project against DuckDB over Parquet.
+
+    project_dir: dbt project root (where dbt_project.yml lives)
+    data_dir:    directory holding <table>.parquet or <table>/*.parquet per source table
+    database:    DuckDB database file the outputs are written to (':memory:' for none)
+    """
+
+    def __init__(self, project_dir, data_dir, database=':memory:', vars=None,
+                 schema='prep', batch_rows=DEFAULT_BATCH_ROWS, threads=None):
+        self.project = Project(project_dir)
+        self.data_dir = os.path.abspath(data_dir)
+        self.database = database
+        self.vars = dict(self.project.vars)
+        self.vars.update(vars or {})
+        self.target = Target(schema)
+        self.batch_rows = batch_rows
+        if database != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(database)), exist_ok=True)
+        self.connection = duckdb.connect(database)
+        self.connection.execute("SET TimeZone = 'UTC'")
+        self.database_name = self.connection.execute("select current_database()").fetchone()[0]
+        # `{{ invocation_id }}`: one id per runner, like one dbt invocation
+        self.invocation_id = str(uuid.uuid4())
+        if threads:
+            self.connection.execute(f"SET threads = {int(threads)}")
+        self.session = LocalSession(self.connection, batch_rows=batch_rows)
+        self._macros = self.project.macros_source()
+        self._jinja = jinja2.Environment(extensions=['jinja2.ext.do'])
+        # Python models import `beer_analysis` from the project root
+        if self.project.root not in sys.path:
+            sys.path.insert(0, self.project.root)
+
+    # -- relations ---------------------------------------------------------
+
+    def schema_for(self, model):
+        custom = model.config.get('schema')
+        return str(custom).strip() if custom else self.target.schema
+
+    def relation_name(self, name):
+        model = self.project.models[name]
+        return f"{quote(self.schema_for(model))}.{quote(name)}"
+
+    def existing_type(self, name):
+        """'BASE TABLE', 'VIEW' or None for a model's relation in the database."""
+        model = self.project.models[name]
+        found = self.connection.cursor().execute(
+            "select table_type from information_schema.tables where table_schema = ? and table_name = ?",
+            [self.schema_for(model), name],
+        ).fetchone()
+        return found[0] if found else None
+
+    def table_exists(self, name):
+        return self.existing_type(name) == 'BASE TABLE'
+
+    def relation(self, name):
+        if name not in self.project.models:
+            raise KeyError(f"ref('{name}') does not match any model")
+        model = self.project.models[name]
+        return LocalRelation(
+            self.connection,
+            f"select * from {self.relation_name(name)}",
+            uppercase=model.language == 'sql',
+            batch_rows=self.batch_rows,
+        )
+
+    def source_sql(self, source_name, table_name):
+        file_path = os.path.join(self.data_dir, f"{table_name}.parquet")
+        dir_path = os.path.join(self.data_dir, table_name)
+        if os.path.isfile(file_path):
+            return f"read_parquet('{file_path}')"
+        if os.path.isdir(dir_path):
+            return f"read_parquet('{os.path.join(dir_path, '*.parquet')}')"
+        raise FileNotFoundError(
+            f"source('{source_name}', '{table_name}'): expected {file_path} or {dir_path}/*.parquet"
+        )
+
+    def source_relation(self, source_name, table_name):
+        return LocalRelation(
+            self.connection,
+            f"select * from {self.source_sql(source_name, table_name)}",
+            batch_rows=self.batch_rows,
+        )
+
+    # -- rendering ---------------------------------------------------------
+
+    def _var(self, name, default=None):
+        if name in self.vars:
+            return self.vars[name]
+        if default is None:
+            raise KeyError(f"Required var '{name}' not provided")
+        return default
+
+    def model_config(self, model):
+        """The model's dbt_project.yml config with Jinja values such as `{{ var(...) }}` rendered."""
+        config = {}
+        for key, value in model.config.items():
+            if isinstance(value, str) and '{{' in value:
+                value = self._jinja.from_string(value).render(
+                    var=self._var, target=self.target, invocation_id=self.invocation_id,
+                    env_var=lambda name, default=None: os.environ.get(name, default),
+                )
+            config[key] = value
+        return config
+
+    def render_sql(self, model):
+        config = self.model_config(model)
+
+        def set_config(**kwargs):
+            config.update(kwargs)
+            return ''
+
+        context = {
+            'ref': lambda name: self.relation_name(name),
+            'source': lambda source_name, table_name: self.source_sql(source_name, table_name),
+            'config': set_config,
+            'var': self._var,
+            'is_incremental': lambda: config.get('materialized') == 'incremental' and self.table_exists(model.name),
+            'this': self.relation_name(model.name),
+            'target': self.target,
+            'invocation_id': self.invocation_id,
+            'env_var': lambda name, default=None: os.environ.get(name, default),
+        }
+        template = self._jinja.from_string(self._macros + '\n' + model.read())
+        sql = template.render(**context).strip().rstrip(';')
+        return sql, config
+
+    # -- execution ---------------------------------------------------------
+
+    def _ensure_schema(self, model):
+        self.connection.execute(f"create schema if not exists {quote(self.schema_for(model))}")
+
+    def _materialize(self, model, select_sql, materialized, config, cursor=None):
+        target = self.relation_name(model.name)
+        cursor = cursor or self.connection.cursor()
+        existing = self.existing_type(model.name)
+        if materialized in ('view', 'ephemeral'):
+            if existing == 'BASE TABLE':
+                cursor.execute(f"drop table {target}")
+            cursor.execute(f"create or replace view {target} as\n{select_sql}\n")
+        elif materialized == 'incremental' and self.table_exists(model.name):
+            unique_key = config.get('unique_key')
+            cursor.execute(f"create or replace temp table __incremental as\n{select_sql}\n")
+            if unique_key:
+                keys = [unique_key] if isinstance(unique_key, str) else list(unique_key)
+                key_list = ', '.join(quote(key) for key in keys)
+                cursor.execute(
+                    f"delete from {target} where ({key_list}) in (select ({key_list}) from __incremental)"
+                )
+            cursor.execute(f"insert into {target} by name select * from __incremental")
+            cursor.execute("drop table __incremental")
+        else:
+            if existing == 'VIEW':
+                cursor.execute(f"drop view {target}")
+            cursor.execute(f"create or replace table {target} as\n{select_sql}\n")
+
+
+    def _run_sql(self, model, stages):
+        with timed(stages, 'render'):
+            sql, config = self.render_sql(model)
+        if not sql:
+            # dbt skips models whose SQL is empty
+            return None
+        materialized = config.get('materialized', 'view')
+        with timed(stages, 'execute'):
+            self._materialize(model, sql, materialized, config)
+        return materialized
+
+    def _run_python(self, model, stages):
+        import pandas as pd
+
+        with timed(stages, 'import'):
+            dbt = LocalDbt(self, model)
+            module = load_python_module(model)
+        with timed(stages, 'model'):
+            output = module.model(dbt, self.session)
+        cursor = self.connection.cursor()
+        if isinstance(output, LocalRelation):
+            select_sql = output.sql
+        elif isinstance(output, pd.DataFrame):
+            cursor.register('__model_output', output)
+            select_sql = 'select * from __model_output'
+        else:
+            raise TypeError(f"model() returned {type(output).__name__}, expected a DataFrame")
+        materialized = dbt.config.get('materialized', 'table')
+        materialized = 'table' if materialized == 'view' else materialized
+        with timed(stages, 'write'):
+            self._materialize(model, select_sql, materialized, dbt.config.values, cursor)
+        return materialized
+
+    def run_model(self, name):
+        model = self.project.models[name]
+        start = time.perf_counter()
+        stages = {}
+        try:
+            self._ensure_schema(model)
+            if model.language == 'python':
+                materialized = self._run_python(model, stages)
+            else:
+                materialized = self._run_sql(model, stages)
+            if not materialized:
+                return ModelResult(name, 'skipped', time.perf_counter() - start, error='empty model', stages=stages)
+            with timed(stages, 'count'):
+                rows = self.connection.cursor().execute(f"select count(*) from {self.relation_name(name)}").fetchone()[0]
+            return ModelResult(name, 'success', time.perf_counter() - start, rows=rows,
+                               materialized=materialized, stages=stages)
+        except Exception as error:
+            detail = ''.join(traceback.format_exception_only(type(error), error)).strip()
+            return ModelResult(name, 'error', time.perf_counter() - start, error=detail, stages=stages)
+
+    def run(self, select=None, exclude=None, fail_fast=False, verbose=True, workers=1, memory_budget_mb=None):
+        """
+        Run the selected models in dependency order; dependents of failures are skipped.
+
+        With workers > 1 independent Python models run in parallel worker
+        processes (beer_analysis.local.scheduler), within memory_budget_mb.
+        """
+        selected = self.project.select(select)
+        if exclude:
+            selected -= self.project.select(exclude)
+        order = self.project.order(selected)
+        if workers and workers > 1:
+            from beer_analysis.local.scheduler import run_parallel
+
+            return run_parallel(self, order, workers, memory_budget_mb, fail_fast=fail_fast, verbose=verbose)
+        results, failed = [], set()
+
+        for position, name in enumerate(order, start=1):
+            blocked = [ref for ref in self.project.upstream(name) if ref in failed]
+            if blocked:
+                result = ModelResult(name, 'skipped', error=f"upstream failed: {', '.join(blocked)}")
+            else:
+                result = self.run_model(name)
+            if result.status != 'success':
+                failed.add(name)
+            results.append(result)
+
+            if verbose:
+                self._report(position, len(order), result)
+            if fail_fast and result.status == 'error':
+                break
+        return results
+
+    def _report(self, position, total, result):
+        model = self.project.models[result.name]
+        materialized = result.materialized or model.materialized
+        label = f"{position} of {total} {model.language} {materialized} {self.schema_for(model)}.{result.name}"
+        if result.status == 'success':
+            print(f"{label} ... OK ({result.rows:,} rows in {result.seconds:.2f}s)")
+        elif result.status == 'skipped':
+            print(f"{label} ... SKIP ({result.error})")
+        else:
+            print(f"{label} ... ERROR in {result.seconds:.2f}s\n    {result.error}")
+
+    def export_parquet(self, output_dir, names=None):
+        """Write model outputs to <output_dir>/<schema>/<model>.parquet."""
+        for name in names or self.project.order():
+            if self.existing_type(name) is None:
+                continue
+            schema = self.schema_for(self.project.models[name])
+            os.makedirs(os.path.join(output_dir, schema), exist_ok=True)
+            path = os.path.join(output_dir, schema, f"{name}.parquet")
+            self.connection.execute(f"copy {self.relation_name(name)} to '{path}' (format parquet)")
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,219 @@
+"""
+Stand-ins for the `dbt` and `session` objects passed to `model(dbt, session)`.
+
+On Snowflake, `dbt.ref(...)` returns a Snowpark DataFrame. Locally it returns a
+LocalRelation over a DuckDB table that implements the subset of the Snowpark
+DataFrame API the models use (`select`, `to_pandas`, `to_pandas_batches`,
+`to_arrow_batches`, `count`, `collect`). Column names are upper-cased for SQL models to mirror Snowflake's
+handling of unquoted identifiers; Python model outputs keep their case, as
+they do when dbt-snowflake writes them with quoted names.
+"""
+
+DEFAULT_BATCH_ROWS = 500_000
+
+
+def quote(identifier):
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+class LocalRelation:
+    """A lazily evaluated DuckDB query with a Snowpark-like surface."""
+
+    def __init__(self, connection, sql, uppercase=True, batch_rows=DEFAULT_BATCH_ROWS):
+        self.connection = connection
+        self.sql = sql
+        self.uppercase = uppercase
+        self.batch_rows = batch_rows
+
+    def _derive(self, sql):
+        return LocalRelation(self.connection, sql, self.uppercase, self.batch_rows)
+
+    @property
+    def columns(self):
+        names = self.connection.cursor().sql(self.sql).columns
+        return [name.upper() for name in names] if self.uppercase else list(names)
+
+    def _resolve(self, column):
+        """Case-insensitive column lookup, like unquoted identifiers in Snowflake."""
+        names = self.connection.cursor().sql(self.sql).columns
+        for name in names:
+            if name == column:
+                return name
+        for name in names:
+            if name.upper() == str(column).upper():
+                return name
+        raise KeyError(f"Column {column!r} not in relation (columns: {names})")
+
+    def select(self, *columns):
+        if len(columns) == 1 and isinstance(columns[0], (list, tuple)):
+            columns = columns[0]
+        projections = []
+        for column in columns:
+            actual = self._resolve(column)
+            alias = actual.upper() if self.uppercase else actual
+            projections.append(f"{quote(actual)} as {quote(alias)}")
+        return self._derive(f"select {', '.join(projections)} from ({self.sql})")
+
+    def filter(self, predicate):
+        """Filter with a SQL predicate string."""
+        return self._derive(f"select * from ({self.sql}) where {predicate}")
+
+    def limit(self, n):
+        return self._derive(f"select * from ({self.sql}) limit {int(n)}")
+
+    def count(self):
+        return self.connection.cursor().sql(f"select count(*) from ({self.sql})").fetchone()[0]
+
+    def collect(self):
+        """Execute the query (any statement) and return its rows as tuples."""
+        return self.connection.cursor().execute(self.sql).fetchall()
+
+    def _rename(self, df):
+        if self.uppercase:
+            df.columns = [str(name).upper() for name in df.columns]
+        return df
+
+    def to_pandas(self):
+        return self._rename(self.connection.cursor().sql(self.sql).df())
+
+    def to_arrow(self):
+        return self.connection.cursor().sql(self.sql).arrow()
+
+    def _reader(self):
+        """Streaming Arrow reader over the query, `batch_rows` rows per batch."""
+        result = self.connection.cursor().execute(self.sql)
+        if hasattr(result, 'to_arrow_reader'):
+            return result.to_arrow_reader(self.batch_rows)
+        return result.fetch_record_batch(self.batch_rows)
+
+    def to_arrow_batches(self):
+        import pyarrow as pa
+
+        for batch in self._reader():
+            if self.uppercase:
+                batch = pa.RecordBatch.from_arrays(batch.columns, names=[name.upper() for name in batch.schema.names])
+            yield batch
+
+    def to_pandas_batches(self):
+        for batch in self._reader():
+            yield self._rename(batch.to_pandas())
+
+    @property
+    def write(self):
+        return LocalWriter(self)
+
+    def __repr__(self):
+        return f"LocalRelation({self.sql!r})"
+
+
+class LocalWriter:
+    """`relation.write.mode(...).save_as_table(name)` for relations of the local session."""
+
+    def __init__(self, relation):
+        self.relation = relation
+        self._mode = 'errorifexists'
+
+    def mode(self, save_mode):
+        self._mode = save_mode.lower()
+        return self
+
+    def save_as_table(self, table_name, mode=None):
+        mode = (mode or self._mode).lower()
+        parts = table_name if isinstance(table_name, (list, tuple)) else str(table_name).split('.')
+        parts = [part.strip('"') for part in parts]
+        target = '.'.join(quote(part) for part in parts)
+        # Not a cursor: frames registered by the session are only visible on its connection
+        cursor = self.relation.connection
+        if len(parts) > 1:
+            cursor.execute(f"create schema if not exists {'.'.join(quote(part) for part in parts[:-1])}")
+
+        schema = parts[-2] if len(parts) > 1 else cursor.execute("select current_schema()").fetchone()[0]
+        exists = cursor.execute(
+            "select count(*) from information_schema.tables where table_schema = ? and table_name = ?",
+            [schema, parts[-1]],
+        ).fetchone()[0]
+        if exists and mode == 'append':
+            cursor.execute(f"insert into {target} by name {self.relation.sql}")
+        elif exists and mode in ('errorifexists', 'error'):
+            raise ValueError(f"Table {table_name} already exists")
+        elif not (exists and mode == 'ignore'):
+            cursor.execute(f"create or replace table {target} as {self.relation.sql}")
+
+
+class LocalThis:
+    """`dbt.this`: the model's own relation (database, schema, identifier)."""
+
+    def __init__(self, database, schema, identifier):
+        self.database = database
+        self.schema = schema
+        self.identifier = identifier
+
+    def __str__(self):
+        return '.'.join(quote(part) for part in (self.database, self.schema, self.identifier))
+
+    __repr__ = __str__
+
+
+class LocalSession:
+    """Minimal Snowpark `Session` stand-in backed by a DuckDB connection."""
+
+    def __init__(self, connection, batch_rows=DEFAULT_BATCH_ROWS):
+        self.connection = connection
+        self.batch_rows = batch_rows
+
+    def sql(self, query):
+        return LocalRelation(self.connection, query, batch_rows=self.batch_rows)
+
+    def table(self, name):
+        parts = name if isinstance(name, (list, tuple)) else str(name).split('.')
+        parts = [part.strip('"') for part in parts]
+        return self.sql(f"select * from {'.'.join(quote(part) for part in parts)}")
+
+    def create_dataframe(self, data):
+        import pandas as pd
+
+        frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        return FrameRelation(self.connection, frame, self.batch_rows)
+
+
+class FrameRelation(LocalRelation):
+    """A relation over an in-memory pandas frame (`session.create_dataframe`)."""
+
+    def __init__(self, connection, frame, batch_rows=DEFAULT_BATCH_ROWS):
+        self.frame = frame
+        name = f"__frame_{id(frame)}"
+        connection.register(name, frame)
+        super().__init__(connection, f"select * from {quote(name)}", uppercase=False, batch_rows=batch_rows)
+
+
+class LocalConfig:
+    """`dbt.config`: callable to set values, `.get()` to read them."""
+
+    def __init__(self, values):
+        self.values = dict(values)
+
+    def __call__(self, **kwargs):
+        self.values.update(kwargs)
+        return ''
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+
+class LocalDbt:
+    """The `dbt` object handed to a Python model by the local runner."""
+
+    def __init__(self, runner, model):
+        self._runner = runner
+        self._model = model
+        self.config = LocalConfig(runner.model_config(model))
+        self.this = LocalThis(runner.database_name, runner.schema_for(model), model.name)
+
+    def ref(self, name):
+        return self._runner.relation(name)
+
+    def source(self, source_name, table_name):
+        return self._runner.source_relation(source_name, table_name)
+
+    def is_incremental(self):
+        return self._runner.table_exists(self._model.name)
@@ -0,0 +1,397 @@
+"""
+Parallel execution of the local DAG: independent Python models in a process pool.
+
+`LocalRunner.run` executes models one after another. With `workers > 1` it hands
+the run to `run_parallel`, which starts every model as soon as its refs are
+built instead of in a fixed order:
+- SQL models run in the main process on the runner's DuckDB connection (DuckDB
+  already parallelises each query, and only one process may write the file)
+- Python models run in a pool of spawned worker processes, so the feature
+  importance regressions and the seasonality models run side by side, and
+  alongside the SQL models still running in the main process
+
+Handoff: a worker cannot open the DuckDB file while the main process writes to
+it, so every ref a Python model reads is exported to Parquet once per run (in a
+temporary handoff directory) and the worker reads it as a read-only relation
+over that file. Models reading the same ref share one export, and their column
+selections are pushed down into the Parquet scan. Outputs come back the same
+way; tables a model saves through the session (RUN_METRICS) are appended to the
+database by the main process. The model's own result cache tables
+(beer_analysis.cache) are copied into the worker before it runs and replace
+the originals afterwards, so cache hits, new entries and evictions carry over.
+
+Memory: a Python model only starts while the estimated memory of the running
+workers stays within the budget (default 80% of the available RAM). A model's
+estimate is its memory growth in its latest successful RUN_METRICS 'total' row
+plus the footprint of a worker process, or DEFAULT_MODEL_MB for models without
+metrics. A model whose estimate alone exceeds the budget still runs, alone.
+"""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from beer_analysis.cache import cache_prefix
+from beer_analysis.instrumentation import RUN_METRICS_TABLE, PeakMemory
+from beer_analysis.local.runner import ModelResult, load_python_module, timed
+from beer_analysis.local.runtime import LocalDbt, LocalRelation, LocalSession, quote
+
+# Resident memory of an idle worker with numpy / pandas / duckdb imported
+WORKER_BASE_MB = 200
+# Estimate for Python models that have no RUN_METRICS rows yet
+DEFAULT_MODEL_MB = 1024
+BUDGET_SHARE = 0.8
+
+
+def available_memory_mb():
+    """Memory available for new processes in MB (None when unknown)."""
+    try:
+        with open('/proc/meminfo') as handle:
+            for line in handle:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_AVPHYS_PAGES') / 2 ** 20
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def memory_estimates(runner, names, table=RUN_METRICS_TABLE):
+    """Estimated peak MB of a worker running each Python model in `names`."""
+    growth = {}
+    cursor = runner.connection.cursor()
+    for schema in sorted({runner.schema_for(runner.project.models[name]) for name in names}):
+        found = cursor.execute(
+            "select count(*) from information_schema.tables where table_schema = ? and table_name = ?",
+            [schema, table],
+        ).fetchone()[0]
+        if not found:
+            continue
+        rows = cursor.execute(
+            f"select model_name, arg_max(memory_growth_mb, started_at) from {quote(schema)}.{quote(table)} "
+            f"where stage = 'total' and status = 'success' group by 1"
+        ).fetchall()
+        growth.update({name: mb for name, mb in rows if mb is not None})
+    return {name: WORKER_BASE_MB + growth[name] if name in growth else DEFAULT_MODEL_MB for name in names}
+
+
+class Handoff:
+    """Read-only Parquet copies of the relations Python workers read, exported once per run."""
+
+    def __init__(self, runner, directory):
+        self.runner = runner
+        self.directory = directory
+        self.paths = {}
+
+    def export(self, name):
+        if name not in self.paths:
+            path = os.path.join(self.directory, f"{name}.parquet")
+            self.runner.connection.cursor().execute(
+                f"copy (select * from {self.runner.relation_name(name)}) to '{path}' (format parquet)"
+            )
+            self.paths[name] = path
+        return self.paths[name]
+
+
+def seed_tables(runner, model, output_dir):
+    """Export the model's result cache tables for its worker, as (schema, table, parquet path)."""
+    schema = runner.schema_for(model)
+    prefix = cache_prefix(model.name)
+    tables = runner.connection.cursor().execute(
+        "select table_name from information_schema.tables "
+        "where table_schema = ? and table_type = 'BASE TABLE' and upper(table_name) like ?",
+        [schema, prefix + '%'],
+    ).fetchall()
+    seeds = []
+    for (table,) in tables:
+        path = os.path.join(output_dir, f"{model.name}__seed__{table}.parquet")
+        runner.connection.cursor().execute(f"copy {quote(schema)}.{quote(table)} to '{path}' (format parquet)")
+        seeds.append((schema, table, path))
+    return seeds
+
+
+def python_task(runner, model, handoff, output_dir, threads=None):
+    """Everything a worker needs to run one Python model (plain data, picklable)."""
+    refs = {}
+    for ref in runner.project.upstream(model.name):
+        ref_model = runner.project.models[ref]
+        refs[ref] = {'path': handoff.export(ref), 'uppercase': ref_model.language == 'sql'}
+    return {
+        'project_root': runner.project.root,
+        'name': model.name,
+        'path': model.path,
+        'schema': runner.schema_for(model),
+        'config': runner.model_config(model),
+        'database_name': runner.database_name,
+        'refs': refs,
+        'seed_tables': seed_tables(runner, model, output_dir),
+        'sources': {f"{source}.{table}": runner.source_sql(source, table) for source, table in model.sources},
+        'incremental': runner.table_exists(model.name),
+        'batch_rows': runner.batch_rows,
+        'threads': threads,
+        'output_dir': output_dir,
+    }
+
+
+class WorkerContext:
+    """The parts of LocalRunner that LocalDbt uses, backed by handoff files inside a worker."""
+
+    def __init__(self, task, connection):
+        self.task = task
+        self.connection = connection
+        self.database_name = task['database_name']
+        self.batch_rows = task['batch_rows']
+
+    def model_config(self, model):
+        return dict(self.task['config'])
+
+    def schema_for(self, model):
+        return self.task['schema']
+
+    def relation(self, name):
+        if name not in self.task['refs']:
+            raise KeyError(f"ref('{name}') does not match any model")
+        ref = self.task['refs'][name]
+        return LocalRelation(
+            self.connection, f"select * from read_parquet('{ref['path']}')",
+            uppercase=ref['uppercase'], batch_rows=self.batch_rows,
+        )
+
+    def source_relation(self, source_name, table_name):
+        source_sql = self.task['sources'][f"{source_name}.{table_name}"]
+        return LocalRelation(self.connection, f"select * from {source_sql}", batch_rows=self.batch_rows)
+
+    def table_exists(self, name):
+        return name == self.task['name'] and self.task['incremental']
+
+
+def _export_output(connection, output, path):
+    import pandas as pd
+
+    if isinstance(output, LocalRelation):
+        select_sql = output.sql
+    elif isinstance(output, pd.DataFrame):
+        connection.register('__model_output', output)
+        select_sql = 'select * from __model_output'
+    else:
+        raise TypeError(f"model() returned {type(output).__name__}, expected a DataFrame")
+    connection.execute(f"copy ({select_sql}) to '{path}' (format parquet)")
+    return path
+
+
+def _export_saved_tables(connection, prefix):
+    """Tables the model saved through the session, as (schema, table, parquet path)."""
+    saved = []
+    for schema, table in connection.execute(
+        "select table_schema, table_name from information_schema.tables "
+        "where table_catalog = current_database() and table_type = 'BASE TABLE'"
+    ).fetchall():
+        path = f"{prefix}__{schema}__{table}.parquet"
+        connection.execute(f"copy {quote(schema)}.{quote(table)} to '{path}' (format parquet)")
+        saved.append((schema, table, path))
+    return saved
+
+
+def run_python_task(task):
+    """Worker entry point: run one Python model against its handoff files."""
+    import duckdb
+
+    from beer_analysis.local.project import Model
+
+    if task['project_root'] not in sys.path:
+        sys.path.insert(0, task['project_root'])
+
+    stages = {}
+    log = io.StringIO()
+    outcome = {'name': task['name'], 'stages': stages}
+    connection = duckdb.connect()
+    try:
+        connection.execute("SET TimeZone = 'UTC'")
+        if task['threads']:
+            connection.execute(f"SET threads = {int(task['threads'])}")
+        # Same database name as the main runner, so `dbt.this` and RUN_METRICS resolve alike
+        if connection.execute("select current_database()").fetchone()[0] != task['database_name']:
+            connection.execute(f"attach ':memory:' as {quote(task['database_name'])}")
+            connection.execute(f"use {quote(task['database_name'])}")
+
+        for schema, table, path in task['seed_tables']:
+            connection.execute(f"create schema if not exists {quote(schema)}")
+            connection.execute(f"create table {quote(schema)}.{quote(table)} as select * from read_parquet('{path}')")
+
+        model = Model(task['name'], task['path'], 'python', '', sorted(task['refs']), [], task['config'])
+        prefix = os.path.join(task['output_dir'], task['name'])
+        with contextlib.redirect_stdout(log), PeakMemory() as memory:
+            with timed(stages, 'import'):
+                dbt = LocalDbt(WorkerContext(task, connection), model)
+                module = load_python_module(model)
+            with timed(stages, 'model'):
+                output = module.model(dbt, LocalSession(connection, batch_rows=task['batch_rows']))
+            with timed(stages, 'handoff'):
+                outcome['output'] = _export_output(connection, output, f"{prefix}.parquet")
+                outcome['tables'] = _export_saved_tables(connection, prefix)
+        saved = {(schema, table) for schema, table, _ in outcome['tables']}
+        outcome['dropped'] = [(schema, table) for schema, table, _ in task['seed_tables'] if (schema, table) not in saved]
+        outcome['seeded'] = [(schema, table) for schema, table, _ in task['seed_tables']]
+        outcome.update(
+            status='success',
+            config=dict(dbt.config.values),
+            memory_growth_mb=(memory.peak - memory.start) / 2 ** 20,
+        )
+    except Exception as error:
+        outcome.update(status='error', error=''.join(traceback.format_exception_only(type(error), error)).strip())
+    finally:
+        connection.close()
+    outcome['log'] = log.getvalue()
+    return outcome
+
+
+def _append_table(connection, schema, table, path, replace=False):
+    target = f"{quote(schema)}.{quote(table)}"
+    connection.execute(f"create schema if not exists {quote(schema)}")
+    exists = connection.execute(
+        "select count(*) from information_schema.tables where table_schema = ? and table_name = ?",
+        [schema, table],
+    ).fetchone()[0]
+    if replace:
+        connection.execute(f"create or replace table {target} as select * from read_parquet('{path}')")
+    elif exists:
+        connection.execute(f"insert into {target} by name select * from read_parquet('{path}')")
+    else:
+        connection.execute(f"create table {target} as select * from read_parquet('{path}')")
+
+
+def _finish_python(runner, name, future, started, stages):
+    """Write a finished worker's output into the database; returns its ModelResult."""
+    model = runner.project.models[name]
+    try:
+        outcome = future.result()
+    except Exception as error:
+        # The worker process died (e.g. killed for running out of memory)
+        detail = ''.join(traceback.format_exception_only(type(error), error)).strip()
+        return ModelResult(name, 'error', time.perf_counter() - started, error=detail, stages=stages)
+
+    if outcome['log']:
+        print(outcome['log'], end='')
+    stages.update(outcome['stages'])
+    if outcome['status'] != 'success':
+        return ModelResult(name, 'error', time.perf_counter() - started, error=outcome['error'], stages=stages)
+
+    try:
+        runner._ensure_schema(model)
+        materialized = outcome['config'].get('materialized', 'table')
+        materialized = 'table' if materialized == 'view' else materialized
+        with timed(stages, 'write'):
+            runner._materialize(model, f"select * from read_parquet('{outcome['output']}')", materialized,
+                                outcome['config'])
+            # Seeded cache tables replace their originals; other saved tables (RUN_METRICS) are appended
+            seeded = set(outcome['seeded'])
+            for schema, table, path in outcome['tables']:
+                _append_table(runner.connection, schema, table, path, replace=(schema, table) in seeded)
+            for schema, table in outcome['dropped']:
+                runner.connection.execute(f"drop table if exists {quote(schema)}.{quote(table)}")
+        with timed(stages, 'count'):
+            rows = runner.connection.cursor().execute(
+                f"select count(*) from {runner.relation_name(name)}"
+            ).fetchone()[0]
+    except Exception as error:
+        detail = ''.join(traceback.format_exception_only(type(error), error)).strip()
+        return ModelResult(name, 'error', time.perf_counter() - started, error=detail, stages=stages)
+    return ModelResult(name, 'success', time.perf_counter() - started, rows=rows,
+                       materialized=materialized, stages=stages)
+
+
+def run_parallel(runner, order, workers, memory_budget_mb=None, fail_fast=False, verbose=True):
+    """
+    Run `order` (names in dependency order) with up to `workers` Python models at once.
+
+    Returns ModelResults in completion order; dependents of failures are skipped.
+    """
+    project = runner.project
+    names = set(order)
+    python_models = [name for name in order if project.models[name].language == 'python']
+    estimates = memory_estimates(runner, python_models)
+    if memory_budget_mb is None:
+        available = available_memory_mb()
+        memory_budget_mb = available * BUDGET_SHARE if available else float('inf')
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    pending, running = list(order), {}
+    finished, failed, results = set(), set(), []
+    reserved, stop = 0.0, False
+
+    def record(result):
+        nonlocal stop
+        finished.add(result.name)
+        if result.status != 'success':
+            failed.add(result.name)
+        results.append(result)
+        if verbose:
+            runner._report(len(results), len(order), result)
+        if fail_fast and result.status == 'error':
+            stop = True
+
+    handoff_dir = tempfile.mkdtemp(prefix='beer_analysis_handoff_')
+    handoff = Handoff(runner, handoff_dir)
+    context = multiprocessing.get_context('spawn')
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            while (pending and not stop) or running:
+                for future in [future for future in running if future.done()]:
+                    name, estimate, started, stages = running.pop(future)
+                    reserved -= estimate
+                    record(_finish_python(runner, name, future, started, stages))
+
+                progressed = False
+                for name in list(pending) if not stop else []:
+                    upstream = project.upstream(name)
+                    blocked = [ref for ref in upstream if ref in failed]
+                    if blocked:
+                        pending.remove(name)
+                        record(ModelResult(name, 'skipped', error=f"upstream failed: {', '.join(blocked)}"))
+                        progressed = True
+                        continue
+                    if any(ref in names and ref not in finished for ref in upstream):
+                        continue
+
+                    model = project.models[name]
+                    if model.language == 'python':
+                        estimate = estimates[name]
+                        if len(running) >= workers or (running and reserved + estimate > memory_budget_mb):
+                            continue
+                        pending.remove(name)
+                        progressed = True
+                        stages, started = {}, time.perf_counter()
+                        try:
+                            with timed(stages, 'export'):
+                                task = python_task(runner, model, handoff, handoff_dir, threads)
+                            future = pool.submit(run_python_task, task)
+                        except Exception as error:
+                            detail = ''.join(traceback.format_exception_only(type(error), error)).strip()
+                            record(ModelResult(name, 'error', time.perf_counter() - started, error=detail,
+                                               stages=stages))
+                            continue
+                        running[future] = (name, estimate, started, stages)
+                        reserved += estimate
+                    else:
+                        # One SQL model at a time, then collect finished workers again
+                        pending.remove(name)
+                        record(runner.run_model(name))
+                        progressed = True
+                        break
+
+                if not progressed and running:
+                    wait(list(running), return_when=FIRST_COMPLETED)
+                elif not progressed and pending and not stop:
+                    raise RuntimeError(f"No runnable model among: {', '.join(pending)}")
+    finally:
+        shutil.rmtree(handoff_dir, ignore_errors=True)
+    return results
@@ -0,0 +1,303 @@
+"""
+Typo-tolerant lookup and autocomplete over the beer and brewery names.
+
+The ranking and recommendation outputs are keyed by the exact beer_name /
+brewery_name strings of stg_beer_reviews; a user types "plinny the elder" or
+"weihenstephaner". `NameIndex` resolves such input without scanning the
+catalogue:
+- names are normalized (case, accents and punctuation folded) and broken into
+  word trigrams padded like pg_trgm ("  p", " pl", "pli", ..., "er "), with a
+  posting list of name ids per trigram; a lookup counts the trigrams each name
+  shares with the query in one `np.bincount` over the query's posting lists and
+  scores trigram similarity shared / (query + name - shared), so misspellings,
+  missing words and reordered words still match
+- every word-start suffix of a normalized name ("pliny the elder", "the elder",
+  "elder") is kept in one sorted key list, so autocomplete on any word prefix is
+  two bisections and a top-k over the slice
+Ties are broken by review count, so the popular beer wins among near-identical
+names.
+
+The index is built from int_beer_stats (one row per beer, with review_count and
+the max_review_time watermark) and updated incrementally: `update_from_relation`
+reads only the rows reviewed after the index's watermark, adds the new names to
+the postings and applies the review count changes of known rows (per beer_key)
+to their names.
+
+    index = NameIndex.from_relation(session.table("BEER_REVIEWS.INTERMEDIATE.INT_BEER_STATS"))
+    index.lookup("plinny the eldr")          # best matches with similarity
+    index.complete("weihen", kind='brewery')  # autocomplete by popularity
+    index.resolve("two hearted")             # best beer_name or None
+    index.resolve_exact("Pliny The Elder")   # same name up to case/punctuation, or None
+
+`resolve` guesses and suits interactive lookups, where a person sees the
+match; anything that tags data unattended should use `resolve_exact`.
+"""
+
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+KINDS = ('beer', 'brewery')
+NAME_COLUMNS = ['BEER_KEY', 'BEER_NAME', 'BREWERY_NAME', 'REVIEW_COUNT', 'MAX_REVIEW_TIME']
+DEFAULT_MIN_SIMILARITY = 0.3
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_name(name):
+    """Casefold, strip accents and replace punctuation by single spaces."""
+    text = unicodedata.normalize('NFKD', str(name).casefold())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def name_trigrams(normalized):
+    """Distinct trigrams of every word, padded with two spaces in front and one behind."""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def name_similarity(a, b):
+    """Trigram similarity of two names (1 for names equal after normalization)."""
+    grams_a, grams_b = name_trigrams(normalize_name(a)), name_trigrams(normalize_name(b))
+    union = len(grams_a | grams_b)
+    return len(grams_a & grams_b) / union if union else 0.0
+
+
+def _word_suffixes(normalized):
+    """The name from every word start: 'pliny the elder' -> itself, 'the elder', 'elder'."""
+    starts = [0] + [match.end() for match in re.finditer(' ', normalized)]
+    return [normalized[start:] for start in starts]
+
+
+class NameIndex:
+    """
+    Trigram and prefix index over beer and brewery names.
+
+    Build it with `from_beer_stats(df)` (columns as in int_beer_stats, any case) or
+    `from_relation(relation)`; grow it with `update_from_relation` or `add`.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.kinds = []
+        self.watermark = None
+        self._review_counts = []
+        self._sizes = []
+        self._ids = {}
+        self._row_counts = {}
+        self._postings = {}
+        self._posting_arrays = {}
+        self._prefix_keys = []
+        self._prefix_ids = []
+        self._pending_keys = []
+        self._arrays = None
+
+    @classmethod
+    def from_beer_stats(cls, df):
+        index = cls()
+        index.add_beer_stats(df)
+        return index
+
+    @classmethod
+    def from_relation(cls, relation):
+        """Load only the name columns from an int_beer_stats relation."""
+        return cls.from_beer_stats(relation.select(*NAME_COLUMNS).to_pandas())
+
+    def __len__(self):
+        return len(self.names)
+
+    # -- building ----------------------------------------------------------
+
+    def _name_id(self, name, kind):
+        """Id of a name, indexing it first if it is new."""
+        key = (kind, name)
+        if key in self._ids:
+            return self._ids[key]
+        normalized = normalize_name(name)
+        grams = name_trigrams(normalized)
+        name_id = len(self.names)
+        self._ids[key] = name_id
+        self.names.append(name)
+        self.kinds.append(kind)
+        self._review_counts.append(0)
+        self._sizes.append(len(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(name_id)
+            self._posting_arrays.pop(gram, None)
+        self._pending_keys.extend((suffix, name_id) for suffix in _word_suffixes(normalized))
+        return name_id
+
+    def _finish_batch(self):
+        new_keys, self._pending_keys = sorted(self._pending_keys), []
+        if len(new_keys) > len(self._prefix_keys) // 8:
+            # First build or a large batch: one merge beats many insertions
+            pairs = sorted(list(zip(self._prefix_keys, self._prefix_ids)) + new_keys)
+            self._prefix_keys = [key for key, _ in pairs]
+            self._prefix_ids = [name_id for _, name_id in pairs]
+        else:
+            for suffix, name_id in new_keys:
+                position = bisect.bisect_right(self._prefix_keys, suffix)
+                self._prefix_keys.insert(position, suffix)
+                self._prefix_ids.insert(position, name_id)
+        self._arrays = None
+
+    def add(self, names, kind='beer', review_counts=None):
+        """Index extra names of one kind (adding `review_counts` to their popularity); returns the number of new names."""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown name kind: {kind} (expected one of {KINDS})")
+        before = len(self.names)
+        counts = [0] * len(names) if review_counts is None else review_counts
+        for name, count in zip(names, counts):
+            if not pd.isna(name):
+                self._review_counts[self._name_id(name, kind)] += int(count)
+        self._finish_batch()
+        return len(self.names) - before
+
+    def add_beer_stats(self, df):
+        """
+        Fold int_beer_stats rows into the index; returns the number of new names.
+
+        Rows are keyed by beer_key: a row seen before only adds the change of its
+        review_count to its beer and brewery names.
+        """
+        df = df.copy()
+        df.columns = [str(column).upper() for column in df.columns]
+        before = len(self.names)
+        counts = pd.to_numeric(df['REVIEW_COUNT'], errors='coerce').fillna(0).astype(np.int64)
+        keys = df['BEER_KEY'] if 'BEER_KEY' in df.columns else pd.Series([None] * len(df), index=df.index)
+        for key, beer, brewery, count in zip(keys, df['BEER_NAME'], df['BREWERY_NAME'], counts):
+            delta = count - self._row_counts.get(key, 0)
+            if key is not None:
+                self._row_counts[key] = count
+            for name, kind in ((beer, 'beer'), (brewery, 'brewery')):
+                if not pd.isna(name):
+                    self._review_counts[self._name_id(name, kind)] += int(delta)
+
+        if 'MAX_REVIEW_TIME' in df.columns and len(df):
+            latest = pd.to_numeric(df['MAX_REVIEW_TIME'], errors='coerce').max()
+            if not pd.isna(latest) and (self.watermark is None or latest > self.watermark):
+                self.watermark = int(latest)
+        self._finish_batch()
+        return len(self.names) - before
+
+    def update_from_relation(self, relation):
+        """Fold in the int_beer_stats rows reviewed after the watermark; returns the number of new names."""
+        rows = relation.select(*NAME_COLUMNS)
+        if self.watermark is not None:
+            rows = rows.filter(f"MAX_REVIEW_TIME > {int(self.watermark)}")
+        return self.add_beer_stats(rows.to_pandas())
+
+    # -- queries -----------------------------------------------------------
+
+    def _cached_arrays(self):
+        """Trigram counts, review counts and kind codes per name, and the prefix ids (rebuilt after adds)."""
+        if self._arrays is None:
+            self._arrays = (
+                np.asarray(self._sizes, dtype=np.int64),
+                np.asarray(self._review_counts, dtype=np.int64),
+                np.asarray([KINDS.index(kind) for kind in self.kinds], dtype=np.int8),
+                np.asarray(self._prefix_ids, dtype=np.int64),
+            )
+        return self._arrays
+
+    def _posting(self, gram):
+        if gram not in self._posting_arrays:
+            self._posting_arrays[gram] = np.asarray(self._postings[gram], dtype=np.int64)
+        return self._posting_arrays[gram]
+
+    def _of_kind(self, ids, kind):
+        if kind is None:
+            return ids
+        if kind not in KINDS:
+            raise ValueError(f"Unknown name kind: {kind} (expected one of {KINDS})")
+        return ids[self._cached_arrays()[2][ids] == KINDS.index(kind)]
+
+    def _top(self, ids, scores, k):
+        """The k ids with the highest (score, review count), best first."""
+        review_counts = self._cached_arrays()[1][ids]
+        order = np.lexsort((ids, -review_counts, -scores))[:k]
+        return ids[order], scores[order]
+
+    def search(self, text, kind=None, k=5, min_similarity=DEFAULT_MIN_SIMILARITY):
+        """
+        Ids and trigram similarities of the k names most similar to `text`, best first.
+
+        kind: 'beer', 'brewery' or None for both
+        """
+        query = name_trigrams(normalize_name(text))
+        grams = [gram for gram in query if gram in self._postings]
+        if not grams:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        sizes = self._cached_arrays()[0]
+        shared = np.bincount(np.concatenate([self._posting(gram) for gram in grams]), minlength=len(sizes))
+        # similarity >= m needs shared >= m * len(query): prune before scoring
+        min_shared = max(1, int(np.ceil(min_similarity * len(query) - 1e-9)))
+        ids = self._of_kind(np.flatnonzero(shared >= min_shared), kind)
+        similarity = shared[ids] / (len(query) + sizes[ids] - shared[ids])
+        keep = similarity >= min_similarity
+        return self._top(ids[keep], similarity[keep], k)
+
+    def complete_ids(self, prefix, kind=None, k=10):
+        """Ids of the k most reviewed names with a word starting with `prefix`."""
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return np.empty(0, dtype=np.int64)
+        start = bisect.bisect_left(self._prefix_keys, prefix)
+        end = bisect.bisect_left(self._prefix_keys, prefix + '\uffff', start)
+        ids = self._of_kind(self._cached_arrays()[3][start:end], kind)
+        if len(ids) > 4 * k:
+            # Short prefixes match much of the catalogue: keep only the most reviewed entries
+            # (ties included) before deduplicating names with several matching words
+            review_counts = self._cached_arrays()[1][ids]
+            threshold = np.partition(review_counts, len(ids) - 4 * k)[len(ids) - 4 * k]
+            ids = ids[review_counts >= threshold]
+        ids = np.unique(ids)
+        return self._top(ids, np.zeros(len(ids)), k)[0]
+
+    def _frame(self, ids, similarity=None):
+        result = pd.DataFrame({
+            'name': [self.names[i] for i in ids],
+            'kind': [self.kinds[i] for i in ids],
+            'review_count': self._cached_arrays()[1][ids],
+        })
+        if similarity is not None:
+            result['similarity'] = similarity
+        result['rank'] = np.arange(1, len(ids) + 1)
+        return result
+
+    def lookup(self, text, kind=None, k=5, min_similarity=DEFAULT_MIN_SIMILARITY):
+        """Typo-tolerant matches for `text` as a DataFrame (name, kind, review_count, similarity, rank)."""
+        ids, similarity = self.search(text, kind, k, min_similarity)
+        return self._frame(ids, similarity)
+
+    def complete(self, prefix, kind=None, k=10):
+        """Autocomplete suggestions for `prefix` as a DataFrame (name, kind, review_count, rank)."""
+        return self._frame(self.complete_ids(prefix, kind, k))
+
+    def resolve(self, text, kind='beer', min_similarity=DEFAULT_MIN_SIMILARITY):
+        """The indexed name `text` refers to (exact names first), or None when nothing is similar enough."""
+        if (kind, text) in self._ids:
+            return text
+        ids, _ = self.search(text, kind, 1, min_similarity)
+        return self.names[ids[0]] if len(ids) else None
+
+    def resolve_exact(self, text, kind='beer'):
+        """
+        The indexed name equal to `text` after normalization (most reviewed first), or None.
+
+        Unlike `resolve` this never guesses: 'Veritas 005' does not resolve to
+        'Veritas 004', nor 'Two Hearted Ale' to 'Two Hearted Ale - Nitro'.
+        """
+        if (kind, text) in self._ids:
+            return text
+        normalized = normalize_name(text)
+        # Equal normalized names share every trigram; reordered words do too, hence the check
+        ids, _ = self.search(text, kind, len(self), 1.0)
+        return next((self.names[i] for i in ids if normalize_name(self.names[i]) == normalized), None)
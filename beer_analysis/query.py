@@ -0,0 +1,239 @@
+"""
+Pooled, concurrent query runner for scripts that read from the warehouse.
+
+Connections come from a factory (a zero-argument callable), so the same script
+runs against Snowflake or a local DuckDB database:
+- `snowflake_from_env()` reads SNOWFLAKE_ACCOUNT / _USER / _PASSWORD / ... from
+  the environment - no credentials in source code
+- `duckdb_local(path)` opens the DuckDB file written by `python -m beer_analysis.local run`
+
+`QueryRunner.run({name: sql, ...})` executes independent queries on a thread pool,
+one pooled connection per query, and fetches each result as Arrow batches. The
+warehouse does the work while the threads wait on the network, so the wall time
+is close to the slowest query rather than the sum of all of them.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pyarrow as pa
+
+DEFAULT_BATCH_ROWS = 100_000
+
+# Environment variable -> snowflake.connector.connect() argument
+SNOWFLAKE_ENV = {
+    'SNOWFLAKE_ACCOUNT': 'account',
+    'SNOWFLAKE_USER': 'user',
+    'SNOWFLAKE_PASSWORD': 'password',
+    'SNOWFLAKE_AUTHENTICATOR': 'authenticator',
+    'SNOWFLAKE_ROLE': 'role',
+    'SNOWFLAKE_WAREHOUSE': 'warehouse',
+    'SNOWFLAKE_DATABASE': 'database',
+    'SNOWFLAKE_SCHEMA': 'schema',
+}
+SNOWFLAKE_DEFAULTS = {
+    'database': 'BEER_REVIEWS',
+    'schema': 'PREP',
+    'warehouse': 'COMPUTE_WH',
+}
+
+
+def snowflake_from_env(environ=None, **overrides):
+    """
+    Connection factory for Snowflake configured from SNOWFLAKE_* environment variables.
+
+    SNOWFLAKE_ACCOUNT and SNOWFLAKE_USER are required; database, schema and
+    warehouse default to the project's BEER_REVIEWS / PREP / COMPUTE_WH.
+    Keyword overrides win over the environment.
+    """
+    environ = os.environ if environ is None else environ
+    params = dict(SNOWFLAKE_DEFAULTS)
+    params.update({arg: environ[var] for var, arg in SNOWFLAKE_ENV.items() if environ.get(var)})
+    params.update(overrides)
+    missing = [var for var, arg in SNOWFLAKE_ENV.items() if arg in ('account', 'user') and not params.get(arg)]
+    if missing:
+        raise KeyError(f"Missing Snowflake settings: set {', '.join(missing)}")
+
+    def connect():
+        import snowflake.connector
+        return snowflake.connector.connect(**params)
+
+    connect.description = f"Snowflake {params['account']} ({params['database']}.{params['schema']})"
+    return connect
+
+
+def duckdb_local(database, read_only=True):
+    """
+    Connection factory for a local DuckDB database file.
+
+    All connections share one database instance (DuckDB allows a single writer
+    process per file); each call returns an independent cursor of it.
+    `factory.close()` closes that instance (ConnectionPool.close calls it).
+    """
+    import duckdb
+
+    base = duckdb.connect(database, read_only=read_only)
+    base.execute("SET TimeZone = 'UTC'")
+    lock = threading.Lock()
+
+    def connect():
+        with lock:
+            return base.cursor()
+
+    connect.description = f"DuckDB {database}"
+    connect.close = base.close
+    return connect
+
+
+class ConnectionPool:
+    """
+    A fixed-size pool of connections created lazily from `factory`.
+
+    Use `with pool.connection() as conn:`; the connection goes back to the pool
+    afterwards, so a script opens at most `size` connections in total.
+    """
+
+    def __init__(self, factory, size=4):
+        self.factory = factory
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._all = []
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if not create:
+            return self._idle.get()
+        try:
+            conn = self.factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        with self._lock:
+            connections, self._all = self._all, []
+            self._created = 0
+        self._idle = queue.LifoQueue()
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        # Factories holding a shared handle (duckdb_local) release it too
+        close_factory = getattr(self.factory, 'close', None)
+        if close_factory is not None:
+            close_factory()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def fetch_arrow(conn, sql, batch_rows=DEFAULT_BATCH_ROWS):
+    """
+    Execute `sql` and return the result as a pyarrow Table, read batch by batch.
+
+    Works with Snowflake connections (cursor.fetch_arrow_batches) and DuckDB
+    connections/cursors (fetch_record_batch).
+    """
+    if hasattr(conn, 'fetch_record_batch') or type(conn).__module__.startswith('duckdb'):
+        reader = conn.execute(sql).fetch_record_batch(batch_rows)
+        return pa.Table.from_batches(list(reader), schema=reader.schema)
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql)
+        # The Snowflake connector yields each result chunk as a pyarrow Table
+        batches = [
+            batch if isinstance(batch, pa.Table) else pa.Table.from_batches([batch])
+            for batch in cursor.fetch_arrow_batches()
+        ]
+        if batches:
+            return pa.concat_tables(batches)
+        # Snowflake yields no batches for an empty result - keep the column names
+        names = [column[0] for column in cursor.description or []]
+        return pa.table({name: pa.array([], type=pa.null()) for name in names})
+    finally:
+        cursor.close()
+
+
+class QueryResult:
+    def __init__(self, name, table=None, seconds=0.0, error=None):
+        self.name = name
+        self.table = table
+        self.seconds = seconds
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def to_pandas(self, uppercase=True):
+        """Result as a pandas DataFrame (None if the query failed)."""
+        if self.table is None:
+            return None
+        df = self.table.to_pandas()
+        if uppercase:
+            df.columns = [str(column).upper() for column in df.columns]
+        return df
+
+
+class QueryRunner:
+    """Run independent queries concurrently over a ConnectionPool."""
+
+    def __init__(self, pool, batch_rows=DEFAULT_BATCH_ROWS):
+        self.pool = pool
+        self.batch_rows = batch_rows
+
+    def _execute(self, name, sql):
+        start = time.perf_counter()
+        try:
+            with self.pool.connection() as conn:
+                table = fetch_arrow(conn, sql, self.batch_rows)
+            return QueryResult(name, table, time.perf_counter() - start)
+        except Exception as error:
+            return QueryResult(name, seconds=time.perf_counter() - start, error=error)
+
+    def run(self, queries):
+        """
+        Execute {name: sql} concurrently; returns {name: QueryResult} in the same order.
+
+        A failing query does not cancel the others - check `result.ok`.
+        """
+        if not queries:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.pool.size, len(queries))) as executor:
+            futures = {name: executor.submit(self._execute, name, sql) for name, sql in queries.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+    def run_one(self, sql, name='query'):
+        return self._execute(name, sql)
@@ -0,0 +1,250 @@
+"""
+In-process recommendation index for filtered top-N queries (Question 2).
+
+The int_reco_* models rank every beer once and keep a fixed top 3. An app needs
+"top N beers for style S, ABV between A and B, at least R reviews, ranked by
+method M" on demand. `RecommendationIndex` loads the per-beer aggregate
+(int_beer_stats) into flat numpy arrays:
+- beers are partitioned by style and sorted by ABV inside each partition, so a
+  style + ABV range is one `searchsorted` per style (beers without ABV sit at
+  the end of their partition and only match queries without an ABV range)
+- every ranking method's full ordering is precomputed once as a rank position,
+  so a query is a slice, a mask on the review count and a partial sort
+
+Methods use the same scores as the SQL strategies:
+- highest_overall: avg overall rating, then review count (int_reco_highest_overall)
+- balanced:        balanced_score, weakest dimension, review count over complete
+                   reviews (int_reco_balanced_excellence)
+- confidence:      avg rating * ln(review count) (int_reco_statistical_confidence)
+- diversity:       best beer of each style by overall rating, styles ordered by that
+                   rating, composite score and review count; beers without a style
+                   do not take part (int_reco_style_diversity)
+"""
+
+import numpy as np
+import pandas as pd
+
+METHODS = ('highest_overall', 'balanced', 'confidence', 'diversity')
+
+# Minimum review counts used by the SQL strategies
+DEFAULT_MIN_REVIEWS = {
+    'highest_overall': 10,
+    'balanced': 15,
+    'confidence': 20,
+    'diversity': 10,
+}
+
+DIMENSIONS = ['aroma', 'taste', 'appearance', 'palate']
+
+INDEX_COLUMNS = (
+    ['BEER_NAME', 'BREWERY_NAME', 'BEER_STYLE', 'BEER_ABV', 'REVIEW_OVERALL_COUNT',
+     'REVIEW_OVERALL_SUM', 'REVIEW_OVERALL_SUM_SQ', 'COMPLETE_COUNT', 'COMPLETE_OVERALL_SUM']
+    + [f'REVIEW_{dim.upper()}_COUNT' for dim in DIMENSIONS]
+    + [f'REVIEW_{dim.upper()}_SUM' for dim in DIMENSIONS]
+    + [f'COMPLETE_{dim.upper()}_SUM' for dim in DIMENSIONS]
+)
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def _rank_positions(*keys):
+    """
+    Position of every beer in the ordering by `keys` (all descending, NaN last).
+
+    The last tie-break is the beer's position in the index, so rankings are
+    deterministic.
+    """
+    columns = [np.nan_to_num(-np.asarray(key, dtype='float64'), nan=np.inf) for key in keys]
+    order = np.lexsort([np.arange(len(columns[0]))] + columns[::-1])
+    positions = np.empty(len(order), dtype=np.int64)
+    positions[order] = np.arange(len(order))
+    return positions
+
+
+class RecommendationIndex:
+    """
+    Array-backed index over per-beer aggregates.
+
+    Build it with `from_beer_stats(df)` (columns as in int_beer_stats, any case)
+    or `from_relation(dbt_or_snowpark_relation)`, then call `recommend(...)`.
+    """
+
+    def __init__(self, frame):
+        frame = frame.copy()
+        frame.columns = [str(column).upper() for column in frame.columns]
+        has_style = frame['BEER_STYLE'].notna().to_numpy()
+        frame['BEER_STYLE'] = frame['BEER_STYLE'].fillna('Unknown')
+        abv = pd.to_numeric(frame['BEER_ABV'], errors='coerce').to_numpy('float64')
+
+        # Partition by style, ABV ascending inside each partition (NaN ABV last)
+        style_codes, styles = pd.factorize(frame['BEER_STYLE'], sort=True)
+        order = np.lexsort([np.isnan(abv), abv, style_codes])
+        frame = frame.iloc[order].reset_index(drop=True)
+        self.styles = np.asarray(styles, dtype=object)
+        self._style_lookup = {style: code for code, style in enumerate(self.styles)}
+        self.style_codes = style_codes[order]
+        self.has_style = has_style[order]
+        self.abv = abv[order]
+        self.offsets = np.searchsorted(self.style_codes, np.arange(len(self.styles) + 1))
+        # End of the beers with a known ABV in each partition
+        self.abv_ends = np.array([
+            start + np.count_nonzero(~np.isnan(self.abv[start:end]))
+            for start, end in zip(self.offsets[:-1], self.offsets[1:])
+        ], dtype=np.int64)
+
+        self.beer_names = frame['BEER_NAME'].to_numpy(object)
+        self.brewery_names = frame['BREWERY_NAME'].to_numpy(object)
+        self._compute_scores(frame)
+
+    @classmethod
+    def from_beer_stats(cls, df):
+        return cls(df)
+
+    @classmethod
+    def from_relation(cls, relation):
+        """Load only the columns the index needs from an int_beer_stats relation."""
+        return cls(relation.select(*INDEX_COLUMNS).to_pandas())
+
+    def __len__(self):
+        return len(self.abv)
+
+    def _compute_scores(self, frame):
+        def column(name):
+            return pd.to_numeric(frame[name], errors='coerce').to_numpy('float64')
+
+        # highest_overall / confidence: all reviews with an overall rating
+        self.review_count = column('REVIEW_OVERALL_COUNT')
+        self.avg_overall = _ratio(column('REVIEW_OVERALL_SUM'), self.review_count)
+        variance = _ratio(
+            column('REVIEW_OVERALL_SUM_SQ') - column('REVIEW_OVERALL_SUM') ** 2 / np.maximum(self.review_count, 1),
+            self.review_count - 1,
+        )
+        self.rating_stddev = np.sqrt(np.maximum(variance, 0))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.confidence_score = self.avg_overall * np.log(self.review_count)
+
+        # balanced: complete reviews only
+        self.complete_count = column('COMPLETE_COUNT')
+        complete_avgs = np.column_stack([
+            _ratio(column(f'COMPLETE_{dim.upper()}_SUM'), self.complete_count) for dim in DIMENSIONS
+        ])
+        self.balanced_score = complete_avgs.mean(axis=1)
+        self.min_dimension_score = complete_avgs.min(axis=1)
+        self.dimension_consistency = complete_avgs.std(axis=1)
+
+        # diversity: composite of the per-component averages
+        avgs = np.column_stack([
+            _ratio(column(f'REVIEW_{dim.upper()}_SUM'), column(f'REVIEW_{dim.upper()}_COUNT')) for dim in DIMENSIONS
+        ])
+        self.composite_score = avgs.mean(axis=1)
+
+        self._positions = {
+            'highest_overall': _rank_positions(self.avg_overall, self.review_count),
+            'balanced': _rank_positions(self.balanced_score, self.min_dimension_score, self.complete_count),
+            'confidence': _rank_positions(self.confidence_score),
+            'diversity': _rank_positions(self.avg_overall, self.composite_score, self.review_count),
+        }
+        self._orders = {method: np.argsort(positions) for method, positions in self._positions.items()}
+        self._counts = {
+            'highest_overall': self.review_count,
+            'balanced': self.complete_count,
+            'confidence': self.review_count,
+            'diversity': self.review_count,
+        }
+
+    # -- queries -----------------------------------------------------------
+
+    def _candidates(self, styles, abv_min, abv_max):
+        if styles is None:
+            codes = range(len(self.styles))
+        else:
+            styles = [styles] if isinstance(styles, str) else styles
+            codes = [self._style_lookup[style] for style in styles if style in self._style_lookup]
+
+        if abv_min is None and abv_max is None:
+            ranges = [(self.offsets[code], self.offsets[code + 1]) for code in codes]
+        else:
+            low = -np.inf if abv_min is None else abv_min
+            high = np.inf if abv_max is None else abv_max
+            ranges = []
+            for code in codes:
+                start, end = self.offsets[code], self.abv_ends[code]
+                postings = self.abv[start:end]
+                ranges.append((start + np.searchsorted(postings, low, side='left'),
+                               start + np.searchsorted(postings, high, side='right')))
+
+        ranges = [(start, end) for start, end in ranges if end > start]
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        if len(ranges) == 1:
+            return np.arange(*ranges[0])
+        return np.concatenate([np.arange(start, end) for start, end in ranges])
+
+    def query(self, method='highest_overall', n=3, styles=None, abv_min=None, abv_max=None, min_reviews=None):
+        """
+        Row ids of the top `n` beers for `method`, best first.
+
+        styles: a style name, a list of them, or None for all styles
+        abv_min / abv_max: inclusive ABV bounds (None = unbounded)
+        min_reviews: defaults to the SQL strategy's threshold
+        """
+        if method not in self._positions:
+            raise ValueError(f"Unknown ranking method: {method} (expected one of {METHODS})")
+        if min_reviews is None:
+            min_reviews = DEFAULT_MIN_REVIEWS[method]
+
+        unfiltered = styles is None and abv_min is None and abv_max is None
+        if unfiltered and method != 'diversity':
+            # Walk the precomputed ordering
+            order = self._orders[method]
+            return order[self._counts[method][order] >= min_reviews][:n]
+
+        if unfiltered:
+            ids = self._orders['highest_overall']
+            ids = ids[self.review_count[ids] >= min_reviews]
+        else:
+            ids = self._candidates(styles, abv_min, abv_max)
+            ids = ids[self._counts[method][ids] >= min_reviews]
+
+        if method == 'diversity':
+            # Best beer of each style (by overall rating), then rank those beers
+            ids = ids[self.has_style[ids]]
+            if not unfiltered:
+                ids = ids[np.argsort(self._positions['highest_overall'][ids], kind='stable')]
+            _, first = np.unique(self.style_codes[ids], return_index=True)
+            ids = ids[first]
+
+        positions = self._positions[method][ids]
+        if len(ids) > n:
+            keep = np.argpartition(positions, n)[:n]
+            ids, positions = ids[keep], positions[keep]
+        return ids[np.argsort(positions)]
+
+    def recommend(self, method='highest_overall', n=3, styles=None, abv_min=None, abv_max=None, min_reviews=None):
+        """Top-N recommendations as a DataFrame with the method's scores and a 1-based rank."""
+        ids = self.query(method, n, styles, abv_min, abv_max, min_reviews)
+        result = pd.DataFrame({
+            'beer_name': self.beer_names[ids],
+            'brewery_name': self.brewery_names[ids],
+            'beer_style': self.styles[self.style_codes[ids]],
+            'beer_abv': self.abv[ids],
+        })
+        if method == 'balanced':
+            result['balanced_score'] = self.balanced_score[ids]
+            result['min_dimension_score'] = self.min_dimension_score[ids]
+            result['dimension_consistency'] = self.dimension_consistency[ids]
+            result['review_count'] = self.complete_count[ids].astype(np.int64)
+        else:
+            result['avg_overall_rating'] = self.avg_overall[ids]
+            result['review_count'] = self.review_count[ids].astype(np.int64)
+            if method == 'confidence':
+                result['rating_stddev'] = self.rating_stddev[ids]
+                result['confidence_score'] = self.confidence_score[ids]
+            elif method == 'diversity':
+                result['composite_score'] = self.composite_score[ids]
+        result['rank'] = np.arange(1, len(ids) + 1)
+        result['ranking_method'] = method
+        return result
@@ -0,0 +1,309 @@
+"""
+Streaming OLS engine for the feature importance models (Question 3).
+
+Regression: overall_rating = β₀ + β₁(aroma) + β₂(taste) + β₃(appearance) + β₄(palate) + ε
+
+Instead of building a dense design matrix, the engine reads the input in
+batches and accumulates the Gram matrix Z'Z of Z = [1, X, y]. That single
+(p+2) x (p+2) matrix holds n, the column sums, X'X, X'y and y'y, and every
+output of the regression is derived from it:
+- coefficients and intercept (normal equations on the centered moments)
+- standardized coefficients (coefficient x population std of the feature)
+- standard errors, t-statistics and R-squared
+- simple correlations between each feature and the target
+
+Memory is constant in the number of rows, and Gram matrices from different
+batches (or different warehouses) can simply be added together. With
+`n_blocks` set, rows are also spread at random over that many per-block Gram
+matrices, which is what beer_analysis.bootstrap resamples.
+"""
+
+import numpy as np
+import pandas as pd
+
+from beer_analysis.batches import batch_column, iter_arrow_batches
+from beer_analysis.instrumentation import stage
+
+FEATURE_COLS = ['REVIEW_AROMA', 'REVIEW_TASTE', 'REVIEW_APPEARANCE', 'REVIEW_PALATE']
+TARGET_COL = 'REVIEW_OVERALL'
+
+
+class GramAccumulator:
+    """
+    Running Z'Z for Z = [1, X, y].
+
+    Row/column 0 is the intercept, 1..p are the features and p+1 is the target,
+    so gram[0, 0] is the sample size and gram[0, 1:] are the column sums.
+
+    n_blocks > 0 additionally keeps `block_grams` (n_blocks x (p+2) x (p+2)):
+    every row is assigned to a uniformly random block, so the blocks are i.i.d.
+    and their sum is `gram`.
+    """
+
+    def __init__(self, n_features, n_blocks=0, seed=0):
+        self.n_features = n_features
+        self.gram = np.zeros((n_features + 2, n_features + 2))
+        self.n_blocks = n_blocks
+        self.block_grams = np.zeros((n_blocks, n_features + 2, n_features + 2)) if n_blocks else None
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def n(self):
+        return self.gram[0, 0]
+
+    def update(self, X, y, weights=None):
+        """Add a block of rows; `weights` are optional frequency weights."""
+        X = np.asarray(X, dtype=float).reshape(len(y), -1)
+        y = np.asarray(y, dtype=float)
+        Zt = np.empty((self.n_features + 2, len(y)))
+        Zt[0] = 1.0
+        Zt[1:-1] = X.T
+        Zt[-1] = y
+        return self._add(Zt, None if weights is None else np.asarray(weights, dtype=float))
+
+    def _add(self, Zt, weights=None):
+        # Z is kept transposed ((p+2) x n, one row per column of Z): Zt @ Zt.T runs
+        # over contiguous rows and is about twice as fast as Z.T @ Z
+        if weights is None:
+            self.gram += Zt @ Zt.T
+        else:
+            self.gram += (Zt * weights) @ Zt.T
+        if self.n_blocks:
+            self._update_blocks(Zt, weights)
+        return self
+
+    def _update_blocks(self, Zt, weights):
+        # One bincount per upper-triangle entry of Z'Z, summed per random block
+        blocks = self._rng.integers(self.n_blocks, size=Zt.shape[1])
+        WZt = Zt if weights is None else Zt * weights
+        size = Zt.shape[0]
+        for i in range(size):
+            for j in range(i, size):
+                sums = np.bincount(blocks, weights=WZt[i] * Zt[j], minlength=self.n_blocks)
+                self.block_grams[:, i, j] += sums
+                if i != j:
+                    self.block_grams[:, j, i] += sums
+
+    def update_frame(self, df, feature_cols, target_col, weight_col=None):
+        """Add the complete rows of a pandas batch."""
+        # Remove any rows with missing data to ensure clean regression
+        subset = feature_cols + [target_col] + ([weight_col] if weight_col else [])
+        clean_df = df.dropna(subset=subset)
+        weights = clean_df[weight_col].values if weight_col else None
+        return self.update(clean_df[feature_cols].values, clean_df[target_col].values, weights)
+
+    def update_arrow(self, batch, feature_cols, target_col):
+        """Add the complete rows of a pyarrow RecordBatch (nulls and NaNs are dropped)."""
+        import pyarrow as pa
+
+        Zt = np.empty((self.n_features + 2, batch.num_rows))
+        Zt[0] = 1.0
+        for row, name in enumerate(feature_cols + [target_col], start=1):
+            column = batch_column(batch, name)
+            if column.type != pa.float64():
+                # DECIMAL / integer columns (with nulls) come out as float64 with NaN
+                column = column.cast(pa.float64())
+            Zt[row] = column.to_numpy(zero_copy_only=False)
+        incomplete = np.isnan(Zt.sum(axis=0))
+        if incomplete.any():
+            Zt = Zt[:, ~incomplete]
+        return self._add(Zt)
+
+    def merge(self, other):
+        self.gram += other.gram
+        if self.n_blocks:
+            if other.n_blocks != self.n_blocks:
+                raise ValueError("Cannot merge accumulators with different n_blocks")
+            self.block_grams += other.block_grams
+        return self
+
+
+def stream_gram(relation, feature_cols=FEATURE_COLS, target_col=TARGET_COL, n_blocks=0, seed=0):
+    """
+    Accumulate Z'Z (and optionally per-block Grams) over a dbt relation one Arrow batch at a time.
+
+    Only one batch is held at a time, so memory depends on the batch size, not the table.
+    """
+    accumulator = GramAccumulator(len(feature_cols), n_blocks=n_blocks, seed=seed)
+    with stage('read') as read:
+        for batch in iter_arrow_batches(relation, feature_cols + [target_col]):
+            accumulator.update_arrow(read.input(batch), feature_cols, target_col)
+    return accumulator
+
+
+def gram_from_moments(row, columns=FEATURE_COLS + [TARGET_COL]):
+    """
+    Rebuild Z'Z from one row of pre-aggregated moments.
+
+    The row holds REVIEW_COUNT, SUM_<col> and CROSS_<a>__<b> (upper triangle),
+    as produced by the `gram_aggregates` macro. Lookups are case-insensitive
+    because Snowflake upper-cases unquoted identifiers.
+    """
+    values = {str(key).upper(): value for key, value in dict(row).items()}
+    names = [col.upper() for col in columns]
+    gram = np.zeros((len(names) + 1, len(names) + 1))
+
+    gram[0, 0] = float(values['REVIEW_COUNT'])
+    for i, a in enumerate(names, start=1):
+        gram[0, i] = gram[i, 0] = float(values[f'SUM_{a}'])
+        for j, b in enumerate(names[i - 1:], start=i):
+            gram[i, j] = gram[j, i] = float(values[f'CROSS_{a}__{b}'])
+    return gram
+
+
+def fit_from_gram(gram):
+    """
+    Solve OLS from a Gram matrix of [1, X, y].
+
+    Slopes come from the centered moments (better conditioned than the raw
+    normal equations); the intercept variance uses the block inverse
+    Var(β₀) = mse * (1/n + x̄' Sxx⁻¹ x̄).
+    """
+    gram = np.asarray(gram, dtype=float)
+    n = gram[0, 0]
+    means = gram[0, 1:] / n
+    # Centered cross-products of [X, y]: S = Σ(z - z̄)(z - z̄)'
+    centered = gram[1:, 1:] - n * np.outer(means, means)
+
+    sxx = centered[:-1, :-1]
+    sxy = centered[:-1, -1]
+    syy = centered[-1, -1]
+    x_means, y_mean = means[:-1], means[-1]
+    p = len(sxy)
+
+    sxx_inv = np.linalg.inv(sxx)
+    feature_coefficients = sxx_inv @ sxy
+    intercept = y_mean - x_means @ feature_coefficients
+
+    # R-squared = 1 - (SS_residual / SS_total)
+    ss_total = syy
+    ss_residual = max(syy - feature_coefficients @ sxy, 0.0)
+    r_squared = 1 - (ss_residual / ss_total)
+
+    # Standard errors and t-statistics
+    mse = ss_residual / (n - p - 1)
+    intercept_se = np.sqrt(mse * (1 / n + x_means @ sxx_inv @ x_means))
+    std_errors = np.concatenate([[intercept_se], np.sqrt(mse * np.diag(sxx_inv))])
+    coefficients = np.concatenate([[intercept], feature_coefficients])
+    t_stats = coefficients / std_errors
+
+    # Population std (ddof=0) matches np.std used for standardizing features
+    feature_std = np.sqrt(np.diag(sxx) / n)
+    correlations = sxy / np.sqrt(np.diag(sxx) * syy)
+
+    return {
+        'n': n,
+        'intercept': intercept,
+        'coefficients': coefficients,
+        'feature_coefficients': feature_coefficients,
+        'std_coefficients': feature_coefficients * feature_std,
+        'std_errors': std_errors,
+        't_stats': t_stats,
+        'r_squared': r_squared,
+        'mse': mse,
+        'correlations': correlations,
+    }
+
+
+def ranking_coefficients(fit, basis='standardized'):
+    """The coefficients feature importance is computed from for a given basis."""
+    if basis == 'standardized':
+        return fit['std_coefficients']
+    if basis == 'raw':
+        return fit['feature_coefficients']
+    raise ValueError(f"Unknown importance basis: {basis}")
+
+
+def importance_table(fit, feature_cols=FEATURE_COLS, basis='standardized', variance_explained=False):
+    """
+    Build the feature importance output table from a fit.
+
+    basis='standardized' ranks features on standardized coefficients,
+    basis='raw' ranks them on raw coefficients (the segment models).
+    `variance_explained` adds the R² percentage column used by the segment models.
+    """
+    coefficients = ranking_coefficients(fit, basis)
+
+    # Convert absolute coefficients to percentage importance
+    abs_importance = np.abs(coefficients)
+    importance_pct = (abs_importance / np.sum(abs_importance)) * 100
+    variance_explained_pct = fit['r_squared'] * 100
+    n = int(fit['n'])
+
+    results = []
+    for i, feature in enumerate(feature_cols):
+        row = {
+            'factor': feature.replace('REVIEW_', '').lower(),
+            'raw_coefficient': fit['feature_coefficients'][i],
+            'standardized_coefficient': coefficients[i],
+            'importance_percentage': importance_pct[i],
+        }
+        if variance_explained:
+            row['variance_explained'] = variance_explained_pct
+        row.update({
+            'standard_error': fit['std_errors'][i + 1],
+            't_statistic': fit['t_stats'][i + 1],
+            'correlation': fit['correlations'][i],
+            'sample_size': n
+        })
+        results.append(row)
+
+    results_df = pd.DataFrame(results)
+    # Rank features by importance percentage (highest = most important)
+    results_df['rank'] = results_df['importance_percentage'].rank(ascending=False, method='min')
+
+    # Add model summary row with overall statistics
+    summary = {
+        'factor': 'MODEL_SUMMARY',
+        'raw_coefficient': fit['intercept'],
+        'standardized_coefficient': fit['r_squared'],
+        'importance_percentage': n,
+    }
+    if variance_explained:
+        summary['variance_explained'] = variance_explained_pct
+    summary.update({
+        'standard_error': np.sqrt(fit['mse']),
+        't_statistic': np.mean(np.abs(fit['t_stats'][1:])),
+        'correlation': np.mean(fit['correlations']),
+        'sample_size': n
+    })
+
+    return pd.concat([results_df, pd.DataFrame([summary])], ignore_index=True)
+
+
+def feature_importance(relation, basis='standardized', variance_explained=False, label=None,
+                       bootstrap_replicates=0, bootstrap_blocks=None, processes=None, seed=0):
+    """
+    Run the full feature importance analysis on a dbt relation.
+
+    This is what the feature_importance_* Python models call: one streaming
+    pass to accumulate Z'Z, a closed-form solve and the output table.
+    bootstrap_replicates > 0 also keeps per-block Grams during the same pass
+    and adds bootstrap CIs and rank stability (see beer_analysis.bootstrap).
+    """
+    from beer_analysis.bootstrap import DEFAULT_BLOCKS, bootstrap_importance
+
+    n_blocks = (bootstrap_blocks or DEFAULT_BLOCKS) if bootstrap_replicates else 0
+    accumulator = stream_gram(relation, n_blocks=n_blocks, seed=seed)
+    with stage('solve'):
+        fit = fit_from_gram(accumulator.gram)
+    suffix = f" from {label}" if label else ""
+
+    print(f"Analyzing {int(fit['n']):,} beer reviews{suffix}")
+    print(f"Model R²: {fit['r_squared']:.3f} ({fit['r_squared']*100:.1f}% variance explained)")
+
+    final_results = importance_table(fit, basis=basis, variance_explained=variance_explained)
+    for _, row in final_results.iloc[:-1].iterrows():
+        print(f"{row['factor'].upper()}: {row['importance_percentage']:.1f}% importance, "
+              f"coef={row['standardized_coefficient']:.3f}")
+
+    if bootstrap_replicates:
+        final_results = bootstrap_importance(final_results, accumulator.block_grams, bootstrap_replicates,
+                                             basis=basis, seed=seed, processes=processes)
+        for _, row in final_results.iloc[:-1].iterrows():
+            print(f"{row['factor'].upper()}: {row['importance_ci_lower']:.1f}-{row['importance_ci_upper']:.1f}% "
+                  f"({row['bootstrap_replicates']} bootstrap replicates), rank stability {row['rank_stability']:.0%}")
+
+    top_factor = final_results.loc[final_results['rank'] == 1, 'factor'].iloc[0]
+    print(f"Analysis complete! Most important factor{' for ' + label if label else ''}: {top_factor.upper()}")
+    return final_results
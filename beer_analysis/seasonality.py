@@ -0,0 +1,328 @@
+"""
+Batched moving-average seasonal decomposition for many series at once.
+
+seasonality_decomposition.py decomposes one monthly series with pandas rolling
+windows. This engine does the same for every beer style in one go: reviews are
+reduced to a dense style x month matrix of rating sums and review counts, and
+the decomposition runs as array operations over all rows of that matrix:
+- Trend: centered 12-month moving average (window i-6 .. i+5, like pandas
+  `rolling(12, center=True)`), weighted by review_count, then linearly
+  interpolated across gaps and back/forward filled at the edges
+- Seasonal: (weighted) average of the detrended series per calendar month
+- Residual: detrended - seasonal
+
+Months are laid out on the calendar grid, so a month below the review threshold
+is a gap in the series rather than being dropped and shifting the window.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from beer_analysis.instrumentation import stage
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+
+def month_ordinals(review_time):
+    """Unix seconds -> months since 1970-01 (integer period key; -1 for missing)."""
+    seconds = pd.to_numeric(pd.Series(review_time), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    valid = ~np.isnan(seconds)
+    months = np.full(len(seconds), -1, dtype=np.int64)
+    months[valid] = seconds[valid].astype('int64').astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+    return months
+
+
+class MonthlyMatrix:
+    """
+    Dense series x month matrices of rating sums and review counts.
+
+    labels: series labels (e.g. beer styles), one per row
+    first_month: month ordinal (months since 1970-01) of column 0
+    """
+
+    def __init__(self, labels, first_month, sums, counts):
+        self.labels = list(labels)
+        self.first_month = int(first_month)
+        self.sums = np.asarray(sums, dtype='float64')
+        self.counts = np.asarray(counts, dtype='float64')
+
+    @property
+    def n_months(self):
+        return self.sums.shape[1]
+
+    @property
+    def months(self):
+        """Month ordinals of the columns."""
+        return self.first_month + np.arange(self.n_months)
+
+    @property
+    def periods(self):
+        return pd.PeriodIndex.from_ordinals(self.months, freq='M')
+
+    @property
+    def month_of_year(self):
+        """Calendar month (1-12) of every column."""
+        return (self.months % 12) + 1
+
+    def means(self, min_count=1):
+        """Average rating per cell; NaN where fewer than `min_count` reviews."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = self.sums / self.counts
+        means[self.counts < max(min_count, 1)] = np.nan
+        return means
+
+    @classmethod
+    def from_reviews(cls, labels, review_time, ratings):
+        """
+        Build the matrix from per-review arrays in one bincount pass.
+
+        labels: series label per review (e.g. BEER_STYLE)
+        review_time: unix seconds per review
+        ratings: rating per review (any scale; NaN/NA rows are ignored)
+        """
+        months = month_ordinals(review_time)
+        values = pd.to_numeric(pd.Series(ratings), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        codes, uniques = pd.factorize(pd.Series(labels), sort=True)
+        keep = (codes >= 0) & (months >= 0) & ~np.isnan(values)
+        codes, months, values = codes[keep], months[keep], values[keep]
+        if len(values) == 0:
+            return cls([], 0, np.zeros((0, 0)), np.zeros((0, 0)))
+
+        first_month = months.min()
+        width = months.max() - first_month + 1
+        cells = codes.astype(np.int64) * width + (months - first_month)
+        size = len(uniques) * width
+        sums = np.bincount(cells, weights=values, minlength=size).reshape(len(uniques), width)
+        counts = np.bincount(cells, minlength=size).reshape(len(uniques), width)
+        return cls(list(uniques), first_month, sums, counts)
+
+    @classmethod
+    def from_aggregates(cls, df, label_col, month_col, sum_col, count_col):
+        """
+        Build the matrix from pre-aggregated rows (one per label x month).
+
+        month_col holds month ordinals (months since 1970-01).
+        """
+        codes, uniques = pd.factorize(df[label_col], sort=True)
+        months = df[month_col].to_numpy(dtype=np.int64)
+        first_month = months.min()
+        width = months.max() - first_month + 1
+        cells = codes.astype(np.int64) * width + (months - first_month)
+        size = len(uniques) * width
+        sums = np.bincount(cells, weights=df[sum_col].to_numpy(dtype='float64'), minlength=size)
+        counts = np.bincount(cells, weights=df[count_col].to_numpy(dtype='float64'), minlength=size)
+        return cls(list(uniques), first_month, sums.reshape(len(uniques), width), counts.reshape(len(uniques), width))
+
+
+def _fill_gaps(values):
+    """Row-wise linear interpolation over NaN gaps, then back/forward fill at the edges."""
+    rows, width = values.shape
+    positions = np.broadcast_to(np.arange(width), (rows, width))
+    valid = ~np.isnan(values)
+
+    # Index of the previous / next valid column for every cell (-1 / width when none)
+    previous = np.maximum.accumulate(np.where(valid, positions, -1), axis=1)
+    following = np.minimum.accumulate(np.where(valid, positions, width)[:, ::-1], axis=1)[:, ::-1]
+
+    row_index = np.arange(rows)[:, None]
+    safe_previous = np.clip(previous, 0, width - 1)
+    safe_following = np.clip(following, 0, width - 1)
+    left = values[row_index, safe_previous]
+    right = values[row_index, safe_following]
+
+    has_left, has_right = previous >= 0, following < width
+    span = np.where(has_left & has_right & (following > previous), following - previous, 1)
+    fraction = np.where(has_left & has_right, (positions - previous) / span, 0.0)
+
+    filled = np.where(has_left & has_right, left + fraction * (right - left), np.nan)
+    filled = np.where(~has_left & has_right, right, filled)  # bfill leading edge
+    filled = np.where(has_left & ~has_right, left, filled)   # ffill trailing edge
+    return np.where(valid, values, filled)
+
+
+def centered_moving_average(values, weights=None, window=12):
+    """
+    Centered moving average along axis 1 (window i - window//2 .. i + window//2 - 1).
+
+    A cell gets a value only when every month in its window is observed, like
+    pandas `rolling(window, center=True).mean()`. With `weights` the average is
+    weighted (e.g. by review_count).
+    """
+    values = np.asarray(values, dtype='float64')
+    valid = ~np.isnan(values)
+    weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype='float64')
+    weights = np.where(valid, weights, 0.0)
+
+    def window_sum(array):
+        padded = np.concatenate([np.zeros((array.shape[0], 1)), np.cumsum(array, axis=1)], axis=1)
+        width = array.shape[1]
+        start = np.arange(width) - window // 2
+        end = start + window
+        inside = (start >= 0) & (end <= width)
+        out = np.full(array.shape, np.nan)
+        out[:, inside] = padded[:, end[inside]] - padded[:, start[inside]]
+        return out
+
+    weighted_sums = window_sum(np.where(valid, values, 0.0) * weights)
+    weight_totals = window_sum(weights)
+    observed = window_sum(valid.astype('float64'))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        trend = weighted_sums / weight_totals
+    trend[observed < window] = np.nan
+    return trend
+
+
+class Decomposition:
+    """Result of `decompose`: (series x month) components and (series x 12) seasonal summaries."""
+
+    def __init__(self, matrix, values, trend, detrended, seasonal, residual,
+                 seasonal_averages, seasonal_index, seasonal_strength, valid_months, sufficient):
+        self.matrix = matrix
+        self.values = values
+        self.trend = trend
+        self.detrended = detrended
+        self.seasonal = seasonal
+        self.residual = residual
+        self.seasonal_averages = seasonal_averages
+        self.seasonal_index = seasonal_index
+        self.seasonal_strength = seasonal_strength
+        self.valid_months = valid_months
+        self.sufficient = sufficient
+
+    def seasonal_pattern(self):
+        """Long table: one row per series x calendar month with the seasonal component and index."""
+        labels = np.repeat(np.array(self.matrix.labels, dtype=object), 12)
+        months = np.tile(np.arange(1, 13), len(self.matrix.labels))
+        return pd.DataFrame({
+            'label': labels,
+            'month': months,
+            'month_name': [MONTH_NAMES[month - 1] for month in months],
+            'seasonal_component': self.seasonal_averages.ravel(),
+            'seasonal_index': self.seasonal_index.ravel(),
+            'seasonal_strength': np.repeat(self.seasonal_strength, 12),
+            'valid_months': np.repeat(self.valid_months, 12),
+            'sufficient_data': np.repeat(self.sufficient, 12),
+        })
+
+
+def decompose(matrix, min_reviews=50, min_months=24, window=12, weighted=True):
+    """
+    Decompose every row of a MonthlyMatrix at once.
+
+    min_reviews: months with fewer reviews are treated as gaps
+    min_months: rows with fewer observed months are flagged as insufficient
+    weighted: weight the trend and seasonal averages by review_count
+    """
+    values = matrix.means(min_count=min_reviews)
+    valid = ~np.isnan(values)
+    weights = np.where(valid, matrix.counts, 0.0) if weighted else valid.astype('float64')
+
+    # Trend: centered moving average, interpolated across gaps and edges
+    trend = _fill_gaps(centered_moving_average(values, weights, window))
+    detrended = values - trend
+
+    # Seasonal: average detrended value per calendar month across all years
+    one_hot = np.eye(12)[matrix.month_of_year - 1]               # months x 12
+    detrended_weights = np.where(np.isnan(detrended), 0.0, weights)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        seasonal_averages = (np.nan_to_num(detrended) * detrended_weights) @ one_hot / (detrended_weights @ one_hot)
+    seasonal = np.where(valid, seasonal_averages[:, matrix.month_of_year - 1], np.nan)
+    residual = detrended - seasonal
+
+    # Seasonal index relative to the average seasonal effect; strength vs. total variation
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mean_seasonal = np.nanmean(np.where(valid, seasonal, np.nan), axis=1)
+        seasonal_strength = np.abs(_nanstd(seasonal)) / np.abs(_nanstd(values))
+    seasonal_averages = np.nan_to_num(seasonal_averages)
+    seasonal_index = seasonal_averages - np.nan_to_num(mean_seasonal)[:, None]
+
+    valid_months = valid.sum(axis=1)
+    return Decomposition(
+        matrix, values, trend, detrended, seasonal, residual,
+        seasonal_averages, seasonal_index, seasonal_strength, valid_months, valid_months >= min_months,
+    )
+
+
+def _nanstd(values):
+    """Sample std (ddof=1, like pandas) per row, ignoring NaN."""
+    counts = (~np.isnan(values)).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        std = np.nanstd(values, axis=1, ddof=0) * np.sqrt(counts / (counts - 1))
+    return np.where(counts > 1, std, np.nan)
+
+
+def _is_snowpark(relation):
+    return type(relation).__module__.startswith('snowflake.snowpark')
+
+
+def monthly_rating_summary(relation, rating_cols, time_col='REVIEW_TIME'):
+    """
+    Monthly review counts and average ratings for a reviews relation.
+
+    On Snowflake the aggregation is pushed into the warehouse through the Snowpark
+    DataFrame API, so only one row per month is transferred. Anywhere else (the
+    local runner, plain pandas) it falls back to pandas over column-pruned compact
+    batches, combining per-batch sums and counts.
+
+    Returns one row per month: month_start, total_reviews (non-null first rating
+    column) and avg_<rating> for every rating column, sorted by month.
+    """
+    names = [f"AVG_{col.replace('REVIEW_', '')}" for col in rating_cols]
+
+    if _is_snowpark(relation):
+        from snowflake.snowpark import functions as F
+
+        summary = (
+            relation
+            .with_column('MONTH_START', F.date_trunc('month', F.to_timestamp(F.col(time_col))))
+            .filter(F.col('MONTH_START').is_not_null())
+            .group_by('MONTH_START')
+            .agg(
+                F.count(F.col(rating_cols[0])).alias('TOTAL_REVIEWS'),
+                *[F.avg(F.col(col)).alias(name) for col, name in zip(rating_cols, names)]
+            )
+            .to_pandas()
+        )
+        summary.columns = [str(col).upper() for col in summary.columns]
+        summary['MONTH_START'] = pd.to_datetime(summary['MONTH_START'])
+    else:
+        from beer_analysis.loaders import decode_ratings, iter_encoded_batches
+
+        # Per-batch monthly sums and counts are folded into running totals, so only
+        # one batch and one row per month are held at a time
+        totals = None
+        with stage('read') as read:
+            for batch in iter_encoded_batches(relation, [time_col] + rating_cols):
+                read.input(batch)
+                months = month_ordinals(batch[time_col])
+                frame = pd.DataFrame({'MONTH': months})
+                for col in rating_cols:
+                    codes = batch[col].astype('float64')
+                    frame[f'{col}_SUM'] = codes.fillna(0).to_numpy()
+                    frame[f'{col}_COUNT'] = codes.notna().to_numpy().astype('int64')
+                partial = frame[frame['MONTH'] >= 0].groupby('MONTH').sum()
+                totals = partial if totals is None else totals.add(partial, fill_value=0)
+        if totals is None or totals.empty:
+            # No batches, or no review with a valid month: an empty summary
+            summary = pd.DataFrame({
+                'MONTH_START': pd.Series(dtype='datetime64[ns]'),
+                'TOTAL_REVIEWS': pd.Series(dtype='int64'),
+                **{name: pd.Series(dtype='float64') for name in names},
+            })
+        else:
+            totals = totals.sort_index()
+            summary = pd.DataFrame({
+                'MONTH_START': pd.PeriodIndex.from_ordinals(totals.index, freq='M').to_timestamp(),
+                'TOTAL_REVIEWS': totals[f'{rating_cols[0]}_COUNT'].to_numpy().astype('int64'),
+            })
+            with np.errstate(invalid='ignore', divide='ignore'):
+                for col, name in zip(rating_cols, names):
+                    summary[name] = decode_ratings(totals[f'{col}_SUM'].to_numpy() / totals[f'{col}_COUNT'].to_numpy())
+
+    summary.columns = [col.lower() for col in summary.columns]
+    return summary.sort_values('month_start').reset_index(drop=True)
@@ -0,0 +1,229 @@
+"""
+"Beers like this": nearest-neighbour search over per-beer rating profiles.
+
+Every beer gets a profile of its average aroma, appearance, taste and palate
+ratings (optionally ABV), built from the per-beer moments in int_beer_stats.
+Each dimension is z-scored across the catalogue so ABV (0-60) and ratings
+(1-5) are comparable, and per-dimension weights are applied by scaling the
+coordinates with sqrt(weight) - weighted Euclidean distance is then plain
+Euclidean distance, so a standard KD-tree answers weighted queries.
+
+A tree is built per weight vector (milliseconds for ~50k beers) and cached.
+`similar_to` answers a single beer; `similar_all` queries the whole catalogue
+in one vectorized call (cKDTree with all cores), which is what the
+similar_beers model uses to precompute recommendations.
+
+scipy's cKDTree is used when available; otherwise a blocked brute-force
+search with numpy gives the same results.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # pragma: no cover - scipy is optional
+    cKDTree = None
+
+RATING_DIMENSIONS = ['aroma', 'appearance', 'taste', 'palate']
+
+WEIGHT_PRESETS = {
+    'balanced': {'aroma': 1.0, 'appearance': 1.0, 'taste': 1.0, 'palate': 1.0, 'abv': 1.0},
+    # Question 4: "I enjoy a beer due to its aroma and appearance"
+    'aroma_appearance': {'aroma': 2.0, 'appearance': 2.0, 'taste': 0.5, 'palate': 0.5, 'abv': 0.5},
+    'taste': {'aroma': 1.0, 'appearance': 0.25, 'taste': 2.0, 'palate': 1.0, 'abv': 0.5},
+}
+
+PROFILE_COLUMNS = (
+    ['BEER_NAME', 'BREWERY_NAME', 'BEER_STYLE', 'BEER_ABV', 'REVIEW_COUNT']
+    + [f'REVIEW_{dim.upper()}_COUNT' for dim in RATING_DIMENSIONS]
+    + [f'REVIEW_{dim.upper()}_SUM' for dim in RATING_DIMENSIONS]
+)
+
+BRUTE_FORCE_BLOCK = 2048
+
+
+def beer_profiles(beer_stats, min_reviews=10, include_abv=False):
+    """
+    Per-beer average rating profile from int_beer_stats moments.
+
+    Beers with fewer than `min_reviews` reviews, or a missing dimension, are dropped.
+    Returns a frame with beer_name, brewery_name, beer_style, beer_abv, review_count
+    and one column per dimension.
+    """
+    df = beer_stats.copy()
+    df.columns = [str(column).upper() for column in df.columns]
+    profiles = pd.DataFrame({
+        'beer_name': df['BEER_NAME'],
+        'brewery_name': df['BREWERY_NAME'],
+        'beer_style': df['BEER_STYLE'],
+        'beer_abv': pd.to_numeric(df['BEER_ABV'], errors='coerce'),
+        'review_count': pd.to_numeric(df['REVIEW_COUNT'], errors='coerce'),
+    })
+    for dim in RATING_DIMENSIONS:
+        count = pd.to_numeric(df[f'REVIEW_{dim.upper()}_COUNT'], errors='coerce')
+        profiles[dim] = pd.to_numeric(df[f'REVIEW_{dim.upper()}_SUM'], errors='coerce') / count.where(count > 0)
+
+    dimensions = RATING_DIMENSIONS + (['abv'] if include_abv else [])
+    if include_abv:
+        profiles['abv'] = profiles['beer_abv']
+    keep = (profiles['review_count'] >= min_reviews) & profiles[dimensions].notna().all(axis=1)
+    return profiles[keep].reset_index(drop=True)
+
+
+def _weight_vector(weights, dimensions):
+    if weights is None:
+        weights = 'balanced'
+    if isinstance(weights, str):
+        if weights not in WEIGHT_PRESETS:
+            raise ValueError(f"Unknown weight preset: {weights} (expected one of {sorted(WEIGHT_PRESETS)})")
+        weights = WEIGHT_PRESETS[weights]
+    if isinstance(weights, dict):
+        weights = [float(weights.get(dim, 1.0)) for dim in dimensions]
+    weights = np.asarray(weights, dtype='float64')
+    if weights.shape != (len(dimensions),) or (weights < 0).any():
+        raise ValueError(f"Expected {len(dimensions)} non-negative weights for {dimensions}")
+    return weights
+
+
+class _BruteForceTree:
+    """cKDTree-compatible `query` for when scipy is not installed."""
+
+    def __init__(self, points):
+        self.data = points
+        self._norms = (points ** 2).sum(axis=1)
+
+    def query(self, queries, k=1, workers=None):
+        queries = np.atleast_2d(queries)
+        k = min(k, len(self.data))
+        distances = np.empty((len(queries), k))
+        indices = np.empty((len(queries), k), dtype=np.int64)
+        for start in range(0, len(queries), BRUTE_FORCE_BLOCK):
+            block = queries[start:start + BRUTE_FORCE_BLOCK]
+            # |q - p|² = |q|² - 2 q·p + |p|², one matrix product per block
+            squared = (block ** 2).sum(axis=1)[:, None] - 2 * block @ self.data.T + self._norms[None, :]
+            nearest = np.argpartition(squared, k - 1, axis=1)[:, :k]
+            nearest_sq = np.take_along_axis(squared, nearest, axis=1)
+            order = np.argsort(nearest_sq, axis=1, kind='stable')
+            indices[start:start + len(block)] = np.take_along_axis(nearest, order, axis=1)
+            distances[start:start + len(block)] = np.sqrt(np.maximum(np.take_along_axis(nearest_sq, order, axis=1), 0))
+        return distances, indices
+
+
+def _check_k(k):
+    if int(k) < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+
+
+class SimilarityIndex:
+    """
+    Weighted k-NN over normalized beer profiles.
+
+    profiles: output of `beer_profiles` (one row per beer)
+    """
+
+    def __init__(self, profiles, include_abv=None):
+        self.profiles = profiles.reset_index(drop=True)
+        if include_abv is None:
+            include_abv = 'abv' in profiles.columns
+        self.dimensions = RATING_DIMENSIONS + (['abv'] if include_abv else [])
+
+        values = self.profiles[self.dimensions].to_numpy('float64')
+        self.mean = values.mean(axis=0)
+        self.scale = values.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        self.normalized = (values - self.mean) / self.scale
+
+        self._lookup = {}
+        for position, (beer, brewery) in enumerate(zip(self.profiles['beer_name'], self.profiles['brewery_name'])):
+            self._lookup.setdefault(beer, []).append(position)
+            self._lookup.setdefault((beer, brewery), []).append(position)
+        self._trees = {}
+
+    @classmethod
+    def from_beer_stats(cls, beer_stats, min_reviews=10, include_abv=False):
+        return cls(beer_profiles(beer_stats, min_reviews, include_abv), include_abv)
+
+    @classmethod
+    def from_relation(cls, relation, min_reviews=10, include_abv=False):
+        """Build from an int_beer_stats relation, reading only the profile columns."""
+        return cls.from_beer_stats(relation.select(*PROFILE_COLUMNS).to_pandas(), min_reviews, include_abv)
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def _tree(self, weights):
+        weights = _weight_vector(weights, self.dimensions)
+        key = tuple(weights)
+        if key not in self._trees:
+            scaled = self.normalized * np.sqrt(weights)
+            tree = cKDTree(scaled) if cKDTree is not None else _BruteForceTree(scaled)
+            self._trees[key] = (tree, np.sqrt(weights))
+        return self._trees[key]
+
+    def positions(self, beer_name, brewery_name=None):
+        """Index positions of a beer (all breweries' beers of that name unless brewery_name is given)."""
+        key = beer_name if brewery_name is None else (beer_name, brewery_name)
+        if key not in self._lookup:
+            raise KeyError(f"Beer not in similarity index: {key}")
+        return self._lookup[key]
+
+    def query(self, profiles, k=10, weights=None):
+        """
+        k nearest beers for raw (un-normalized) profile vectors in `self.dimensions` order.
+
+        Returns (distances, indices), both shaped (len(profiles), k).
+        """
+        _check_k(k)
+        tree, sqrt_weights = self._tree(weights)
+        points = (np.atleast_2d(np.asarray(profiles, dtype='float64')) - self.mean) / self.scale * sqrt_weights
+        distances, indices = tree.query(points, k=min(k, len(self)), workers=-1)
+        # cKDTree drops the neighbour axis for k=1
+        return distances.reshape(len(points), -1), indices.reshape(len(points), -1)
+
+    def _query_positions(self, positions, k, weights):
+        """Neighbours of indexed beers, excluding the beer itself."""
+        _check_k(k)
+        tree, _ = self._tree(weights)
+        points = tree.data[positions]
+        distances, indices = tree.query(points, k=min(k + 1, len(self)), workers=-1)
+        distances, indices = distances.reshape(len(points), -1), indices.reshape(len(points), -1)
+
+        # Drop the query beer itself (normally the first hit; ties may move it)
+        is_self = indices == np.asarray(positions)[:, None]
+        drop = np.where(is_self.any(axis=1), is_self.argmax(axis=1), indices.shape[1] - 1)
+        keep = np.ones(indices.shape, dtype=bool)
+        keep[np.arange(len(positions)), drop] = False
+        columns = indices.shape[1] - 1
+        return distances[keep].reshape(len(positions), columns), indices[keep].reshape(len(positions), columns)
+
+    def _frame(self, query_positions, distances, indices):
+        ranks = np.tile(np.arange(1, indices.shape[1] + 1), len(query_positions))
+        source = np.repeat(np.asarray(query_positions), indices.shape[1])
+        neighbours = indices.ravel()
+        profiles = self.profiles
+        return pd.DataFrame({
+            'beer_name': profiles['beer_name'].to_numpy()[source],
+            'brewery_name': profiles['brewery_name'].to_numpy()[source],
+            'beer_style': profiles['beer_style'].to_numpy()[source],
+            'similar_rank': ranks,
+            'similar_beer_name': profiles['beer_name'].to_numpy()[neighbours],
+            'similar_brewery_name': profiles['brewery_name'].to_numpy()[neighbours],
+            'similar_beer_style': profiles['beer_style'].to_numpy()[neighbours],
+            'similar_beer_abv': profiles['beer_abv'].to_numpy()[neighbours],
+            'distance': distances.ravel(),
+            # 1 for an identical profile, towards 0 as profiles diverge
+            'similarity': 1 / (1 + distances.ravel()),
+        })
+
+    def similar_to(self, beer_name, brewery_name=None, k=10, weights=None):
+        """The k beers most similar to one beer, as a DataFrame (best first)."""
+        positions = self.positions(beer_name, brewery_name)[:1]
+        distances, indices = self._query_positions(positions, k, weights)
+        return self._frame(positions, distances, indices)
+
+    def similar_all(self, k=5, weights=None):
+        """k similar beers for every beer in the index in one batch query (long format)."""
+        positions = np.arange(len(self))
+        distances, indices = self._query_positions(positions, k, weights)
+        return self._frame(positions, distances, indices)
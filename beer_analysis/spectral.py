@@ -0,0 +1,282 @@
+"""
+Batched periodogram (FFT) seasonality screening for many series at once.
+
+The moving-average decomposition in beer_analysis.seasonality assumes a
+12-month period and answers "how big is the yearly pattern". This engine
+instead asks every series which periods it actually has: all series of one
+granularity (every beer style's monthly, weekly or daily average rating) are
+laid out as rows of one dense series x time matrix and
+- each row is linearly detrended over its observed cells (gaps and cells
+  below the review threshold count as "no deviation from trend")
+- one `np.fft.rfft` over axis 1 gives the periodogram of every row at once
+- per row: the strongest periods, seasonal strength (share of the detrended
+  variance at the dominant frequency and its harmonics, so non-sinusoidal
+  shapes count fully), the share at a reference period (e.g. 12 months), and
+  Fisher's g-test for a significant periodic component against white noise
+
+With hundreds of series screened together, `adjust_p_values` applies the
+Benjamini-Hochberg correction across all of them.
+
+Fisher's p-value uses the first term of the exact formula,
+m * (1 - g) ** (m - 1): exact when g > 1/2, otherwise a tight upper bound
+whenever the p-value is small enough to matter (the exact alternating sum is
+numerically unstable for the long daily series).
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from beer_analysis.instrumentation import stage
+
+# Length of one step in days, and the reference period (in steps) reported for every granularity
+GRANULARITIES = {
+    'monthly': {'step_days': 365.25 / 12, 'reference_period': 12},
+    'weekly': {'step_days': 7, 'reference_period': 365.25 / 7},
+    'daily': {'step_days': 1, 'reference_period': 7},
+}
+
+
+def period_ordinals(day_number, granularity):
+    """
+    Days since 1970-01-01 -> period ordinals of a granularity.
+
+    weekly: weeks starting on Monday; monthly: months since 1970-01.
+    """
+    days = np.asarray(day_number, dtype=np.int64)
+    if granularity == 'daily':
+        return days
+    if granularity == 'weekly':
+        return (days + 3) // 7  # 1970-01-01 was a Thursday
+    if granularity == 'monthly':
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+class SeriesMatrix:
+    """
+    Dense series x period matrices of rating sums and review counts.
+
+    labels: series labels, one per row (None for the all-series total)
+    first_period: period ordinal of column 0
+    """
+
+    def __init__(self, labels, first_period, sums, counts):
+        self.labels = list(labels)
+        self.first_period = int(first_period)
+        self.sums = np.asarray(sums, dtype='float64')
+        self.counts = np.asarray(counts, dtype='float64')
+
+    @property
+    def n_periods(self):
+        return self.sums.shape[1]
+
+    def means(self, min_count=1):
+        """Average rating per cell; NaN where fewer than `min_count` reviews."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = self.sums / self.counts
+        means[self.counts < max(min_count, 1)] = np.nan
+        return means
+
+    @classmethod
+    def from_aggregates(cls, labels, periods, sums, counts, total=True):
+        """
+        Build the matrix from pre-aggregated rows (label, period ordinal, sum, count)
+        in one bincount pass; rows with the same label and period are added up.
+
+        total: prepend a row summing every series (label None)
+        """
+        codes, uniques = pd.factorize(pd.Series(labels), sort=True)
+        periods = np.asarray(periods, dtype=np.int64)
+        keep = codes >= 0
+        codes, periods = codes[keep], periods[keep]
+        if len(periods) == 0:
+            return cls([], 0, np.zeros((0, 0)), np.zeros((0, 0)))
+
+        first_period = periods.min()
+        width = periods.max() - first_period + 1
+        cells = codes.astype(np.int64) * width + (periods - first_period)
+        size = len(uniques) * width
+        shape = (len(uniques), width)
+        sums = np.bincount(cells, weights=np.asarray(sums, dtype='float64')[keep], minlength=size).reshape(shape)
+        counts = np.bincount(cells, weights=np.asarray(counts, dtype='float64')[keep], minlength=size).reshape(shape)
+        labels = list(uniques)
+        if total:
+            labels = [None] + labels
+            sums = np.vstack([sums.sum(axis=0), sums])
+            counts = np.vstack([counts.sum(axis=0), counts])
+        return cls(labels, first_period, sums, counts)
+
+
+def detrend(values):
+    """
+    Remove each row's least-squares line, fitted on its observed (non-NaN) cells.
+
+    Returns (residuals with gaps set to 0, observed mask, observed share of the
+    row's own span between its first and last observation).
+    """
+    values = np.asarray(values, dtype='float64')
+    observed = ~np.isnan(values)
+    t = np.broadcast_to(np.arange(values.shape[1], dtype='float64'), values.shape)
+    y = np.where(observed, values, 0.0)
+    w = observed.astype('float64')
+
+    n = w.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_mean = (w * t).sum(axis=1) / n
+        y_mean = y.sum(axis=1) / n
+        dt = np.where(observed, t - t_mean[:, None], 0.0)
+        slope = (dt * y).sum(axis=1) / (dt * dt).sum(axis=1)
+    slope = np.where(np.isfinite(slope), slope, 0.0)
+    fitted = y_mean[:, None] + slope[:, None] * (t - t_mean[:, None])
+    residuals = np.where(observed, values - fitted, 0.0)
+
+    positions = np.where(observed, t, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        span = np.nanmax(positions, axis=1) - np.nanmin(positions, axis=1) + 1
+        observed_share = np.where(n > 0, n / span, 0.0)
+    return residuals, observed, observed_share
+
+
+def periodogram(residuals):
+    """
+    Periodogram of every row at the Fourier frequencies k / T, k = 1 .. (T - 1) // 2
+    (the mean and the Nyquist frequency are left out, as in Fisher's test).
+
+    Returns (k, power) with power of shape series x len(k).
+    """
+    width = residuals.shape[1]
+    k = np.arange(1, (width - 1) // 2 + 1)
+    spectrum = np.fft.rfft(residuals, axis=1)[:, k]
+    power = (spectrum.real ** 2 + spectrum.imag ** 2) / width
+    return k, power
+
+
+def fisher_g_test(power):
+    """Fisher's g statistic (max / total power) and its p-value per row."""
+    m = power.shape[1]
+    total = power.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        g = power.max(axis=1) / total
+        log_p = np.log(m) + (m - 1) * np.log1p(-np.minimum(g, 1.0))
+    p_value = np.minimum(np.exp(log_p), 1.0)
+    return g, np.where(total > 0, p_value, np.nan)
+
+
+def adjust_p_values(p_values):
+    """Benjamini-Hochberg q-values for a flat array of p-values (NaN stays NaN)."""
+    p_values = np.asarray(p_values, dtype='float64')
+    q_values = np.full(p_values.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(p_values))
+    if len(valid) == 0:
+        return q_values
+    order = valid[np.argsort(p_values[valid])]
+    ranked = p_values[order] * len(valid) / np.arange(1, len(valid) + 1)
+    q_values[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+    return q_values
+
+
+class Spectrum:
+    """Result of `spectral_seasonality` for one SeriesMatrix."""
+
+    def __init__(self, matrix, k, power, top_k, top_share, seasonal_strength, reference_period,
+                 reference_strength, g_statistic, p_value, observed_points, observed_share, sufficient):
+        self.matrix = matrix
+        self.k = k
+        self.power = power
+        self.top_k = top_k
+        self.top_share = top_share
+        self.seasonal_strength = seasonal_strength
+        self.reference_period = reference_period
+        self.reference_strength = reference_strength
+        self.g_statistic = g_statistic
+        self.p_value = p_value
+        self.observed_points = observed_points
+        self.observed_share = observed_share
+        self.sufficient = sufficient
+
+    @property
+    def top_periods(self):
+        """Strongest periods per series (in steps), strongest first."""
+        with np.errstate(divide='ignore'):
+            return np.where(self.top_k > 0, self.matrix.n_periods / self.top_k, np.nan)
+
+    def summary(self, granularity, step_days=1.0):
+        """Long table: one row per series x period rank."""
+        series, top = self.top_k.shape
+        labels = np.array(self.matrix.labels, dtype=object)
+
+        def per_series(values):
+            return np.repeat(values, top)
+
+        periods = self.top_periods
+        return pd.DataFrame({
+            'granularity': granularity,
+            'label': per_series(labels),
+            'period_rank': np.tile(np.arange(1, top + 1), series),
+            'period': periods.ravel(),
+            'period_days': periods.ravel() * step_days,
+            'power_share': self.top_share.ravel(),
+            'seasonal_strength': per_series(self.seasonal_strength),
+            'reference_period': self.reference_period,
+            'reference_strength': per_series(self.reference_strength),
+            'g_statistic': per_series(self.g_statistic),
+            'p_value': per_series(self.p_value),
+            'series_length': self.matrix.n_periods,
+            'observed_points': per_series(self.observed_points),
+            'sufficient_data': per_series(self.sufficient),
+        })
+
+
+def spectral_seasonality(matrix, min_reviews=1, top=3, reference_period=None,
+                         min_points=24, min_observed_share=0.5):
+    """
+    Periodogram screening of every row of a SeriesMatrix at once.
+
+    min_reviews: cells with fewer reviews are treated as gaps
+    top: number of strongest periods reported per series
+    reference_period: period (in steps) whose power share is reported as reference_strength
+    min_points / min_observed_share: rows with fewer observed cells, or gaps over more
+        than half of their own span, are flagged as insufficient
+    """
+    values = matrix.means(min_count=min_reviews)
+    residuals, observed, observed_share = detrend(values)
+
+    with stage('fft'):
+        k, power = periodogram(residuals)
+    if len(k) == 0:
+        raise ValueError(f"Series of {matrix.n_periods} periods are too short for a periodogram")
+
+    total = power.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        share = power / total[:, None]
+
+    # Strongest frequencies, strongest first
+    top = min(top, len(k))
+    top_index = np.argsort(-power, axis=1, kind='stable')[:, :top]
+    rows = np.arange(power.shape[0])[:, None]
+    top_k = np.where(total[:, None] > 0, k[top_index], 0)
+    top_share = share[rows, top_index]
+
+    # Seasonal strength: share at the dominant frequency and its harmonics
+    harmonics = (k[None, :] % np.maximum(top_k[:, :1], 1)) == 0
+    seasonal_strength = np.where(harmonics, share, 0.0).sum(axis=1)
+
+    # Reference period: share within one frequency bin of T / reference_period
+    if reference_period:
+        target = matrix.n_periods / reference_period
+        near = np.abs(k - target) <= 1
+        reference_strength = share[:, near].sum(axis=1)
+    else:
+        reference_strength = np.full(power.shape[0], np.nan)
+
+    g_statistic, p_value = fisher_g_test(power)
+    observed_points = observed.sum(axis=1)
+    sufficient = (observed_points >= min_points) & (observed_share >= min_observed_share) & (total > 0)
+    return Spectrum(
+        matrix, k, power, top_k, top_share, np.where(total > 0, seasonal_strength, np.nan),
+        reference_period, np.where(total > 0, reference_strength, np.nan),
+        g_statistic, p_value, observed_points, observed_share, sufficient,
+    )
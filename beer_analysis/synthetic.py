@@ -0,0 +1,290 @@
+"""
+Synthetic beer_reviews_raw generator for testing the models at 10x-100x volume.
+
+Rows match the `beer_reviews_raw` source (sources.yml) and are written as chunked
+Parquet (<out_dir>/part-00000.parquet, ...), which the local runner reads as
+`<data_dir>/beer_reviews_raw/*.parquet`.
+
+What the data looks like:
+- a catalogue of breweries and beers; breweries own Zipf-skewed numbers of beers
+  and beer popularity (reviews per beer) is Zipf-skewed too
+- beer styles drawn from a realistic style mix, each with its own ABV distribution
+  (a few percent of beers have no ABV, as in the case-study table)
+- ratings on the 1-5 half-point scale, correlated through a per-beer quality, a
+  per-review reviewer mood shared by all components and per-component noise
+- monthly seasonality that can be injected: a rating shift whose sign follows the
+  style's season (stouts up in winter, wheat beers and lagers up in summer; styles
+  without a season stay flat) and a seasonal swing in review volume, on top of
+  growing volume over the years
+
+Generation is reproducible for a seed: the catalogue is derived from the seed and
+every chunk gets its own random stream (SeedSequence.spawn), so the output does
+not depend on the number of worker processes. Each worker holds one chunk at a
+time, so memory is bounded by workers x chunk_rows.
+
+    python -m beer_analysis.local generate --rows 100000000 --out-dir data/beer_reviews_raw
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+# Column order of the case-study table
+COLUMNS = [
+    'brewery_name', 'review_time', 'review_overall', 'review_aroma', 'review_appearance',
+    'beer_style', 'review_palate', 'review_taste', 'beer_name', 'beer_abv',
+]
+RATING_COLUMNS = ['review_overall', 'review_aroma', 'review_appearance', 'review_palate', 'review_taste']
+
+# (style, share of beers, ABV mean, ABV std, season: +1 winter, -1 summer, 0 none)
+STYLES = [
+    ('American IPA', 0.090, 6.6, 0.8, 0),
+    ('American Pale Ale (APA)', 0.070, 5.6, 0.6, 0),
+    ('American Double / Imperial IPA', 0.050, 9.0, 1.2, 0),
+    ('Russian Imperial Stout', 0.045, 10.2, 1.8, 1),
+    ('American Double / Imperial Stout', 0.030, 10.8, 2.0, 1),
+    ('American Porter', 0.040, 6.2, 0.9, 1),
+    ('American Amber / Red Ale', 0.045, 5.8, 0.8, 0),
+    ('Fruit / Vegetable Beer', 0.035, 5.5, 1.5, -1),
+    ('Witbier', 0.030, 5.1, 0.6, -1),
+    ('Hefeweizen', 0.030, 5.3, 0.5, -1),
+    ('American Adjunct Lager', 0.035, 4.8, 0.5, -1),
+    ('German Pilsener', 0.025, 5.0, 0.4, -1),
+    ('Euro Pale Lager', 0.025, 4.9, 0.5, -1),
+    ('Belgian Strong Dark Ale', 0.030, 9.5, 1.3, 1),
+    ('Belgian Strong Pale Ale', 0.025, 8.8, 1.1, 0),
+    ('Tripel', 0.025, 8.9, 0.8, 0),
+    ('Saison / Farmhouse Ale', 0.035, 6.8, 1.2, -1),
+    ('American Barleywine', 0.025, 11.0, 1.5, 1),
+    ('Winter Warmer', 0.025, 7.0, 1.4, 1),
+    ('Oktoberfest / Märzen', 0.020, 5.8, 0.5, 0),
+    ('Pumpkin Ale', 0.020, 6.2, 1.1, 1),
+    ('Scotch Ale / Wee Heavy', 0.020, 8.3, 1.3, 1),
+    ('English Bitter', 0.025, 4.3, 0.6, 0),
+    ('English Brown Ale', 0.025, 5.1, 0.7, 1),
+    ('Irish Dry Stout', 0.020, 4.6, 0.6, 1),
+    ('Milk / Sweet Stout', 0.020, 5.6, 0.9, 1),
+    ('American Wild Ale', 0.020, 7.2, 1.8, 0),
+    ('Gueuze', 0.010, 5.8, 0.8, 0),
+    ('Kölsch', 0.015, 4.8, 0.3, -1),
+    ('Light Lager', 0.015, 4.1, 0.4, -1),
+    ('Märzen / Dunkel', 0.015, 5.3, 0.6, 1),
+    ('Doppelbock', 0.020, 8.0, 0.9, 1),
+    ('Eisbock', 0.005, 11.5, 2.5, 1),
+    ('Rauchbier', 0.010, 5.6, 0.8, 1),
+    ('Berliner Weissbier', 0.010, 3.6, 0.8, -1),
+]
+
+BREWERY_WORDS = ['Stone', 'Iron', 'Hill', 'River', 'Oak', 'Red', 'Black', 'Old', 'North', 'Harbor',
+                 'Copper', 'Golden', 'Wild', 'Mountain', 'Valley', 'Lake', 'Bear', 'Fox', 'Crown', 'Anchor']
+BREWERY_SUFFIXES = ['Brewing Company', 'Brewery', 'Beer Company', 'Ales', 'Brewing Co.', 'Brouwerij', 'Brauerei']
+BEER_WORDS = ['Hop', 'Night', 'Storm', 'Sun', 'Moon', 'Ghost', 'Raven', 'Wolf', 'Amber', 'Velvet',
+              'Thunder', 'Frost', 'Ember', 'Harvest', 'Summit', 'Tide', 'Smoke', 'Honey', 'Rye', 'Cedar']
+
+
+class Catalogue:
+    """Breweries, beers and their fixed attributes (derived deterministically from the seed)."""
+
+    def __init__(self, n_beers, n_breweries, seed=0, zipf_exponent=1.0, abv_missing=0.04):
+        rng = np.random.default_rng(np.random.SeedSequence([seed, 1]))
+        self.n_beers = n_beers
+        self.n_breweries = n_breweries
+
+        self.style_names = np.array([style[0] for style in STYLES], dtype=object)
+        shares = np.array([style[1] for style in STYLES])
+        abv_mean = np.array([style[2] for style in STYLES])
+        abv_std = np.array([style[3] for style in STYLES])
+        self.style_season = np.array([style[4] for style in STYLES], dtype=float)
+
+        # Breweries own a Zipf-skewed number of beers
+        brewery_weights = 1.0 / np.arange(1, n_breweries + 1) ** 0.8
+        self.beer_brewery = rng.choice(n_breweries, size=n_beers, p=brewery_weights / brewery_weights.sum())
+        self.beer_style = rng.choice(len(STYLES), size=n_beers, p=shares / shares.sum())
+        abv = rng.normal(abv_mean[self.beer_style], abv_std[self.beer_style])
+        self.beer_abv = np.round(np.clip(abv, 0.5, 40.0), 1)
+        self.beer_abv[rng.random(n_beers) < abv_missing] = np.nan
+
+        # Latent beer quality (stronger styles rate a little higher, as in the real data)
+        style_quality = 3.75 + 0.04 * (abv_mean - abv_mean.mean()) + rng.normal(0, 0.08, len(STYLES))
+        self.beer_quality = style_quality[self.beer_style] + rng.normal(0, 0.3, n_beers)
+        # Per-beer, per-component profile offsets (aroma, appearance, palate, taste)
+        self.beer_offsets = rng.normal(0, 0.12, (n_beers, 4))
+
+        # Zipf-Mandelbrot popularity over beers in random order (independent of quality);
+        # the offset keeps the top beer near the real table's ~0.2-1% share of reviews
+        offset = max(5, n_beers // 1000)
+        popularity = 1.0 / (np.arange(1, n_beers + 1) + offset) ** zipf_exponent
+        popularity = popularity[rng.permutation(n_beers)]
+        self.beer_cdf = np.cumsum(popularity / popularity.sum())
+
+        self.brewery_names = self._brewery_names(rng)
+        self.beer_names = self._beer_names(rng)
+
+    def _brewery_names(self, rng):
+        first = rng.choice(BREWERY_WORDS, self.n_breweries).astype(object)
+        second = rng.choice(BREWERY_WORDS, self.n_breweries).astype(object)
+        suffix = rng.choice(BREWERY_SUFFIXES, self.n_breweries).astype(object)
+        return _numbered(first + ' ' + second + ' ' + suffix)
+
+    def _beer_names(self, rng):
+        first = rng.choice(BEER_WORDS, self.n_beers).astype(object)
+        second = rng.choice(BEER_WORDS, self.n_beers).astype(object)
+        style_short = np.array([name.split(' / ')[0].split(' (')[0] for name in self.style_names], dtype=object)
+        return _numbered(first + ' ' + second + ' ' + style_short[self.beer_style])
+
+
+def _numbered(names):
+    """Make names unique by numbering repeats ('Hop Storm IPA', 'Hop Storm IPA 2', ...)."""
+    names = pd.Series(names)
+    repeat = names.groupby(names, sort=False).cumcount()
+    suffix = np.where(repeat > 0, ' ' + (repeat + 1).astype(str), '')
+    return (names + suffix).to_numpy(object)
+
+
+def _month_weights(start_year, end_year, growth, volume_seasonality):
+    """Share of reviews per month: exponential growth plus a seasonal swing in volume."""
+    months = np.arange((end_year - start_year) * 12)
+    month_of_year = months % 12
+    weights = np.exp(growth * months / 12) * (1 + volume_seasonality * np.cos(2 * np.pi * month_of_year / 12))
+    return np.cumsum(weights / weights.sum())
+
+
+def _month_bounds(start_year, end_year):
+    """Unix seconds of the first and last+1 second of every month in the range."""
+    months = np.datetime64(f'{start_year}-01', 'M') + np.arange((end_year - start_year) * 12)
+    starts = months.astype('datetime64[s]').astype(np.int64)
+    ends = (months + 1).astype('datetime64[s]').astype(np.int64)
+    return starts, ends
+
+
+def _half_points(values):
+    return np.clip(np.round(values * 2) / 2, 1.0, 5.0)
+
+
+class GeneratorConfig:
+    def __init__(self, rows, chunk_rows=DEFAULT_CHUNK_ROWS, seed=0, n_beers=None, n_breweries=None,
+                 start_year=1998, end_year=2012, growth=0.35, seasonal_amplitude=0.05,
+                 volume_seasonality=0.08, zipf_exponent=1.0, rating_noise=0.35, mood_std=0.3):
+        self.rows = int(rows)
+        self.chunk_rows = int(chunk_rows)
+        self.seed = seed
+        # Catalogue grows with volume, like the case-study table (~1.5M reviews, ~66k beers)
+        self.n_beers = n_beers or int(np.clip(self.rows / 25, 1_000, 1_000_000))
+        self.n_breweries = n_breweries or max(50, self.n_beers // 10)
+        self.start_year = start_year
+        self.end_year = end_year
+        self.growth = growth
+        self.seasonal_amplitude = seasonal_amplitude
+        self.volume_seasonality = volume_seasonality
+        self.zipf_exponent = zipf_exponent
+        self.rating_noise = rating_noise
+        self.mood_std = mood_std
+
+    @property
+    def chunks(self):
+        return [min(self.chunk_rows, self.rows - start) for start in range(0, self.rows, self.chunk_rows)]
+
+
+_worker_state = {}
+
+
+def _init_worker(config):
+    _worker_state['config'] = config
+    _worker_state['catalogue'] = Catalogue(config.n_beers, config.n_breweries, config.seed, config.zipf_exponent)
+    _worker_state['month_cdf'] = _month_weights(config.start_year, config.end_year, config.growth,
+                                                config.volume_seasonality)
+    _worker_state['month_bounds'] = _month_bounds(config.start_year, config.end_year)
+
+
+def generate_chunk(rows, seed):
+    """One chunk of reviews as a pyarrow Table (call after _init_worker)."""
+    config = _worker_state['config']
+    catalogue = _worker_state['catalogue']
+    starts, ends = _worker_state['month_bounds']
+    rng = np.random.default_rng(seed)
+
+    beers = np.searchsorted(catalogue.beer_cdf, rng.random(rows), side='right')
+    beers = np.minimum(beers, catalogue.n_beers - 1)
+    months = np.minimum(np.searchsorted(_worker_state['month_cdf'], rng.random(rows), side='right'), len(starts) - 1)
+    review_time = starts[months] + (rng.random(rows) * (ends[months] - starts[months])).astype(np.int64)
+
+    # Seasonal rating shift: peaks in January for winter styles, in July for summer styles, none otherwise
+    month_of_year = months % 12
+    season = catalogue.style_season[catalogue.beer_style[beers]]
+    seasonal = config.seasonal_amplitude * season * np.cos(2 * np.pi * month_of_year / 12)
+
+    # Correlated components: beer quality + reviewer mood shared by all components + noise
+    base = catalogue.beer_quality[beers] + rng.normal(0, config.mood_std, rows) + seasonal
+    offsets = catalogue.beer_offsets[beers]
+    noise = config.rating_noise
+    ratings = {
+        'review_overall': _half_points(base + rng.normal(0, noise, rows)),
+        'review_aroma': _half_points(base + offsets[:, 0] + rng.normal(0, noise, rows)),
+        'review_appearance': _half_points(base + offsets[:, 1] + rng.normal(0, noise, rows)),
+        'review_palate': _half_points(base + offsets[:, 2] + rng.normal(0, noise, rows)),
+        'review_taste': _half_points(base + offsets[:, 3] + rng.normal(0, noise, rows)),
+    }
+
+    def dictionary(codes, names):
+        return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()), pa.array(names, type=pa.string()))
+
+    columns = {
+        'brewery_name': dictionary(catalogue.beer_brewery[beers], catalogue.brewery_names),
+        'review_time': pa.array(review_time, type=pa.int64()),
+        'beer_style': dictionary(catalogue.beer_style[beers], catalogue.style_names),
+        'beer_name': dictionary(beers, catalogue.beer_names),
+        'beer_abv': pa.array(catalogue.beer_abv[beers], type=pa.float64(), from_pandas=True),
+    }
+    columns.update({name: pa.array(values, type=pa.float64()) for name, values in ratings.items()})
+    return pa.table({name: columns[name] for name in COLUMNS})
+
+
+def _write_chunk(task):
+    index, rows, seed, path = task
+    pq.write_table(generate_chunk(rows, seed), path, compression='zstd')
+    return index, rows
+
+
+def generate(out_dir, config, workers=None, verbose=True):
+    """
+    Write `config.rows` synthetic reviews to out_dir/part-*.parquet using `workers` processes.
+
+    Returns the list of written files.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    for name in os.listdir(out_dir):
+        if name.startswith('part-') and name.endswith('.parquet'):
+            os.remove(os.path.join(out_dir, name))
+
+    chunks = config.chunks
+    seeds = np.random.SeedSequence([config.seed, 2]).spawn(len(chunks))
+    paths = [os.path.join(out_dir, f"part-{index:05d}.parquet") for index in range(len(chunks))]
+    tasks = [(index, rows, seed, path) for index, (rows, seed, path) in enumerate(zip(chunks, seeds, paths))]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+
+    start = time.perf_counter()
+    written = 0
+    if workers == 1:
+        _init_worker(config)
+        results = map(_write_chunk, tasks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,))
+        results = executor.map(_write_chunk, tasks)
+    try:
+        for index, rows in results:
+            written += rows
+            if verbose:
+                elapsed = time.perf_counter() - start
+                print(f"part-{index:05d}.parquet: {written:,} of {config.rows:,} rows "
+                      f"({written / max(elapsed, 1e-9):,.0f} rows/s)")
+    finally:
+        if workers > 1:
+            executor.shutdown()
+    return paths
@@ -0,0 +1,273 @@
+"""
+Regressions on frequency-compressed rating tuples.
+
+Ratings are half points from 1 to 5, so a review's (overall, aroma, taste,
+appearance, palate) takes at most 9^5 = 59,049 distinct values, however many
+reviews there are. The rating_tuples model collapses the reviews into those
+distinct tuples with a review_count in the warehouse (one GROUP BY), and the
+models here are fitted on the tuples with the counts as frequency weights:
+- weighted OLS: the Gram matrix of the weighted tuples equals the one of the
+  reviews, so the fit is identical to the streaming row-level regression
+- OLS with all pairwise interactions of the (centered) features
+- proportional-odds (ordinal logistic) regression of overall on the features,
+  fitted by Newton-Raphson on the weighted log-likelihood
+
+Each fit touches the distinct tuples only, so its time does not grow with the
+number of reviews.
+
+Ordinal logit: P(overall <= c_k) = 1 / (1 + exp(-(θ_k - xβ))) for every
+observed overall value c_k but the highest; a positive β moves reviews towards
+higher overall ratings (odds ratio exp(β) per rating point).
+"""
+
+import numpy as np
+import pandas as pd
+
+from beer_analysis.batches import batch_column, iter_arrow_batches
+from beer_analysis.instrumentation import stage
+from beer_analysis.regression import FEATURE_COLS, TARGET_COL, GramAccumulator, fit_from_gram, importance_table
+
+COUNT_COL = 'REVIEW_COUNT'
+TUPLE_MODELS = ('ols', 'interactions', 'ordinal_logit')
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-10
+
+
+def load_tuples(relation, feature_cols=FEATURE_COLS, target_col=TARGET_COL, count_col=COUNT_COL):
+    """Features, target and review counts of a rating_tuples relation (incomplete tuples dropped)."""
+    columns = feature_cols + [target_col, count_col]
+    with stage('read') as read:
+        parts = [
+            np.column_stack([
+                batch_column(batch, name).to_numpy(zero_copy_only=False).astype(float)
+                for name in columns
+            ])
+            for batch in iter_arrow_batches(relation, columns)
+            if read.input(batch).num_rows
+        ]
+    data = np.concatenate(parts) if parts else np.empty((0, len(columns)))
+    data = data[~np.isnan(data).any(axis=1) & (data[:, -1] > 0)]
+    return data[:, :-2], data[:, -2], data[:, -1]
+
+
+def weighted_ols(X, y, weights):
+    """OLS fit (beer_analysis.regression.fit_from_gram) of frequency-weighted rows."""
+    accumulator = GramAccumulator(X.shape[1]).update(X, y, weights)
+    return fit_from_gram(accumulator.gram)
+
+
+def interaction_terms(X, feature_cols, weights):
+    """
+    Features plus every pairwise product, with names like 'REVIEW_AROMA:REVIEW_TASTE'.
+
+    Features are centered on their weighted means before multiplying, so the main
+    effects stay the slopes at an average review and are not collinear with the
+    products.
+    """
+    centered = X - np.average(X, axis=0, weights=weights)
+    columns, names = [centered], list(feature_cols)
+    for i in range(len(feature_cols)):
+        for j in range(i + 1, len(feature_cols)):
+            columns.append(centered[:, [i]] * centered[:, [j]])
+            names.append(f"{feature_cols[i]}:{feature_cols[j]}")
+    return np.hstack(columns), names
+
+
+def _logistic(x):
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+def _ordinal_terms(theta, beta, X, category):
+    """Per-row cumulative probabilities and densities at the upper and lower threshold."""
+    eta = X @ beta
+    bounds = np.concatenate([[-np.inf], theta, [np.inf]])
+    upper = _logistic(bounds[category + 1] - eta)
+    lower = _logistic(bounds[category] - eta)
+    probability = np.maximum(upper - lower, 1e-300)
+    return upper, lower, probability
+
+
+def _ordinal_log_likelihood(theta, beta, X, category, weights):
+    if np.any(np.diff(theta) <= 0):
+        return -np.inf
+    return weights @ np.log(_ordinal_terms(theta, beta, X, category)[2])
+
+
+def fit_ordinal_logit(X, y, weights, max_iterations=MAX_ITERATIONS, tolerance=TOLERANCE):
+    """
+    Proportional-odds logistic regression of y on X with frequency weights.
+
+    Newton-Raphson with step halving on the exact log-likelihood (concave in
+    thresholds and slopes); standard errors come from the inverse observed
+    information at the optimum.
+    """
+    categories, category = np.unique(y, return_inverse=True)
+    n_thresholds, p = len(categories) - 1, X.shape[1]
+    if n_thresholds < 1:
+        raise ValueError("Ordinal regression needs at least two distinct target values")
+    n = weights.sum()
+
+    # Start from the marginal cumulative logits with flat slopes (the null model)
+    shares = np.cumsum(np.bincount(category, weights=weights, minlength=len(categories)))[:-1] / n
+    shares = np.clip(shares, 1e-6, 1 - 1e-6)
+    theta, beta = np.log(shares / (1 - shares)), np.zeros(p)
+    null_log_likelihood = _ordinal_log_likelihood(theta, beta, X, category, weights)
+
+    upper_index = np.minimum(category, n_thresholds - 1)
+    lower_index = np.maximum(category - 1, 0)
+    has_upper = (category < n_thresholds).astype(float)
+    has_lower = (category > 0).astype(float)
+
+    log_likelihood = null_log_likelihood
+    for iteration in range(1, max_iterations + 1):
+        upper, lower, probability = _ordinal_terms(theta, beta, X, category)
+        # Densities f = F(1 - F) and their derivatives f' = f(1 - 2F); zero at ±inf
+        f_upper, f_lower = upper * (1 - upper) * has_upper, lower * (1 - lower) * has_lower
+        d_upper, d_lower = f_upper * (1 - 2 * upper), f_lower * (1 - 2 * lower)
+        g_upper, g_lower = f_upper / probability, f_lower / probability
+        g_eta = g_upper - g_lower
+
+        gradient = np.concatenate([
+            np.bincount(upper_index, weights=weights * g_upper, minlength=n_thresholds)
+            - np.bincount(lower_index, weights=weights * g_lower, minlength=n_thresholds),
+            -X.T @ (weights * g_eta),
+        ])
+
+        hessian = np.zeros((n_thresholds + p, n_thresholds + p))
+        theta_block = hessian[:n_thresholds, :n_thresholds]
+        theta_block[np.diag_indices(n_thresholds)] += (
+            np.bincount(upper_index, weights=weights * (d_upper / probability - g_upper ** 2), minlength=n_thresholds)
+            + np.bincount(lower_index, weights=weights * (-d_lower / probability - g_lower ** 2), minlength=n_thresholds)
+        )
+        # Rows in a middle category tie their lower and upper threshold
+        middle = (has_upper * has_lower) > 0
+        cross = np.bincount(lower_index[middle], weights=(weights * g_upper * g_lower)[middle], minlength=n_thresholds)
+        theta_block[np.arange(n_thresholds - 1), np.arange(1, n_thresholds)] += cross[:-1]
+        theta_block[np.arange(1, n_thresholds), np.arange(n_thresholds - 1)] += cross[:-1]
+
+        upper_beta = -(d_upper / probability - g_upper * g_eta) * weights
+        lower_beta = (d_lower / probability - g_lower * g_eta) * weights
+        theta_beta = np.zeros((n_thresholds, p))
+        np.add.at(theta_beta, upper_index, upper_beta[:, None] * X)
+        np.add.at(theta_beta, lower_index, lower_beta[:, None] * X)
+        hessian[:n_thresholds, n_thresholds:] = theta_beta
+        hessian[n_thresholds:, :n_thresholds] = theta_beta.T
+        hessian[n_thresholds:, n_thresholds:] = (X * (weights * ((d_upper - d_lower) / probability - g_eta ** 2))[:, None]).T @ X
+
+        step = np.linalg.solve(hessian, -gradient)
+        # Halve the Newton step until the log-likelihood improves (and thresholds stay ordered)
+        scale = 1.0
+        while True:
+            candidate = (theta + scale * step[:n_thresholds], beta + scale * step[n_thresholds:])
+            candidate_log_likelihood = _ordinal_log_likelihood(*candidate, X, category, weights)
+            if candidate_log_likelihood >= log_likelihood - 1e-12 * abs(log_likelihood) or scale < 1e-8:
+                break
+            scale /= 2
+        theta, beta = candidate
+        converged = abs(candidate_log_likelihood - log_likelihood) <= tolerance * abs(log_likelihood)
+        log_likelihood = candidate_log_likelihood
+        if converged and np.max(np.abs(scale * step)) < 1e-6:
+            break
+
+    covariance = np.linalg.inv(-hessian)
+    std_errors = np.sqrt(np.diag(covariance))
+    feature_std = np.sqrt(np.average((X - np.average(X, axis=0, weights=weights)) ** 2, axis=0, weights=weights))
+    return {
+        'n': n,
+        'categories': categories,
+        'thresholds': theta,
+        'threshold_std_errors': std_errors[:n_thresholds],
+        'feature_coefficients': beta,
+        'std_coefficients': beta * feature_std,
+        'std_errors': std_errors[n_thresholds:],
+        'z_stats': beta / std_errors[n_thresholds:],
+        'log_likelihood': log_likelihood,
+        'null_log_likelihood': null_log_likelihood,
+        'pseudo_r_squared': 1 - log_likelihood / null_log_likelihood,
+        'iterations': iteration,
+    }
+
+
+def ordinal_table(fit, X, y, weights, feature_cols=FEATURE_COLS):
+    """
+    Feature importance table of an ordinal fit, shaped like `importance_table`.
+
+    Importance comes from the standardized log-odds coefficients; t_statistic
+    holds the Wald z. The thresholds follow as 'threshold_<c>' rows (log-odds of
+    overall <= c at x = 0), and MODEL_SUMMARY carries McFadden's pseudo R² in
+    standardized_coefficient and the log-likelihood in raw_coefficient.
+    """
+    coefficients = fit['std_coefficients']
+    importance_pct = np.abs(coefficients) / np.sum(np.abs(coefficients)) * 100
+    correlations = [
+        np.cov(X[:, i], y, aweights=weights)[0, 1] / np.sqrt(np.cov(X[:, i], aweights=weights) * np.cov(y, aweights=weights))
+        for i in range(X.shape[1])
+    ]
+    n = int(fit['n'])
+
+    results = pd.DataFrame({
+        'factor': [feature.replace('REVIEW_', '').lower() for feature in feature_cols],
+        'raw_coefficient': fit['feature_coefficients'],
+        'standardized_coefficient': coefficients,
+        'importance_percentage': importance_pct,
+        'standard_error': fit['std_errors'],
+        't_statistic': fit['z_stats'],
+        'correlation': correlations,
+        'sample_size': n,
+    })
+    results['rank'] = results['importance_percentage'].rank(ascending=False, method='min')
+
+    thresholds = pd.DataFrame({
+        'factor': [f"threshold_{category:g}" for category in fit['categories'][:-1]],
+        'raw_coefficient': fit['thresholds'],
+        'standard_error': fit['threshold_std_errors'],
+        't_statistic': fit['thresholds'] / fit['threshold_std_errors'],
+        'sample_size': n,
+    })
+    summary = pd.DataFrame([{
+        'factor': 'MODEL_SUMMARY',
+        'raw_coefficient': fit['log_likelihood'],
+        'standardized_coefficient': fit['pseudo_r_squared'],
+        'importance_percentage': n,
+        't_statistic': np.mean(np.abs(fit['z_stats'])),
+        'correlation': np.mean(correlations),
+        'sample_size': n,
+    }])
+    return pd.concat([results, thresholds, summary], ignore_index=True)
+
+
+def tuple_models(relation, models=TUPLE_MODELS, feature_cols=FEATURE_COLS, target_col=TARGET_COL):
+    """
+    Fit the requested models on a rating_tuples relation; one importance table per model, stacked.
+
+    models: any of 'ols', 'interactions' and 'ordinal_logit'
+    """
+    unknown = [name for name in models if name not in TUPLE_MODELS]
+    if unknown:
+        raise ValueError(f"Unknown tuple models: {unknown} (expected any of {TUPLE_MODELS})")
+
+    X, y, weights = load_tuples(relation, feature_cols, target_col)
+    print(f"{int(weights.sum()):,} reviews compressed to {len(y):,} distinct rating tuples")
+
+    tables = []
+    for name in models:
+        with stage(f'solve_{name}'):
+            if name == 'ols':
+                fit = weighted_ols(X, y, weights)
+                table = importance_table(fit, feature_cols)
+                print(f"OLS: R²={fit['r_squared']:.3f}")
+            elif name == 'interactions':
+                X_interactions, names = interaction_terms(X, feature_cols, weights)
+                fit = weighted_ols(X_interactions, y, weights)
+                table = importance_table(fit, names)
+                print(f"OLS with pairwise interactions: R²={fit['r_squared']:.3f}")
+            else:
+                fit = fit_ordinal_logit(X, y, weights)
+                table = ordinal_table(fit, X, y, weights, feature_cols)
+                print(f"Ordinal logit: pseudo R²={fit['pseudo_r_squared']:.3f} after {fit['iterations']} Newton steps")
+        top_factor = table.loc[table['rank'] == 1, 'factor'].iloc[0]
+        print(f"Most important factor ({name}): {top_factor.upper()}")
+        table.insert(0, 'model', name)
+        table['distinct_tuples'] = len(y)
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True)
@@ -1,79 +1,87 @@
 """
 Standalone F-test for Beer Seasonality Analysis
 Connects directly to Snowflake and performs statistical significance testing
+
+Connection settings come from the environment (SNOWFLAKE_ACCOUNT, SNOWFLAKE_USER,
+SNOWFLAKE_PASSWORD, optional SNOWFLAKE_ROLE / _WAREHOUSE / _DATABASE / _SCHEMA).
+Pass --duckdb <file> (or set BEER_ANALYSIS_DUCKDB) to run against the local
+DuckDB database written by `python -m beer_analysis.local run` instead.
 """
 
-import pandas as pd
-import numpy as np
-from scipy import stats
-import snowflake.connector
-from sqlalchemy import create_engine
+import argparse
+import os
+import time
+
+from beer_analysis.anova import anova_by_group, one_way_anova, welch_anova
+from beer_analysis.query import ConnectionPool, QueryRunner, duckdb_local, snowflake_from_env
 
-# Snowflake connection parameters (same as your dbt profiles.yml)
-SNOWFLAKE_CONFIG = {
-    'account': 'PPBJHRI-FD14477',
-    'user': 'KEELAN',
-    'password': 'WeC3LjgJwzBSQKZ',
-    'database': 'BEER_REVIEWS',
-    'schema': 'PREP',
-    'warehouse': 'COMPUTE_WH',
-    'role': 'ACCOUNTADMIN'
-}
+SEASONALITY_QUERY = """
+SELECT 
+    "MONTH",
+    "MONTH_NAME", 
+    "SEASONAL_INDEX",
+    "CHART_TYPE"
+FROM ANALYTICS.SEASONALITY_RESULTS
+WHERE "CHART_TYPE" = 'seasonal_pattern'
+ORDER BY "MONTH"
+"""
 
-def connect_to_snowflake():
-    """Create Snowflake connection"""
+# Per-month sufficient statistics for the F-test: instead of downloading every
+# individual rating, the warehouse returns count, sum and sum of squares of
+# REVIEW_OVERALL per month - overall and per beer style (GROUPING SETS)
+MONTHLY_STATS_QUERY = """
+WITH monthly_data AS (
+    SELECT 
+        "BEER_STYLE" as beer_style,
+        EXTRACT(MONTH FROM TO_TIMESTAMP("REVIEW_TIME")) as month,
+        "REVIEW_OVERALL" as rating
+    FROM PREP.STG_BEER_REVIEWS
+    WHERE "REVIEW_OVERALL" IS NOT NULL
+      AND "REVIEW_TIME" IS NOT NULL
+)
+SELECT 
+    CASE WHEN GROUPING(beer_style) = 1 THEN 'ALL' ELSE 'STYLE' END as level,
+    beer_style,
+    month,
+    COUNT(*) as n,
+    SUM(rating) as rating_sum,
+    SUM(rating * rating) as rating_sum_sq
+FROM monthly_data
+GROUP BY GROUPING SETS ((month), (beer_style, month))
+ORDER BY level, beer_style, month
+"""
+
+def connection_factory(duckdb_path=None):
+    """Create the connection factory (local DuckDB file or Snowflake from environment)"""
+    duckdb_path = duckdb_path or os.environ.get('BEER_ANALYSIS_DUCKDB')
     try:
-        conn = snowflake.connector.connect(**SNOWFLAKE_CONFIG)
-        print("✅ Connected to Snowflake successfully!")
-        return conn
+        factory = duckdb_local(duckdb_path) if duckdb_path else snowflake_from_env()
+        print(f"✅ Using {factory.description}")
+        return factory
     except Exception as e:
-        print(f"❌ Failed to connect to Snowflake: {e}")
+        print(f"❌ Failed to configure connection: {e}")
         return None
 
-def get_seasonality_data(conn):
+def get_seasonality_data(result):
     """Get seasonality results from your dbt models"""
-    query = """
-    SELECT 
-        "MONTH",
-        "MONTH_NAME", 
-        "SEASONAL_INDEX",
-        "CHART_TYPE"
-    FROM ANALYTICS.SEASONALITY_RESULTS
-    WHERE "CHART_TYPE" = 'seasonal_pattern'
-    ORDER BY "MONTH"
-    """
-    
-    try:
-        df = pd.read_sql(query, conn)
-        print(f"✅ Retrieved {len(df)} months of seasonal data")
-        return df
-    except Exception as e:
-        print(f"❌ Failed to get seasonality data: {e}")
+    if not result.ok:
+        print(f"❌ Failed to get seasonality data: {result.error}")
         return None
+    df = result.to_pandas()
+    print(f"✅ Retrieved {len(df)} months of seasonal data ({result.seconds:.2f}s)")
+    return df
 
-def get_monthly_raw_data(conn):
-    """Get raw monthly data for F-test"""
-    query = """
-    WITH monthly_data AS (
-        SELECT 
-            EXTRACT(MONTH FROM TO_TIMESTAMP("REVIEW_TIME")) as month,
-            "REVIEW_OVERALL"
-        FROM PREP.STG_BEER_REVIEWS
-        WHERE "REVIEW_OVERALL" IS NOT NULL
-    )
-    SELECT month, "REVIEW_OVERALL" as rating
-    FROM monthly_data
-    """
-    
-    try:
-        df = pd.read_sql(query, conn)
-        print(f"✅ Retrieved {len(df)} individual ratings for F-test")
-        return df
-    except Exception as e:
-        print(f"❌ Failed to get raw data: {e}")
+def get_monthly_stats(result):
+    """Get per-month sufficient statistics for the F-test"""
+    if not result.ok:
+        print(f"❌ Failed to get monthly statistics: {result.error}")
         return None
+    df = result.to_pandas()
+    total = int(df.loc[df['LEVEL'] == 'ALL', 'N'].sum())
+    print(f"✅ Retrieved {len(df)} monthly summary rows covering {total:,} ratings for F-test ({result.seconds:.2f}s)")
+    return df
 
-def perform_f_test(raw_data):
+def perform_f_test(monthly_stats):
     """
     Perform F-test (ANOVA) on monthly ratings
     
@@ -87,16 +95,19 @@ def perform_f_test(raw_data):
     - Compares variance BETWEEN months vs variance WITHIN months
     - High F-statistic = more variance between months than within = seasonality
     - Low p-value (< 0.05) = seasonality is statistically significant (likelihood of random chance is low)
+    
+    Both variances follow from per-month count, sum and sum of squares, so the test
+    runs on 12 summary rows instead of every rating. Welch's ANOVA (no equal-variance
+    assumption) is reported alongside the classic F-test.
     """
     try:
-        # GROUP DATA BY MONTH: Create 12 separate arrays of ratings (one per month)
-        # This is where we prepare the data for the F-test
-        month_groups = [group['RATING'].values for name, group in raw_data.groupby('MONTH')]
+        # MONTHLY GROUPS: count, sum and sum of squares for each of the 12 months
+        overall = monthly_stats[monthly_stats['LEVEL'] == 'ALL'].sort_values('MONTH')
         
-        # F-TEST EXECUTION: This is the actual statistical test
-        # scipy.stats.f_oneway() performs one-way ANOVA comparing all 12 monthly groups
-        # Returns: F-statistic (ratio of between-group to within-group variance) and p-value
-        f_statistic, p_value = stats.f_oneway(*month_groups)
+        # F-TEST EXECUTION: classic one-way ANOVA (identical to scipy.stats.f_oneway on raw ratings)
+        classic = one_way_anova(overall['N'], overall['RATING_SUM'], overall['RATING_SUM_SQ'])
+        welch = welch_anova(overall['N'], overall['RATING_SUM'], overall['RATING_SUM_SQ'])
+        f_statistic, p_value = classic['f_statistic'], classic['p_value']
         
         # STATISTICAL INTERPRETATION: Convert test results to business conclusion
         is_significant = p_value < 0.05  # Standard significance threshold
@@ -107,6 +118,9 @@ def perform_f_test(raw_data):
         print("="*50)
         print(f"F-statistic: {f_statistic:.4f}")
         print(f"P-value: {p_value:.6f}")
+        print(f"Effect size (eta²): {classic['eta_squared']:.6f}")
+        print(f"Welch F-statistic: {welch['f_statistic']:.4f} (df={welch['df_between']}, {welch['df_within']:.1f})")
+        print(f"Welch P-value: {welch['p_value']:.6f}")
         print(f"Significance (α=0.05): {significance_level}")
         print(f"Interpretation: {'✅ Seasonality is statistically significant' if is_significant else '❌ No significant seasonality detected'}")
         print("="*50)
@@ -115,47 +129,76 @@ def perform_f_test(raw_data):
             'f_statistic': f_statistic,
             'p_value': p_value,
             'is_significant': is_significant,
-            'significance_level': significance_level
+            'significance_level': significance_level,
+            'eta_squared': classic['eta_squared'],
+            'welch_f_statistic': welch['f_statistic'],
+            'welch_p_value': welch['p_value']
         }
         
     except Exception as e:
         print(f"❌ F-test failed: {e}")
         return None
 
+def perform_style_f_tests(monthly_stats, min_ratings=1000):
+    """
+    Per-style seasonality tests from the same monthly aggregates
+    
+    Runs the classic and Welch ANOVA for every beer style with at least
+    `min_ratings` ratings and lists the styles with the strongest seasonality.
+    """
+    styles = monthly_stats[monthly_stats['LEVEL'] == 'STYLE']
+    results = anova_by_group(styles, 'BEER_STYLE', count_col='N', sum_col='RATING_SUM', sum_sq_col='RATING_SUM_SQ')
+    results = results[results['total_ratings'] >= min_ratings].sort_values('welch_p_value')
+    
+    significant = (results['welch_p_value'] < 0.05).sum()
+    print(f"\n🍺 Per-style seasonality: {significant} of {len(results)} styles significant (Welch, α=0.05)")
+    print(results.head(10)[['BEER_STYLE', 'total_ratings', 'f_statistic', 'welch_p_value']].to_string(index=False))
+    return results
+
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="F-test for beer rating seasonality")
+    parser.add_argument('--duckdb', help="local DuckDB database instead of Snowflake")
+    args = parser.parse_args()
+    
     print("🚀 Starting local F-test analysis...")
     
-    # Connect to Snowflake
-    conn = connect_to_snowflake()
-    if not conn:
+    # Connect to Snowflake (or the local DuckDB database)
+    factory = connection_factory(args.duckdb)
+    if not factory:
         return
     
-    try:
-        # Get seasonality results
-        seasonality_df = get_seasonality_data(conn)
-        if seasonality_df is not None:
-            print("\n📈 Current Seasonality Pattern:")
-            print(seasonality_df[['MONTH_NAME', 'SEASONAL_INDEX']])
-        
-        # Get raw data for F-test
-        raw_data = get_monthly_raw_data(conn)
-        if raw_data is not None:
-            # Perform F-test
-            f_test_results = perform_f_test(raw_data)
-            
-            if f_test_results:
-                print(f"\n💡 Business Insight:")
-                if f_test_results['is_significant']:
-                    print("Your seasonality analysis is statistically valid!")
-                    print("You can confidently use these patterns for portfolio planning.")
-                else:
-                    print("The seasonal patterns may not be statistically reliable.")
-                    print("Consider gathering more data or using caution in business decisions.")
+    # Both queries are independent - run them concurrently on pooled connections
+    with ConnectionPool(factory, size=2) as pool:
+        start = time.perf_counter()
+        results = QueryRunner(pool).run({
+            'seasonality': SEASONALITY_QUERY,
+            'monthly_stats': MONTHLY_STATS_QUERY,
+        })
+        print(f"⏱️  Queries finished in {time.perf_counter() - start:.2f}s")
+    print("🔌 Disconnected")
+    
+    # Get seasonality results
+    seasonality_df = get_seasonality_data(results['seasonality'])
+    if seasonality_df is not None:
+        print("\n📈 Current Seasonality Pattern:")
+        print(seasonality_df[['MONTH_NAME', 'SEASONAL_INDEX']])
     
-    finally:
-        conn.close()
-        print("\n🔌 Disconnected from Snowflake")
+    # Get monthly aggregates for F-test
+    monthly_stats = get_monthly_stats(results['monthly_stats'])
+    if monthly_stats is not None:
+        # Perform F-test
+        f_test_results = perform_f_test(monthly_stats)
+        perform_style_f_tests(monthly_stats)
+        
+        if f_test_results:
+            print(f"\n💡 Business Insight:")
+            if f_test_results['is_significant']:
+                print("Your seasonality analysis is statistically valid!")
+                print("You can confidently use these patterns for portfolio planning.")
+            else:
+                print("The seasonal patterns may not be statistically reliable.")
+                print("Consider gathering more data or using caution in business decisions.")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
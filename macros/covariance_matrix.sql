@@ -0,0 +1,83 @@
+{#
+    Covariance / correlation matrices from one aggregation pass.
+
+    cross_moments() emits, for every pair of dimensions (diagonal included), the
+    pairwise-complete moments n, sum_x, sum_y, sum_xx, sum_yy and sum_xy: adding
+    `0 * other` makes a value NULL whenever the other column is NULL, so each pair
+    only counts rows where both are present (what corr() does). Every pair is a
+    set of extra aggregates in the same GROUP BY - adding a dimension adds columns,
+    never another scan.
+
+    covariance_long() turns one row of cross moments per group into one row per
+    pair (upper triangle plus diagonal) by joining a constant list of pairs, so
+    the moments are read once. Relationship labels are '<x>_vs_<y>' in the order
+    the dimensions are listed.
+
+    dimensions: list of [label, column] pairs, e.g. [['aroma', 'review_aroma'], ...]
+#}
+
+{% macro cross_moments(dimensions) -%}
+    {%- for i in range(dimensions | length) %}
+    {%- for j in range(i, dimensions | length) %}
+    {%- set x = dimensions[i][1] %}
+    {%- set y = dimensions[j][1] %}
+    {%- set pair = dimensions[i][0] ~ '__' ~ dimensions[j][0] %}
+    count({{ x }} * {{ y }}) as {{ pair }}_n,
+    sum({{ x }} + 0 * {{ y }}) as {{ pair }}_sum_x,
+    sum({{ y }} + 0 * {{ x }}) as {{ pair }}_sum_y,
+    sum({{ x }} * {{ x }} + 0 * {{ y }}) as {{ pair }}_sum_xx,
+    sum({{ y }} * {{ y }} + 0 * {{ x }}) as {{ pair }}_sum_yy,
+    sum({{ x }} * {{ y }}) as {{ pair }}_sum_xy{{ "," if not (loop.last and i == (dimensions | length) - 1) }}
+    {%- endfor %}
+    {%- endfor %}
+{%- endmacro %}
+
+{% macro covariance_pairs(dimensions) -%}
+    select * from (values
+    {%- for i in range(dimensions | length) %}
+    {%- set outer_last = loop.last %}
+    {%- for j in range(i, dimensions | length) %}
+        ('{{ dimensions[i][0] }}', '{{ dimensions[j][0] }}'){{ "," if not (loop.last and outer_last) }}
+    {%- endfor %}
+    {%- endfor %}
+    ) as pairs (component_x, component_y)
+{%- endmacro %}
+
+{% macro covariance_long(moments, dimensions, group_columns=[]) -%}
+    {%- set measures = ['n', 'sum_x', 'sum_y', 'sum_xx', 'sum_yy', 'sum_xy'] %}
+    with pair_moments as (
+        select
+            {%- for column in group_columns %}
+            m.{{ column }},
+            {%- endfor %}
+            p.component_x,
+            p.component_y,
+            {%- for measure in measures %}
+            case
+                {%- for i in range(dimensions | length) %}
+                {%- for j in range(i, dimensions | length) %}
+                when p.component_x = '{{ dimensions[i][0] }}' and p.component_y = '{{ dimensions[j][0] }}'
+                    then m.{{ dimensions[i][0] }}__{{ dimensions[j][0] }}_{{ measure }}
+                {%- endfor %}
+                {%- endfor %}
+            end as {{ measure }}{{ "," if not loop.last }}
+            {%- endfor %}
+        from {{ moments }} m
+        cross join ({{ covariance_pairs(dimensions) }}) p
+    )
+
+    select
+        {%- for column in group_columns %}
+        {{ column }},
+        {%- endfor %}
+        component_x || '_vs_' || component_y as relationship,
+        component_x,
+        component_y,
+        n as sample_size,
+        case when n > 1 then (sum_xy - sum_x * sum_y / n) / (n - 1) end as covariance,
+        case when n > 1 then
+            (n * sum_xy - sum_x * sum_y)
+            / nullif(sqrt(greatest(n * sum_xx - sum_x * sum_x, 0) * greatest(n * sum_yy - sum_y * sum_y, 0)), 0)
+        end as correlation
+    from pair_moments
+{%- endmacro %}
@@ -0,0 +1,86 @@
+{#
+    Helpers for the segmented feature importance regression.
+
+    A segment is a dict from the `feature_importance_segments` var. Every key is
+    optional and all given keys are combined with AND:
+      abv_above / abv_at_most   ABV bin (beer_abv > abv_above and beer_abv <= abv_at_most)
+      styles / exclude_styles   lists of beer styles
+      breweries                 list of brewery names
+      year_from / year_to       inclusive review year range
+      top_style                 true = only the top 1 style, false = exclude it
+      where                     raw SQL predicate over the `reviews` CTE
+
+    Reviews are keyed by integer style_key / brewery_key (fct_reviews), so the
+    style and brewery lists are resolved to key sets through the dimension tables
+    passed in as `styles` and `breweries` (dim_style, dim_brewery relations); a
+    raw `where` sees the keys, beer_abv, review_year and the ratings.
+#}
+
+{% macro sql_string_list(values) -%}
+    {%- for value in values -%}
+        '{{ value | replace("'", "''") }}'{{ ", " if not loop.last }}
+    {%- endfor -%}
+{%- endmacro %}
+
+{% macro segment_predicate(segment, styles, breweries) -%}
+    {%- set conditions = [] -%}
+    {%- if segment.abv_above is defined and segment.abv_above is not none -%}
+        {%- do conditions.append("beer_abv > " ~ segment.abv_above) -%}
+    {%- endif -%}
+    {%- if segment.abv_at_most is defined and segment.abv_at_most is not none -%}
+        {%- do conditions.append("beer_abv <= " ~ segment.abv_at_most) -%}
+    {%- endif -%}
+    {%- if segment.styles -%}
+        {%- do conditions.append("style_key in (select style_key from " ~ styles ~ " where beer_style in (" ~ sql_string_list(segment.styles) ~ "))") -%}
+    {%- endif -%}
+    {%- if segment.exclude_styles -%}
+        {%- do conditions.append("style_key in (select style_key from " ~ styles ~ " where beer_style not in (" ~ sql_string_list(segment.exclude_styles) ~ "))") -%}
+    {%- endif -%}
+    {%- if segment.breweries -%}
+        {%- do conditions.append("brewery_key in (select brewery_key from " ~ breweries ~ " where brewery_name in (" ~ sql_string_list(segment.breweries) ~ "))") -%}
+    {%- endif -%}
+    {%- if segment.year_from is defined and segment.year_from is not none -%}
+        {%- do conditions.append("review_year >= " ~ segment.year_from) -%}
+    {%- endif -%}
+    {%- if segment.year_to is defined and segment.year_to is not none -%}
+        {%- do conditions.append("review_year <= " ~ segment.year_to) -%}
+    {%- endif -%}
+    {%- if segment.top_style is defined and segment.top_style is not none -%}
+        {%- do conditions.append(("" if segment.top_style else "not ") ~ "is_top_1_style") -%}
+    {%- endif -%}
+    {%- if segment.where -%}
+        {%- do conditions.append("(" ~ segment.where ~ ")") -%}
+    {%- endif -%}
+    {{- conditions | join(" and ") if conditions else "true" -}}
+{%- endmacro %}
+
+{#
+    Conditional sums that make up the Gram matrix Z'Z of Z = [1, columns...]
+    for the rows matching `predicate`. Column names are prefixed so several
+    segments can be aggregated in the same select (one scan for all segments).
+#}
+{% macro gram_aggregates(columns, predicate, prefix) -%}
+    sum(case when {{ predicate }} then 1 else 0 end) as {{ prefix }}review_count,
+    {%- for a in columns %}
+    sum(case when {{ predicate }} then {{ a }} end) as {{ prefix }}sum_{{ a }},
+    {%- endfor %}
+    {%- for a in columns %}
+        {%- set outer = loop %}
+        {%- for b in columns[outer.index0:] %}
+    sum(case when {{ predicate }} then {{ a }} * {{ b }} end) as {{ prefix }}cross_{{ a }}__{{ b }}{{ "," if not (outer.last and loop.last) }}
+        {%- endfor %}
+    {%- endfor %}
+{%- endmacro %}
+
+{% macro gram_columns(columns, prefix) -%}
+    {{ prefix }}review_count as review_count,
+    {%- for a in columns %}
+    {{ prefix }}sum_{{ a }} as sum_{{ a }},
+    {%- endfor %}
+    {%- for a in columns %}
+        {%- set outer = loop %}
+        {%- for b in columns[outer.index0:] %}
+    {{ prefix }}cross_{{ a }}__{{ b }} as cross_{{ a }}__{{ b }}{{ "," if not (outer.last and loop.last) }}
+        {%- endfor %}
+    {%- endfor %}
+{%- endmacro %}
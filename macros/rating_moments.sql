@@ -0,0 +1,45 @@
+{#
+    Additive rating measures (count, sum, sum of squares) and the averages /
+    standard deviations derived from them. Storing moments instead of averages
+    keeps aggregates mergeable: any rollup is just a sum of the stored columns.
+#}
+
+{% macro rating_moments(columns) -%}
+    {%- for column in columns %}
+    count({{ column }}) as {{ column }}_count,
+    sum({{ column }}) as {{ column }}_sum,
+    sum({{ column }} * {{ column }}) as {{ column }}_sum_sq{{ "," if not loop.last }}
+    {%- endfor %}
+{%- endmacro %}
+
+{% macro rollup_moments(columns) -%}
+    {%- for column in columns %}
+    sum({{ column }}_count) as {{ column }}_count,
+    sum({{ column }}_sum) as {{ column }}_sum,
+    sum({{ column }}_sum_sq) as {{ column }}_sum_sq{{ "," if not loop.last }}
+    {%- endfor %}
+{%- endmacro %}
+
+{% macro avg_from_moments(column, alias) -%}
+    {{ column }}_sum / nullif({{ column }}_count, 0) as {{ alias }}
+{%- endmacro %}
+
+{% macro stddev_from_moments(column, alias) -%}
+    case when {{ column }}_count > 1 then sqrt(greatest(
+        ({{ column }}_sum_sq - {{ column }}_sum * {{ column }}_sum / {{ column }}_count) / ({{ column }}_count - 1), 0
+    )) end as {{ alias }}
+{%- endmacro %}
+
+{% macro rating_extremes(columns) -%}
+    {%- for column in columns %}
+    min({{ column }}) as {{ column }}_min,
+    max({{ column }}) as {{ column }}_max{{ "," if not loop.last }}
+    {%- endfor %}
+{%- endmacro %}
+
+{% macro rollup_extremes(columns) -%}
+    {%- for column in columns %}
+    min({{ column }}_min) as {{ column }}_min,
+    max({{ column }}_max) as {{ column }}_max{{ "," if not loop.last }}
+    {%- endfor %}
+{%- endmacro %}
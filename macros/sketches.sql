@@ -0,0 +1,65 @@
+{#
+    Mergeable sketches: HyperLogLog for distinct counts, t-digest for quantiles.
+
+    COUNT(DISTINCT ...) and exact percentiles cannot be summed across groups, so
+    a month x style table of distinct counts cannot be rolled up to months, styles
+    or years, nor maintained incrementally. A sketch can: each macro family has
+    - *_accumulate(column): aggregate a column into a sketch state (store it)
+    - *_combine(state): aggregate stored states into one state (any rollup)
+    - *_estimate(state, ...): read the distinct count / quantile from a state
+
+    On Snowflake these are the native HLL_* functions (states kept as OBJECTs via
+    HLL_EXPORT / HLL_IMPORT, error around 1.6%) and APPROX_PERCENTILE_* (t-digest
+    states, already OBJECTs). DuckDB, used by the local runner, has no exportable
+    sketch states, so there the states are exact: the distinct values, and the
+    values themselves for quantiles. Same SQL, same results shape; only the
+    accuracy and the state size differ.
+#}
+
+{% macro hll_accumulate(column) -%}
+    {%- if target.type == 'duckdb' -%}
+    list_distinct(list({{ column }}))
+    {%- else -%}
+    hll_export(hll_accumulate({{ column }}))
+    {%- endif -%}
+{%- endmacro %}
+
+{% macro hll_combine(state) -%}
+    {%- if target.type == 'duckdb' -%}
+    list_distinct(flatten(list({{ state }})))
+    {%- else -%}
+    hll_export(hll_combine(hll_import({{ state }})))
+    {%- endif -%}
+{%- endmacro %}
+
+{% macro hll_estimate(state) -%}
+    {%- if target.type == 'duckdb' -%}
+    len({{ state }})
+    {%- else -%}
+    hll_estimate(hll_import({{ state }}))
+    {%- endif -%}
+{%- endmacro %}
+
+{% macro tdigest_accumulate(column) -%}
+    {%- if target.type == 'duckdb' -%}
+    list({{ column }}) filter (where {{ column }} is not null)
+    {%- else -%}
+    approx_percentile_accumulate({{ column }})
+    {%- endif -%}
+{%- endmacro %}
+
+{% macro tdigest_combine(state) -%}
+    {%- if target.type == 'duckdb' -%}
+    flatten(list({{ state }}))
+    {%- else -%}
+    approx_percentile_combine({{ state }})
+    {%- endif -%}
+{%- endmacro %}
+
+{% macro tdigest_estimate(state, quantile) -%}
+    {%- if target.type == 'duckdb' -%}
+    list_aggregate({{ state }}, 'quantile_cont', {{ quantile }})
+    {%- else -%}
+    approx_percentile_estimate({{ state }}, {{ quantile }})
+    {%- endif -%}
+{%- endmacro %}
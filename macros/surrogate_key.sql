@@ -0,0 +1,24 @@
+{#
+    Integer surrogate key of a combination of columns.
+
+    The dimension tables (dim_beer, dim_brewery, dim_style) and fct_reviews key
+    beers, breweries and styles by a 64-bit hash of their natural key rather than
+    by the name strings, so every downstream join and group-by compares one
+    integer instead of several varchars. A hash needs no lookup of already
+    assigned keys: the fact table computes the same key as the dimension, in any
+    order, on full and incremental runs alike, and a key never changes once
+    assigned. NULLs hash to a fixed value, so a missing style or ABV is a key of
+    its own. With 64 bits, a collision among a few million beers has a
+    probability around 1e-7.
+
+    Snowflake's HASH returns a signed 64-bit NUMBER; DuckDB's hash returns an
+    unsigned 64-bit integer, shifted here into the BIGINT range.
+#}
+
+{% macro surrogate_key(columns) -%}
+    {%- if target.type == 'duckdb' -%}
+    cast(cast(hash({{ columns | join(', ') }}) as hugeint) - 9223372036854775808 as bigint)
+    {%- else -%}
+    hash({{ columns | join(', ') }})
+    {%- endif -%}
+{%- endmacro %}
@@ -2,24 +2,26 @@
 
 -- Analysis: Which brewery produces the strongest beers by ABV%?
 
-with beer_data as (
-    select * from {{ ref('stg_beer_reviews') }}
-),
-
-brewery_abv_stats as (
+with brewery_abv_stats as (
     select * from {{ ref('int_brewery_abv_stats') }}
 ),
 
 brewery_rankings as (
     select 
         brewery_name,
-        total_beers,
+        distinct_beers as total_beers,
         round(avg_abv, 2) as avg_abv,
         round(max_abv, 2) as max_abv,
         round(min_abv, 2) as min_abv,
         round(stddev_abv, 2) as stddev_abv,
+        round(median_abv, 2) as median_abv,
+        round(p95_abv, 2) as p95_abv,
         row_number() over (order by avg_abv desc) as rank_by_avg_abv,
-        row_number() over (order by max_abv desc) as rank_by_max_abv
+        row_number() over (order by max_abv desc) as rank_by_max_abv,
+        -- Quantile rankings from the merged t-digests: robust to a single extreme beer
+        row_number() over (order by median_abv desc) as rank_by_median_abv,
+        row_number() over (order by p95_abv desc) as rank_by_p95_abv,
+        percent_rank() over (order by median_abv) as median_abv_percentile
     from brewery_abv_stats
 )
 
@@ -12,7 +12,7 @@ in determining overall beer quality?"
 
 METHODOLOGY:
 - Simple multiple linear regression: overall = f(aroma, taste, appearance, palate)
-- Include basic controls: brewery_name, beer_style, beer_abv
+- Include basic controls: brewery, beer style (integer keys of dim_brewery / dim_style), beer_abv
 - Filter for complete records only
 
 STATISTICAL APPROACH:
@@ -32,15 +32,15 @@ with clean_data as (
         review_appearance,
         review_palate,
         
-        -- Control variables
-        brewery_name,
-        beer_style,
+        -- Control variables (integer keys; names in dim_brewery / dim_style)
+        brewery_key,
+        style_key,
         beer_abv,
         
-        -- Identifiers (for reference)
-        beer_name
+        -- Identifiers (for reference, see dim_beer)
+        beer_key
         
-    from {{ ref('stg_beer_reviews') }}
+    from {{ ref('fct_reviews') }}
     
     -- Filter for complete records only
     where review_overall is not null
@@ -48,8 +48,7 @@ with clean_data as (
       and review_taste is not null
       and review_appearance is not null
       and review_palate is not null
-      and brewery_name is not null
-      and beer_style is not null
+      and style_key in (select style_key from {{ ref('dim_style') }} where beer_style is not null)
 )
 
 select * from clean_data
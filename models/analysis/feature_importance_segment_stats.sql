@@ -0,0 +1,88 @@
+-- Per-segment sufficient statistics (n, sums and cross-products of the rating
+-- components) for the segmented feature importance regression, in one scan.
+{{ config(materialized='table') }}
+
+/*
+PURPOSE:
+Every market segment used to be its own model with its own scan of stg_beer_reviews
+and its own regression. Here all segments from the `feature_importance_segments`
+var are aggregated in a single pass: each segment contributes one set of
+conditional sums to the same select. feature_importance_segments.py then solves
+one regression per segment from these few rows.
+
+Adding a segment adds columns to the scan, not another scan.
+
+BOOTSTRAP:
+With `feature_importance_bootstrap_replicates` > 0 every review is hashed into one of
+`feature_importance_bootstrap_blocks` blocks and the sums are grouped by block, so
+each segment gets one row per block. The Python model adds the blocks back up for
+the point estimate and Poisson-weights them for the bootstrap replicates.
+*/
+
+{%- set segments = var('feature_importance_segments') %}
+{%- set columns = ['review_aroma', 'review_taste', 'review_appearance', 'review_palate', 'review_overall'] %}
+{%- set bootstrap = var('feature_importance_bootstrap_replicates', 0) | int > 0 %}
+{%- set blocks = var('feature_importance_bootstrap_blocks', 1024) | int %}
+
+with top_1_style as (
+    -- Grouped by the integer style_key; the style names are only read from dim_style
+    select style_key
+    from {{ ref('fct_reviews') }}
+    where review_overall is not null
+      and style_key in (select style_key from {{ ref('dim_style') }} where beer_style is not null)
+    group by style_key
+    having count(*) >= 1000
+    order by avg(review_overall) desc
+    limit 1
+),
+
+reviews as (
+    select
+        f.review_overall,
+        f.review_aroma,
+        f.review_taste,
+        f.review_appearance,
+        f.review_palate,
+        f.style_key,
+        f.brewery_key,
+        f.beer_abv,
+        extract(year from to_timestamp(f.review_time)) as review_year,
+        t.style_key is not null as is_top_1_style{{ "," if bootstrap }}
+        {%- if bootstrap %}
+        abs(mod(hash(f.beer_key, f.review_time, f.review_overall, f.review_aroma), {{ blocks }})) as bootstrap_block
+        {%- endif %}
+    from {{ ref('fct_reviews') }} f
+    left join top_1_style t on f.style_key = t.style_key
+    -- Complete records only, as in the single-segment regressions
+    where f.review_overall is not null
+      and f.review_aroma is not null
+      and f.review_taste is not null
+      and f.review_appearance is not null
+      and f.review_palate is not null
+),
+
+segment_sums as (
+    select
+    {%- if bootstrap %}
+        bootstrap_block,
+    {%- endif %}
+    {%- for segment in segments %}
+        {{ gram_aggregates(columns, segment_predicate(segment, ref('dim_style'), ref('dim_brewery')), 'seg_' ~ loop.index ~ '_') }}{{ "," if not loop.last }}
+    {%- endfor %}
+    from reviews
+    {%- if bootstrap %}
+    group by bootstrap_block
+    {%- endif %}
+)
+
+{% for segment in segments %}
+select
+    '{{ segment.name | replace("'", "''") }}' as market_segment,
+    {{ loop.index }} as segment_order,
+    {%- if bootstrap %}
+    bootstrap_block,
+    {%- endif %}
+    {{ gram_columns(columns, 'seg_' ~ loop.index ~ '_') }}
+from segment_sums
+{{ "union all" if not loop.last }}
+{% endfor %}
@@ -3,13 +3,20 @@
 {{ config(materialized='table') }}
 
 with review_counts as (
+    -- Rolled up from the per-beer aggregate (all styles / ABVs of a beer name and brewery)
     select
-        beer_name,
-        brewery_name,
-        COUNT(*) as review_count,
-        AVG(review_overall) as avg_overall_rating
-    from {{ ref('stg_beer_reviews') }}
-    group by 1, 2
+        beer_name_key,
+        SUM(review_count) as review_count,
+        SUM(review_overall_sum) / NULLIF(SUM(review_overall_count), 0) as avg_overall_rating
+    from {{ ref('int_beer_stats') }}
+    group by 1
+),
+
+portfolio_beers as (
+    -- Portfolio names resolved to catalogue beer_names (normalized exact matches, see portfolio_beers)
+    select portfolio_category, beer_name
+    from {{ ref('portfolio_beers') }}
+    where beer_name is not null
 ),
 
 balanced_excellence as (
@@ -21,15 +28,12 @@ balanced_excellence as (
         'balanced_excellence' as ranking_method,
         rc.review_count,
         round(rc.avg_overall_rating, 3) as avg_overall_rating,
-        case 
-            when be.beer_name in ('Rare D.O.S.', 'Veritas 005', 'Dirty Horse') then 'Premium Portfolio'
-            when be.beer_name in ('Pliny the Elder', 'Weihenstephaner Hefeweissbier', 'Two Hearted Ale') then 'Core Portfolio'
-            else 'Other'
-        end as portfolio_category
+        coalesce(pb.portfolio_category, 'Other') as portfolio_category
     from {{ ref('int_reco_balanced_excellence') }} be
     left join review_counts rc 
-        on be.beer_name = rc.beer_name 
-        and be.brewery_name = rc.brewery_name
+        on be.beer_name_key = rc.beer_name_key
+    left join portfolio_beers pb
+        on be.beer_name = pb.beer_name
     where be.balanced_rank in (1,2,3,4,5)
 ),
 
@@ -42,15 +46,12 @@ high_overall_rating as (
         'highest_overall' as ranking_method,
         rc.review_count,
         round(rc.avg_overall_rating, 3) as avg_overall_rating,
-        case 
-            when ho.beer_name in ('Rare D.O.S.', 'Veritas 005', 'Dirty Horse') then 'Premium Portfolio'
-            when ho.beer_name in ('Pliny the Elder', 'Weihenstephaner Hefeweissbier', 'Two Hearted Ale') then 'Core Portfolio'
-            else 'Other'
-        end as portfolio_category
+        coalesce(pb.portfolio_category, 'Other') as portfolio_category
     from {{ ref('int_reco_highest_overall') }} ho
     left join review_counts rc 
-        on ho.beer_name = rc.beer_name 
-        and ho.brewery_name = rc.brewery_name
+        on ho.beer_name_key = rc.beer_name_key
+    left join portfolio_beers pb
+        on ho.beer_name = pb.beer_name
     where ho.overall_rank in (1,2,3,4,5)
 ),
 
@@ -63,15 +64,12 @@ diversity_ranking as (
         'style_diversity' as ranking_method,
         rc.review_count,
         round(rc.avg_overall_rating, 3) as avg_overall_rating,
-        case 
-            when dr.beer_name in ('Rare D.O.S.', 'Veritas 005', 'Dirty Horse') then 'Premium Portfolio'
-            when dr.beer_name in ('Pliny the Elder', 'Weihenstephaner Hefeweissbier', 'Two Hearted Ale') then 'Core Portfolio'
-            else 'Other'
-        end as portfolio_category
+        coalesce(pb.portfolio_category, 'Other') as portfolio_category
     from {{ ref('int_reco_style_diversity') }} dr
     left join review_counts rc 
-        on dr.beer_name = rc.beer_name 
-        and dr.brewery_name = rc.brewery_name
+        on dr.beer_name_key = rc.beer_name_key
+    left join portfolio_beers pb
+        on dr.beer_name = pb.beer_name
     where dr.diversity_rank in (1,2,3,4,5)
 ),
 
@@ -84,15 +82,12 @@ statistical_confidence_ranking as (
         'statistical_confidence' as ranking_method,
         rc.review_count,
         round(rc.avg_overall_rating, 3) as avg_overall_rating,
-        case 
-            when sc.beer_name in ('Rare D.O.S.', 'Veritas 005', 'Dirty Horse') then 'Premium Portfolio'
-            when sc.beer_name in ('Pliny The Elder', 'Weihenstephaner Hefeweissbier', 'Two Hearted Ale') then 'Core Portfolio'
-            else 'Other'
-        end as portfolio_category
+        coalesce(pb.portfolio_category, 'Other') as portfolio_category
     from {{ ref('int_reco_statistical_confidence') }} sc
     left join review_counts rc 
-        on sc.beer_name = rc.beer_name 
-        and sc.brewery_name = rc.brewery_name
+        on sc.beer_name_key = rc.beer_name_key
+    left join portfolio_beers pb
+        on sc.beer_name = pb.beer_name
     where sc.confidence_rank in (1,2,3,4,5)
 )
 
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+from beer_analysis.bootstrap import bootstrap_importance, bootstrap_settings
+from beer_analysis.instrumentation import model_metrics, stage
+from beer_analysis.regression import fit_from_gram, gram_from_moments, importance_table
+
+## QUESTION 3 ANALYSIS: Feature Importance Regression for N Market Segments
+
+def model(dbt, session):
+    """
+    Segmented Multiple Linear Regression: feature importance for every configured market segment.
+
+    Regression per segment: overall_rating = β₀ + β₁(aroma) + β₂(taste) + β₃(appearance) + β₄(palate) + ε
+
+    KEY INSIGHTS:
+    - Segments (ABV bins, styles, brewery lists, year ranges) come from the
+      `feature_importance_segments` var and are aggregated in ONE scan by
+      feature_importance_segment_stats
+    - Each segment is a single row of sufficient statistics, so its regression is
+      solved in closed form without touching individual reviews
+    - Importance uses raw coefficients by default, like the single-segment models;
+      set the `importance_basis` config to 'standardized' to rank on standardized coefficients
+    - With the `feature_importance_bootstrap_replicates` var > 0 the stats come in
+      per-block rows, and the output gains bootstrap CIs and rank stability
+    """
+
+    basis = dbt.config.get("importance_basis", "raw")
+    bootstrap_config = {
+        'bootstrap_replicates': dbt.config.get("bootstrap_replicates"),
+        'bootstrap_blocks': dbt.config.get("bootstrap_blocks"),
+        'bootstrap_processes': dbt.config.get("bootstrap_processes"),
+        'bootstrap_seed': dbt.config.get("bootstrap_seed"),
+    }
+    bootstrap = bootstrap_settings(bootstrap_config)
+
+    with model_metrics(dbt, session, dbt.config.get("invocation_id")) as metrics:
+        # One row of sufficient statistics per segment (per segment and block when bootstrapping)
+        with stage('load') as load:
+            segment_stats = load.input(dbt.ref("feature_importance_segment_stats").to_pandas())
+        segment_stats.columns = [col.upper() for col in segment_stats.columns]
+        segment_stats = segment_stats.sort_values('SEGMENT_ORDER')
+
+        results = []
+        for segment_order, rows in segment_stats.groupby('SEGMENT_ORDER', sort=True):
+            segment = rows['MARKET_SEGMENT'].iloc[0]
+
+            # Need more observations than parameters (4 features + intercept)
+            if rows['REVIEW_COUNT'].sum() <= 5:
+                print(f"Skipping segment '{segment}': not enough reviews")
+                continue
+
+            # Blocks without reviews of this segment have NULL sums
+            block_grams = np.stack([gram_from_moments(row) for _, row in rows.fillna(0).iterrows()])
+            fit = fit_from_gram(block_grams.sum(axis=0))
+            segment_results = importance_table(fit, basis=basis, variance_explained=True)
+            if bootstrap['bootstrap_replicates'] and 'BOOTSTRAP_BLOCK' in rows.columns:
+                segment_results = bootstrap_importance(
+                    segment_results, block_grams, bootstrap['bootstrap_replicates'],
+                    basis=basis, seed=bootstrap['seed'], processes=bootstrap['processes']
+                )
+            segment_results.insert(0, 'market_segment', segment)
+            segment_results['segment_order'] = int(segment_order)
+            results.append(segment_results)
+
+            top_factor = segment_results.loc[segment_results['rank'] == 1, 'factor'].iloc[0]
+            print(f"{segment}: {int(fit['n']):,} reviews, R²={fit['r_squared']:.3f}, most important factor: {top_factor.upper()}")
+
+        if not results:
+            # No segment had enough reviews: an empty table with the usual columns
+            print("No segment has enough reviews for a regression")
+            empty = pd.DataFrame({
+                'market_segment': pd.Series(dtype='string'),
+                'factor': pd.Series(dtype='string'),
+                **{column: pd.Series(dtype='float64') for column in [
+                    'raw_coefficient', 'standardized_coefficient', 'importance_percentage', 'variance_explained',
+                    'standard_error', 't_statistic', 'correlation', 'rank',
+                ]},
+                'sample_size': pd.Series(dtype='int64'),
+                'segment_order': pd.Series(dtype='int64'),
+            })
+            return metrics.output(empty)
+
+        return metrics.output(pd.concat(results, ignore_index=True))
@@ -0,0 +1,39 @@
+from beer_analysis.cache import ResultCache, cache_settings
+from beer_analysis.instrumentation import model_metrics
+from beer_analysis.tuples import TUPLE_MODELS, tuple_models
+
+## QUESTION 3 ANALYSIS: Feature Importance on Compressed Rating Tuples
+
+def model(dbt, session):
+    """
+    Weighted regressions of overall rating on the distinct rating tuples.
+
+    Models (the `tuple_models` config, comma-separated, default all three):
+    - ols: overall = β₀ + β₁(aroma) + β₂(taste) + β₃(appearance) + β₄(palate) + ε,
+      identical to feature_importance_regression
+    - interactions: the same plus every pairwise product of the centered ratings
+    - ordinal_logit: proportional-odds logistic regression of the overall rating
+      (an ordered category, not a continuous score) on the four ratings
+
+    KEY INSIGHTS:
+    - rating_tuples groups the reviews by their five ratings in the warehouse, so
+      this model reads at most 59,049 rows with a review_count each
+    - Every fit weights the tuples by review_count (beer_analysis.tuples), so fit
+      time depends on the number of distinct tuples, not on the review volume
+    - Output follows feature_importance_regression, stacked per model: one row per
+      factor (interactions as 'aroma:taste'), ordinal thresholds as 'threshold_<c>'
+      rows and one MODEL_SUMMARY row per model
+    """
+
+    models = [name.strip() for name in str(dbt.config.get("tuple_models", ",".join(TUPLE_MODELS))).split(",") if name.strip()]
+
+    with model_metrics(dbt, session, dbt.config.get("invocation_id")) as metrics:
+        cache = ResultCache(dbt, session, model, ["rating_tuples"], params={'tuple_models': models}, **cache_settings(
+            dbt.config.get("result_cache"),
+            dbt.config.get("result_cache_max_entries"),
+            dbt.config.get("result_cache_retention_days"),
+        ))
+        cached = cache.lookup()
+        if cached is not None:
+            return cached
+        return cache.store(metrics.output(tuple_models(dbt.ref("rating_tuples"), models)))
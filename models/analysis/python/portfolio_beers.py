@@ -0,0 +1,70 @@
+def model(dbt, session):
+    """
+    Portfolio beer names resolved to the exact beer_name strings of the reviews
+    
+    overall_rankings tags beers with their portfolio. Matching the typed names
+    with `beer_name in (...)` silently missed every spelling variant ('Pliny The
+    Elder' vs 'Pliny the Elder'). Here each typed name is resolved through the
+    name index over int_beer_stats (beer_analysis.names), but only to a beer_name
+    equal to it after normalization (case, accents, punctuation; ties: most
+    reviewed). A fuzzy match would tag the wrong beer ('Veritas 005' is not
+    'Veritas 004', 'Two Hearted Ale' not its Nitro version), so other names keep
+    beer_name NULL and are listed for review with their closest catalogue name.
+    
+    CONFIG:
+    - portfolio_min_similarity: minimum trigram similarity of the suggested
+      candidate_name of an unresolved name (default 0.5)
+    
+    OUTPUT: one row per typed name (portfolio_category, query_name, beer_name,
+    candidate_name, similarity); a beer_name belongs to one portfolio only, the
+    first listed.
+    """
+    from datetime import datetime
+    import pandas as pd
+    from beer_analysis.names import NameIndex, name_similarity
+    from beer_analysis.instrumentation import model_metrics, stage
+    
+    dbt.config(packages=['numpy', 'pandas'])
+    
+    # Beers of each portfolio, as typed by the business
+    portfolios = {
+        'Premium Portfolio': ['Rare D.O.S.', 'Veritas 005', 'Dirty Horse'],
+        'Core Portfolio': ['Pliny the Elder', 'Weihenstephaner Hefeweissbier', 'Two Hearted Ale'],
+    }
+    
+    with model_metrics(dbt, session, dbt.config.get("invocation_id")) as metrics:
+        min_similarity = float(dbt.config.get("portfolio_min_similarity", 0.5))
+    
+        # One row per beer - names and review counts only
+        with stage('load') as load:
+            index = NameIndex.from_relation(dbt.ref("int_beer_stats"))
+            load.output(index.names)
+        print(f"Indexed {len(index):,} beer and brewery names")
+    
+        rows = []
+        assigned = set()
+        with stage('resolve'):
+            for category, names in portfolios.items():
+                for query_name in names:
+                    beer_name = index.resolve_exact(query_name, kind='beer')
+                    candidate = beer_name or index.resolve(query_name, kind='beer', min_similarity=min_similarity)
+                    if beer_name in assigned:
+                        beer_name = None
+                    assigned.add(beer_name)
+                    rows.append({
+                        'portfolio_category': category,
+                        'query_name': query_name,
+                        'beer_name': beer_name,
+                        'candidate_name': candidate,
+                        'similarity': name_similarity(query_name, candidate) if candidate is not None else None,
+                    })
+    
+        # Explicit dtypes: all-NULL columns would otherwise not be typed as text / float
+        results = pd.DataFrame(rows).astype({'beer_name': 'string', 'candidate_name': 'string', 'similarity': 'float64'})
+        results['analysis_date'] = datetime.now()
+        resolved = results['beer_name'].notna().sum()
+        print(f"Resolved {resolved} of {len(results)} portfolio names")
+        for row in results[results['beer_name'].isna()].itertuples():
+            closest = f"closest: '{row.candidate_name}' ({row.similarity:.2f})" if pd.notna(row.candidate_name) else 'no similar name'
+            print(f"  Review: '{row.query_name}' ({row.portfolio_category}) is not tagged - {closest}")
+        return metrics.output(results)
@@ -1,55 +1,72 @@
+import numpy as np
 import pandas as pd
+from beer_analysis.cache import ResultCache, cache_settings
+from beer_analysis.instrumentation import model_metrics, stage
 
 def model(dbt, session):
     """
     Simple seasonality analysis: Calculate seasonal indices for visualization
     """
     
-    # Load aggregated monthly data
-    df = dbt.ref("seasonality_simple").to_pandas()
+    with model_metrics(dbt, session, dbt.config.get("invocation_id")) as metrics:
+        cache = ResultCache(dbt, session, model, ["seasonality_cube"], **cache_settings(
+            dbt.config.get("result_cache"),
+            dbt.config.get("result_cache_max_entries"),
+            dbt.config.get("result_cache_retention_days"),
+        ))
+        cached = cache.lookup()
+        if cached is not None:
+            return cached
+        
+        # Load aggregated monthly data from the incremental year x month x style cube
+        with stage('load') as load:
+            df = load.input(dbt.ref("seasonality_cube").select(
+                'YEAR', 'MONTH', 'BEER_STYLE', 'REVIEW_OVERALL_SUM', 'REVIEW_OVERALL_COUNT'
+            ).to_pandas())
+        df['AVG_OVERALL_RATING'] = df['REVIEW_OVERALL_SUM'].astype(float) / df['REVIEW_OVERALL_COUNT'].astype(float)
     
-    results = []
+        results = []
     
-    # 1. Overall seasonality (all beer styles combined)
-    overall_monthly = df.groupby('MONTH')['AVG_OVERALL_RATING'].mean()
-    overall_mean = overall_monthly.mean()
+        # 1. Overall seasonality (all beer styles combined)
+        overall_monthly = df.groupby('MONTH')['AVG_OVERALL_RATING'].mean()
+        overall_mean = overall_monthly.mean()
     
-    for month in range(1, 13):
-        if month in overall_monthly.index:
-            seasonal_index = overall_monthly[month] / overall_mean
-            avg_rating = overall_monthly[month]
-        else:
-            seasonal_index = 1.0
-            avg_rating = overall_mean
-            
-        results.append({
-            'month': month,
-            'beer_style': None,
-            'seasonal_index': seasonal_index,
-            'avg_rating': avg_rating,
-            'analysis_type': 'overall'
-        })
-    
-    # 2. By beer style seasonality
-    for beer_style in df['BEER_STYLE'].unique():
-        style_data = df[df['BEER_STYLE'] == beer_style]
-        style_monthly = style_data.groupby('MONTH')['AVG_OVERALL_RATING'].mean()
-        style_mean = style_monthly.mean()
-        
         for month in range(1, 13):
-            if month in style_monthly.index:
-                seasonal_index = style_monthly[month] / style_mean
-                avg_rating = style_monthly[month]
+            if month in overall_monthly.index:
+                seasonal_index = overall_monthly[month] / overall_mean
+                avg_rating = overall_monthly[month]
             else:
                 seasonal_index = 1.0
-                avg_rating = style_mean
-                
+                avg_rating = overall_mean
+            
             results.append({
                 'month': month,
-                'beer_style': beer_style,
+                'beer_style': None,
                 'seasonal_index': seasonal_index,
                 'avg_rating': avg_rating,
-                'analysis_type': 'by_style'
+                'analysis_type': 'overall'
             })
     
-    return pd.DataFrame(results) 
\ No newline at end of file
+        # 2. By beer style seasonality
+        # One grouped pass builds the style x month table instead of filtering per style
+        style_order = df['BEER_STYLE'].unique()
+        style_monthly = (
+            df.groupby(['BEER_STYLE', 'MONTH'])['AVG_OVERALL_RATING'].mean()
+            .unstack()
+            .reindex(index=style_order, columns=range(1, 13))
+        )
+        style_mean = style_monthly.mean(axis=1)
+    
+        # Months without data get a neutral index of 1.0 and the style's mean rating
+        seasonal_index = style_monthly.div(style_mean, axis=0).fillna(1.0)
+        avg_rating = style_monthly.apply(lambda column: column.fillna(style_mean))
+    
+        by_style = pd.DataFrame({
+            'month': np.tile(np.arange(1, 13), len(style_order)),
+            'beer_style': np.repeat(style_order, 12),
+            'seasonal_index': seasonal_index.to_numpy().ravel(),
+            'avg_rating': avg_rating.to_numpy().ravel(),
+            'analysis_type': 'by_style'
+        })
+    
+        return cache.store(metrics.output(pd.concat([pd.DataFrame(results), by_style], ignore_index=True)))
@@ -1,109 +1,70 @@
 def model(dbt, session):
     """
-    Time Series Decomposition by Beer Style - Imperial IPA vs Imperial Stout
+    Time Series Decomposition by Beer Style - every style at once
     
-    Uses moving average decomposition to separate trend and seasonal components
-    Same method as seasonality_decomposition.py but applied to each beer style
+    Uses moving average decomposition to separate trend and seasonal components.
+    Same method as seasonality_decomposition.py, but run by the batched engine in
+    beer_analysis.seasonality: the seasonality_cube is pivoted into a dense style x month
+    matrix and the 12-month centered trend, seasonal indices and residuals are
+    computed for all styles as array operations, weighted by review_count.
+    
+    Set the `target_styles` config to a list of styles to restrict the output
+    (e.g. ['American Double / Imperial IPA', 'American Double / Imperial Stout']).
     """
     import pandas as pd
-    import numpy as np
     from datetime import datetime
+    from beer_analysis.seasonality import MonthlyMatrix, decompose
+    from beer_analysis.cache import ResultCache, cache_settings
+    from beer_analysis.instrumentation import model_metrics, stage
+    
+    with model_metrics(dbt, session, dbt.config.get("invocation_id")) as metrics:
+        target_styles = dbt.config.get("target_styles")
+        cache = ResultCache(dbt, session, model, ["seasonality_cube"], params={'target_styles': target_styles}, **cache_settings(
+            dbt.config.get("result_cache"),
+            dbt.config.get("result_cache_max_entries"),
+            dbt.config.get("result_cache_retention_days"),
+        ))
+        cached = cache.lookup()
+        if cached is not None:
+            return cached
     
-    # Load data
-    df = dbt.ref("stg_beer_reviews").to_pandas()
+        # Load the year x month x style cube (a few thousand rows, not every review)
+        with stage('load') as load:
+            df = load.input(dbt.ref("seasonality_cube").select(
+                'BEER_STYLE', 'YEAR', 'MONTH', 'REVIEW_OVERALL_SUM', 'REVIEW_OVERALL_COUNT'
+            ).to_pandas())
+        if target_styles:
+            df = df[df['BEER_STYLE'].isin(target_styles)]
     
-    # Convert review_time to datetime
-    df['review_datetime'] = pd.to_datetime(df['REVIEW_TIME'], unit='s')
-    df['year_month'] = df['review_datetime'].dt.to_period('M')
+        # Dense style x month matrix of overall rating sums and counts
+        df['MONTH_ORDINAL'] = (df['YEAR'].astype(int) - 1970) * 12 + df['MONTH'].astype(int) - 1
+        matrix = MonthlyMatrix.from_aggregates(
+            df, 'BEER_STYLE', 'MONTH_ORDINAL', 'REVIEW_OVERALL_SUM', 'REVIEW_OVERALL_COUNT'
+        )
     
-    # Focus on two strategic styles
-    target_styles = [
-        'American Double / Imperial IPA',
-        'American Double / Imperial Stout'
-    ]
+        # Months with fewer than 50 reviews are gaps; styles need at least 2 years of data
+        with stage('decompose'):
+            decomposition = decompose(matrix, min_reviews=50, min_months=24, weighted=True)
     
-    df_target = df[df['BEER_STYLE'].isin(target_styles)].copy()
+        pattern = decomposition.seasonal_pattern()
+        results = pd.DataFrame({
+            'beer_style': pattern['label'],
+            'month': pattern['month'],
+            'month_name': pattern['month_name'].str[:3],
+            'seasonal_component': pattern['seasonal_component'],
+            'seasonal_index': pattern['seasonal_index'],
+            'chart_type': 'seasonal_pattern',
+            'analysis_date': datetime.now(),
+            'seasonal_strength': pattern['seasonal_strength'],
+            'valid_months': pattern['valid_months']
+        })
     
-    # Results container
-    all_results = []
+        # Fallback for insufficient data
+        insufficient = ~pattern['sufficient_data']
+        results.loc[insufficient, ['seasonal_component', 'seasonal_index']] = 0
+        results.loc[insufficient, 'chart_type'] = 'insufficient_data'
     
-    # Process each beer style separately
-    for style in target_styles:
-        style_df = df_target[df_target['BEER_STYLE'] == style]
-        
-        # Aggregate monthly ratings for this style
-        monthly_ratings = style_df.groupby('year_month').agg({
-            'REVIEW_OVERALL': ['mean', 'count']
-        }).reset_index()
-        
-        # Flatten column names
-        monthly_ratings.columns = ['year_month', 'avg_overall', 'total_reviews']
-        
-        # Convert period to timestamp for analysis
-        monthly_ratings['date'] = monthly_ratings['year_month'].dt.to_timestamp()
-        monthly_ratings = monthly_ratings.set_index('date').sort_index()
-        
-        # Filter for sufficient data
-        min_reviews_threshold = 50
-        monthly_ratings = monthly_ratings[monthly_ratings['total_reviews'] >= min_reviews_threshold]
-        
-        # Moving average decomposition (same as seasonality_decomposition.py)
-        if len(monthly_ratings) >= 24:  # Need at least 2 years
-            # Calculate 12-month centered moving average as trend
-            trend = monthly_ratings['avg_overall'].rolling(window=12, center=True).mean()
-            
-            # Fill NaN values at edges
-            trend = trend.interpolate(method='linear')
-            trend = trend.fillna(method='bfill').fillna(method='ffill')
-            
-            # Calculate detrended series
-            detrended = monthly_ratings['avg_overall'] - trend
-            
-            # Calculate seasonal component (average by month after detrending)
-            monthly_data = pd.DataFrame({
-                'month': monthly_ratings.index.month,
-                'detrended': detrended
-            })
-            
-            seasonal_averages = monthly_data.groupby('month')['detrended'].mean()
-            
-            # Map seasonal averages back to full time series
-            seasonal = monthly_ratings.index.to_series().dt.month.map(seasonal_averages)
-            
-            # Calculate residual
-            residual = detrended - seasonal
-            
-            # Add seasonal pattern summary (average by month for this style)
-            mean_seasonal = seasonal.mean()
-            for month_num in range(1, 13):
-                month_name = ['Jan','Feb','Mar','Apr','May','Jun',
-                             'Jul','Aug','Sep','Oct','Nov','Dec'][month_num-1]
-                
-                seasonal_component = seasonal_averages.get(month_num, 0)
-                
-                all_results.append({
-                    'beer_style': style,
-                    'month': month_num,
-                    'month_name': month_name,
-                    'seasonal_component': seasonal_component,
-                    'seasonal_index': seasonal_component - mean_seasonal,
-                    'chart_type': 'seasonal_pattern',
-                    'analysis_date': datetime.now()
-                })
-        else:
-            # Fallback for insufficient data
-            for month_num in range(1, 13):
-                month_name = ['Jan','Feb','Mar','Apr','May','Jun',
-                             'Jul','Aug','Sep','Oct','Nov','Dec'][month_num-1]
-                
-                all_results.append({
-                    'beer_style': style,
-                    'month': month_num,
-                    'month_name': month_name,
-                    'seasonal_component': 0,
-                    'seasonal_index': 0,
-                    'chart_type': 'insufficient_data',
-                    'analysis_date': datetime.now()
-                })
+        print(f"Decomposed {len(matrix.labels):,} styles over {matrix.n_months} months "
+              f"({int((~insufficient).sum() / 12):,} with sufficient data)")
     
-    return pd.DataFrame(all_results) 
\ No newline at end of file
+        return cache.store(metrics.output(results))
@@ -0,0 +1,60 @@
+def model(dbt, session):
+    """
+    Spectral Seasonality Screen - every style, monthly, weekly and daily
+    
+    The moving-average decompositions assume a 12-month cycle. Here the periodogram
+    of every series is computed instead (beer_analysis.spectral): for each granularity
+    all beer styles (plus the all-styles total, beer_style null) form one dense
+    style x period matrix, detrended and transformed with a single batched FFT.
+    
+    Per series and granularity the output holds the `top_periods` strongest periods
+    (period_rank 1 = dominant), seasonal strength (variance share of the dominant
+    period and its harmonics), the share at the reference period (12 months,
+    52 weeks, 7 days), Fisher's g-test p-value and the Benjamini-Hochberg q-value
+    across all series screened; `significant` is q_value < 0.05.
+    """
+    import pandas as pd
+    from datetime import datetime
+    from beer_analysis.spectral import GRANULARITIES, SeriesMatrix, adjust_p_values, period_ordinals, spectral_seasonality
+    from beer_analysis.instrumentation import model_metrics, stage
+    
+    # Fewer reviews than this in a cell make it a gap in the series
+    min_reviews = {'monthly': 50, 'weekly': 10, 'daily': 1}
+    top_periods = 3
+    
+    with model_metrics(dbt, session, dbt.config.get("invocation_id")) as metrics:
+        # Load the day x style cube (one row per style and day, not every review)
+        with stage('load') as load:
+            df = load.input(dbt.ref("seasonality_cube_daily").select(
+                'DAY_NUMBER', 'BEER_STYLE', 'REVIEW_OVERALL_SUM', 'REVIEW_OVERALL_COUNT'
+            ).to_pandas())
+    
+        summaries = []
+        for granularity, settings in GRANULARITIES.items():
+            with stage(granularity):
+                matrix = SeriesMatrix.from_aggregates(
+                    df['BEER_STYLE'], period_ordinals(df['DAY_NUMBER'], granularity),
+                    df['REVIEW_OVERALL_SUM'], df['REVIEW_OVERALL_COUNT']
+                )
+                spectrum = spectral_seasonality(
+                    matrix, min_reviews=min_reviews[granularity], top=top_periods,
+                    reference_period=settings['reference_period']
+                )
+                summaries.append(spectrum.summary(granularity, settings['step_days']))
+            print(f"{granularity}: {len(matrix.labels):,} series x {matrix.n_periods:,} periods "
+                  f"({int(spectrum.sufficient.sum()):,} with sufficient data)")
+    
+        results = pd.concat(summaries, ignore_index=True)
+    
+        # Multiple-testing correction across every sufficient series (one p-value per series)
+        series_id = (results['period_rank'] == 1).cumsum()
+        series = results[(results['period_rank'] == 1) & results['sufficient_data']]
+        q_values = pd.Series(adjust_p_values(series['p_value'].to_numpy()), index=series_id[series.index])
+        results['q_value'] = series_id.map(q_values).astype(float)
+        results['significant'] = results['q_value'] < 0.05
+    
+        results = results.rename(columns={'label': 'beer_style'})
+        results['analysis_type'] = results['beer_style'].isna().map({True: 'overall', False: 'by_style'})
+        results['analysis_date'] = datetime.now()
+    
+        return metrics.output(results)
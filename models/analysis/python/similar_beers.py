@@ -0,0 +1,46 @@
+def model(dbt, session):
+    """
+    "Beers like this": the most similar beers for every beer in the catalogue (Question 4)
+    
+    aroma_appearance_recommendations ranks whole styles. This model answers
+    "I liked beer X, what else would I like?" per beer:
+    - Each beer's profile is its average aroma, appearance, taste and palate rating
+      (optionally ABV), from the per-beer moments in int_beer_stats
+    - Dimensions are z-scored and weighted, then a KD-tree finds the k nearest
+      profiles for ALL beers in one batch query (beer_analysis.similarity)
+    
+    CONFIG:
+    - similarity_k: neighbours per beer (default 5)
+    - similarity_weights: preset name ('balanced', 'aroma_appearance', 'taste') or
+      a dict of per-dimension weights (default 'aroma_appearance', matching Question 4)
+    - similarity_include_abv: add ABV as a fifth dimension (default False)
+    - similarity_min_reviews: minimum reviews for a beer to be profiled (default 10)
+    """
+    from datetime import datetime
+    from beer_analysis.similarity import SimilarityIndex
+    from beer_analysis.instrumentation import model_metrics, stage
+    
+    dbt.config(packages=['numpy', 'pandas', 'scipy'])
+    
+    with model_metrics(dbt, session, dbt.config.get("invocation_id")) as metrics:
+        k = int(dbt.config.get("similarity_k", 5))
+        weights = dbt.config.get("similarity_weights", "aroma_appearance")
+        include_abv = str(dbt.config.get("similarity_include_abv", False)).lower() in ('true', '1')
+        min_reviews = int(dbt.config.get("similarity_min_reviews", 10))
+    
+        # One row per beer with rating moments - no individual reviews are loaded
+        with stage('load') as load:
+            index = SimilarityIndex.from_relation(
+                dbt.ref("int_beer_stats"), min_reviews=min_reviews, include_abv=include_abv
+            )
+            load.output(index.profiles)
+        print(f"Profiled {len(index):,} beers on {', '.join(index.dimensions)}")
+    
+        # Batch k-NN for the whole catalogue
+        with stage('query') as query:
+            results = query.output(index.similar_all(k=k, weights=weights))
+        results['weights'] = weights if isinstance(weights, str) else 'custom'
+        results['analysis_date'] = datetime.now()
+    
+        print(f"Computed {k} similar beers for each of {len(index):,} beers")
+        return metrics.output(results)
@@ -9,9 +9,7 @@ with component_data as (
         review_appearance,
         review_taste,
         review_palate,
-        beer_style,
-        beer_abv,
-        brewery_name
+        beer_style
     from {{ ref('stg_beer_reviews') }}
     where review_overall is not null
       and review_aroma is not null
@@ -21,56 +19,23 @@ with component_data as (
 ),
 
 -- 1. Overall correlations between components
+-- Read from the single-pass covariance matrix instead of one scan per pair
 correlation_analysis as (
     select
-        'aroma_vs_overall' as relationship,
-        corr(review_aroma, review_overall) as correlation_coefficient,
-        count(*) as sample_size
-    from component_data
-    
-    union all
-    
-    select
-        'appearance_vs_overall' as relationship,
-        corr(review_appearance, review_overall) as correlation_coefficient,
-        count(*) as sample_size
-    from component_data
-    
-    union all
-    
-    select
-        'taste_vs_overall' as relationship,
-        corr(review_taste, review_overall) as correlation_coefficient,
-        count(*) as sample_size
-    from component_data
-    
-    union all
-    
-    select
-        'palate_vs_overall' as relationship,
-        corr(review_palate, review_overall) as correlation_coefficient,
-        count(*) as sample_size
-    from component_data
-    
-    union all
-    
-    select
-        'aroma_vs_taste' as relationship,
-        corr(review_aroma, review_taste) as correlation_coefficient,
-        count(*) as sample_size
-    from component_data
-    
-    union all
-    
-    select
-        'appearance_vs_aroma' as relationship,
-        corr(review_appearance, review_aroma) as correlation_coefficient,
-        count(*) as sample_size
-    from component_data
+        relationship,
+        correlation as correlation_coefficient,
+        sample_size
+    from {{ ref('rating_correlation_matrix') }}
+    where scope = 'overall'
+      and relationship in (
+        'aroma_vs_overall', 'appearance_vs_overall', 'taste_vs_overall',
+        'palate_vs_overall', 'aroma_vs_taste', 'appearance_vs_aroma'
+      )
 ),
 
--- 2. Component interaction effects
-interaction_effects as (
+-- 2-4. Interaction effects, consistency and strength patterns per style in one pass;
+-- each analysis keeps its own minimum review count in the final select
+style_components as (
     select
         beer_style,
         count(*) as total_reviews,
@@ -83,37 +48,10 @@ interaction_effects as (
         -- Balanced high scores across all components
         avg(case when review_aroma >= 4.0 and review_appearance >= 4.0 
                    and review_taste >= 4.0 and review_palate >= 4.0
-            then review_overall else null end) as balanced_high_overall
-    from component_data
-    where beer_style is not null
-    group by beer_style
-    having count(*) >= 100
-),
-
--- 3. Component consistency analysis
-consistency_analysis as (
-    select
-        beer_style,
-        count(*) as total_reviews,
-        -- Standard deviation across components (lower = more consistent)
-        stddev(review_aroma) as aroma_stddev,
-        stddev(review_appearance) as appearance_stddev,
-        stddev(review_taste) as taste_stddev,
-        stddev(review_palate) as palate_stddev,
-        -- Overall consistency (average stddev across all components)
+            then review_overall else null end) as balanced_high_overall,
+        -- Overall consistency (average stddev across all components, lower = more consistent)
         (stddev(review_aroma) + stddev(review_appearance) + 
-         stddev(review_taste) + stddev(review_palate)) / 4 as overall_consistency
-    from component_data
-    where beer_style is not null
-    group by beer_style
-    having count(*) >= 50
-),
-
--- 4. Component strength patterns
-strength_patterns as (
-    select
-        beer_style,
-        count(*) as total_reviews,
+         stddev(review_taste) + stddev(review_palate)) / 4 as overall_consistency,
         -- Which component is strongest for each style
         case 
             when avg(review_aroma) = greatest(avg(review_aroma), avg(review_appearance), 
@@ -124,11 +62,6 @@ strength_patterns as (
                                             avg(review_taste), avg(review_palate)) then 'taste'
             else 'palate'
         end as strongest_component,
-        -- Component scores
-        round(avg(review_aroma), 3) as avg_aroma,
-        round(avg(review_appearance), 3) as avg_appearance,
-        round(avg(review_taste), 3) as avg_taste,
-        round(avg(review_palate), 3) as avg_palate,
         round(avg(review_overall), 3) as avg_overall
     from component_data
     where beer_style is not null
@@ -155,8 +88,9 @@ select
     total_reviews as sample_size,
     beer_style,
     null as strongest_component
-from interaction_effects
-where high_aroma_appearance_overall is not null
+from style_components
+where total_reviews >= 100
+  and high_aroma_appearance_overall is not null
 
 union all
 
@@ -167,8 +101,9 @@ select
     total_reviews as sample_size,
     beer_style,
     null as strongest_component
-from interaction_effects
-where high_taste_palate_overall is not null
+from style_components
+where total_reviews >= 100
+  and high_taste_palate_overall is not null
 
 union all
 
@@ -179,7 +114,7 @@ select
     total_reviews as sample_size,
     beer_style,
     null as strongest_component
-from consistency_analysis
+from style_components
 
 union all
 
@@ -190,6 +125,6 @@ select
     total_reviews as sample_size,
     beer_style,
     strongest_component
-from strength_patterns
+from style_components
 
 order by analysis_type, metric, value desc
@@ -0,0 +1,69 @@
+{{ config(materialized='table') }}
+
+-- Full covariance / correlation matrix of the rating components (and ABV),
+-- overall and per beer_style, in long format: one row per pair of components.
+
+/*
+PURPOSE:
+Each pairwise corr() used to be its own UNION ALL branch, i.e. its own scan of the
+reviews. Here every pair's cross moments (count, sums, sums of squares, sum of
+products) are extra aggregates of one GROUP BY GROUPING SETS pass - overall and
+per style at once - and covariance / correlation are derived from the moments
+(macros/covariance_matrix.sql). Adding a dimension adds columns, not passes.
+
+Rows cover the upper triangle and the diagonal (component_x = component_y is the
+variance, correlation 1). Pairs involving ABV only count reviews with an ABV.
+*/
+
+{%- set dimensions = [
+    ['appearance', 'review_appearance'],
+    ['aroma', 'review_aroma'],
+    ['taste', 'review_taste'],
+    ['palate', 'review_palate'],
+    ['overall', 'review_overall']
+] %}
+{%- if var('correlation_include_abv', true) %}
+{%- set dimensions = dimensions + [['abv', 'beer_abv']] %}
+{%- endif %}
+
+with component_data as (
+    select
+        review_overall,
+        review_aroma,
+        review_appearance,
+        review_taste,
+        review_palate,
+        beer_abv,
+        beer_style
+    from {{ ref('stg_beer_reviews') }}
+    where review_overall is not null
+      and review_aroma is not null
+      and review_appearance is not null
+      and review_taste is not null
+      and review_palate is not null
+),
+
+cross_moments as (
+    select
+        case when grouping(beer_style) = 1 then 'overall' else 'style' end as scope,
+        beer_style,
+        {{ cross_moments(dimensions) }}
+    from component_data
+    group by grouping sets ((), (beer_style))
+    having grouping(beer_style) = 1 or beer_style is not null
+),
+
+matrix as (
+    {{ covariance_long('cross_moments', dimensions, ['scope', 'beer_style']) }}
+)
+
+select
+    scope,
+    beer_style,
+    relationship,
+    component_x,
+    component_y,
+    covariance,
+    correlation,
+    sample_size
+from matrix
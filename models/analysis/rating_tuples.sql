@@ -0,0 +1,25 @@
+-- Distinct (overall, aroma, taste, appearance, palate) rating tuples with their review counts:
+-- the frequency-compressed input of feature_importance_tuple_models.
+{{ config(materialized='table') }}
+
+/*
+PURPOSE:
+Ratings are half points from 1 to 5, so the reviews of feature_importance_analysis
+collapse into at most 9^5 = 59,049 distinct rating tuples. With review_count as a
+frequency weight a regression on these rows gives exactly the fit on the reviews
+(beer_analysis/tuples.py), but models that need many passes over their input -
+pairwise interactions, ordinal logistic regression of overall - only ever see the
+tuples, so their fit time does not grow with the number of reviews.
+
+Same population as feature_importance_analysis: complete ratings, known style.
+*/
+
+{%- set columns = ['review_overall', 'review_aroma', 'review_taste', 'review_appearance', 'review_palate'] %}
+
+select
+    {%- for column in columns %}
+    {{ column }},
+    {%- endfor %}
+    count(*) as review_count
+from {{ ref('feature_importance_analysis') }}
+group by {{ columns | join(', ') }}
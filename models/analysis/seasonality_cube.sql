@@ -0,0 +1,50 @@
+-- Incremental year x month x beer_style cube of additive rating measures.
+-- Every seasonality model reads this (or its rollups) instead of the raw reviews.
+{{ config(
+    materialized='incremental',
+    unique_key=['year', 'month', 'beer_style'],
+    incremental_strategy='delete+insert'
+) }}
+
+/*
+PURPOSE:
+seasonality_simple used to rebuild from all of stg_beer_reviews on every run. This cube stores
+only additive measures - counts, sums and sums of squares per rating component - so:
+- incremental runs only recompute the newly arrived months (from the latest month
+  already in the table, which may have been partial, onwards)
+- month-only, style-only and yearly rollups are plain sums of the stored columns
+  (seasonality_cube_monthly, seasonality_cube_style, seasonality_cube_yearly)
+- averages and standard deviations are derived from the moments when read
+
+Reviews arriving for months older than the latest loaded month need a --full-refresh.
+*/
+
+{%- set rating_columns = ['review_overall', 'review_aroma', 'review_appearance', 'review_taste', 'review_palate', 'beer_abv'] %}
+
+with reviews as (
+    select
+        *,
+        DATE_TRUNC('month', TO_TIMESTAMP(review_time)) as month_year
+    from {{ ref('stg_beer_reviews') }}
+    where review_time IS NOT NULL
+      and review_overall IS NOT NULL
+      and beer_style IS NOT NULL
+),
+
+new_reviews as (
+    select * from reviews
+    {% if is_incremental() %}
+    where month_year >= (select max(month_year) from {{ this }})
+    {% endif %}
+)
+
+select
+    month_year,
+    EXTRACT(year FROM month_year) as year,
+    EXTRACT(month FROM month_year) as month,
+    beer_style,
+    count(*) as review_count,
+    {{ rating_moments(rating_columns) }},
+    max(review_time) as max_review_time
+from new_reviews
+group by 1, 2, 3, 4
@@ -0,0 +1,46 @@
+-- Incremental day x beer_style cube of overall rating moments.
+-- Feeds the spectral seasonality screen (seasonality_spectral), which derives its
+-- daily, weekly and monthly series from these rows.
+{{ config(
+    materialized='incremental',
+    unique_key=['day_number', 'beer_style'],
+    incremental_strategy='delete+insert'
+) }}
+
+/*
+PURPOSE:
+The periodogram needs every style's series at daily resolution, which seasonality_cube
+(year x month) cannot provide. Like seasonality_cube this stores additive measures
+only, so weeks and months are plain sums of days, and incremental runs recompute
+from the latest day already in the table (which may have been partial) onwards.
+
+day_number counts UTC days since 1970-01-01 (review_time is unix seconds), which keeps
+the day boundaries identical on Snowflake and in the local DuckDB runner.
+Reviews arriving for days older than the latest loaded day need a --full-refresh.
+*/
+
+with reviews as (
+    select
+        *,
+        floor(review_time / 86400) as day_number
+    from {{ ref('stg_beer_reviews') }}
+    where review_time IS NOT NULL
+      and review_overall IS NOT NULL
+      and beer_style IS NOT NULL
+),
+
+new_reviews as (
+    select * from reviews
+    {% if is_incremental() %}
+    where day_number >= (select max(day_number) from {{ this }})
+    {% endif %}
+)
+
+select
+    cast(day_number as integer) as day_number,
+    beer_style,
+    count(*) as review_count,
+    {{ rating_moments(['review_overall']) }},
+    max(review_time) as max_review_time
+from new_reviews
+group by 1, 2
@@ -0,0 +1,45 @@
+-- Month-level rollup of seasonality_cube (all beer styles combined).
+{{ config(materialized='view') }}
+
+{%- set rating_columns = ['review_overall', 'review_aroma', 'review_appearance', 'review_taste', 'review_palate', 'beer_abv'] %}
+
+with monthly as (
+    select
+        month_year,
+        year,
+        month,
+        sum(review_count) as review_count,
+        count(distinct beer_style) as beer_styles,
+        {{ rollup_moments(rating_columns) }}
+    from {{ ref('seasonality_cube') }}
+    group by 1, 2, 3
+),
+
+distincts as (
+    select
+        month_year,
+        {{ hll_combine('beers_hll') }} as beers_hll,
+        {{ hll_combine('breweries_hll') }} as breweries_hll
+    from {{ ref('seasonality_sketches') }}
+    group by 1
+),
+
+monthly_distincts as (
+    select
+        r.*,
+        {{ hll_estimate('d.beers_hll') }} as unique_beers,
+        {{ hll_estimate('d.breweries_hll') }} as unique_breweries
+    from monthly r
+    left join distincts d on r.month_year = d.month_year
+)
+
+select
+    *,
+    {{ avg_from_moments('review_overall', 'avg_overall_rating') }},
+    {{ avg_from_moments('review_aroma', 'avg_aroma') }},
+    {{ avg_from_moments('review_taste', 'avg_taste') }},
+    {{ avg_from_moments('review_appearance', 'avg_appearance') }},
+    {{ avg_from_moments('review_palate', 'avg_palate') }},
+    {{ avg_from_moments('beer_abv', 'avg_abv') }},
+    {{ stddev_from_moments('review_overall', 'stddev_overall_rating') }}
+from monthly_distincts
@@ -3,33 +3,35 @@
 {{ config(materialized='table') }}
 
 -- Simple seasonality analysis: monthly aggregations by beer style
+-- Averages come from the moments in seasonality_cube, distinct counts from the
+-- HyperLogLog states in seasonality_sketches, so nothing rescans the reviews.
 
 with monthly_aggregations as (
     select 
-        DATE_TRUNC('month', TO_TIMESTAMP(review_time)) as month_year,
-        EXTRACT(year FROM TO_TIMESTAMP(review_time)) as year,
-        EXTRACT(month FROM TO_TIMESTAMP(review_time)) as month,
-        beer_style,
+        c.month_year,
+        c.year,
+        c.month,
+        c.beer_style,
         
         -- Aggregated metrics
-        AVG(review_overall) as avg_overall_rating,
-        AVG(review_aroma) as avg_aroma,
-        AVG(review_taste) as avg_taste,
-        AVG(review_appearance) as avg_appearance,
-        AVG(review_palate) as avg_palate,
-        AVG(beer_abv) as avg_abv,
+        {{ avg_from_moments('c.review_overall', 'avg_overall_rating') }},
+        {{ avg_from_moments('c.review_aroma', 'avg_aroma') }},
+        {{ avg_from_moments('c.review_taste', 'avg_taste') }},
+        {{ avg_from_moments('c.review_appearance', 'avg_appearance') }},
+        {{ avg_from_moments('c.review_palate', 'avg_palate') }},
+        {{ avg_from_moments('c.beer_abv', 'avg_abv') }},
         
         -- Volume metrics
-        COUNT(*) as review_count,
-        COUNT(DISTINCT beer_name) as unique_beers,
-        COUNT(DISTINCT brewery_name) as unique_breweries
+        c.review_count,
+        {{ hll_estimate('s.beers_hll') }} as unique_beers,
+        {{ hll_estimate('s.breweries_hll') }} as unique_breweries
         
-    from {{ ref('stg_beer_reviews') }}
-    where review_time IS NOT NULL 
-      and review_overall IS NOT NULL
-      and beer_style IS NOT NULL
-    group by 1, 2, 3, 4
+    from {{ ref('seasonality_cube') }} c
+    inner join {{ ref('seasonality_sketches') }} s
+        on c.year = s.year
+       and c.month = s.month
+       and c.beer_style = s.beer_style
 )
 
 select * from monthly_aggregations
-order by year, month, beer_style 
\ No newline at end of file
+order by year, month, beer_style
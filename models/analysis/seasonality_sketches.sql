@@ -0,0 +1,50 @@
+-- Incremental year x month x beer_style sketches of distinct beers and breweries.
+-- Companion of seasonality_cube: the cube holds the additive measures, this table
+-- the distinct counts, which only sketches can roll up.
+{{ config(
+    materialized='incremental',
+    unique_key=['year', 'month', 'beer_style'],
+    incremental_strategy='delete+insert'
+) }}
+
+/*
+PURPOSE:
+COUNT(DISTINCT beer_name) per month and style cannot be summed into a per-month,
+per-style or per-year count - a beer reviewed in two months would count twice. This
+table stores a HyperLogLog state per cell instead (macros/sketches.sql); any rollup
+merges the states with hll_combine and estimates the distinct count from the result,
+without reading the reviews again (seasonality_simple, seasonality_cube_monthly,
+seasonality_cube_style, seasonality_cube_yearly).
+
+Like seasonality_cube, incremental runs only recompute from the latest month already
+in the table onwards; reviews arriving for older months need a --full-refresh.
+*/
+
+with reviews as (
+    select
+        *,
+        DATE_TRUNC('month', TO_TIMESTAMP(review_time)) as month_year
+    from {{ ref('stg_beer_reviews') }}
+    where review_time IS NOT NULL
+      and review_overall IS NOT NULL
+      and beer_style IS NOT NULL
+),
+
+new_reviews as (
+    select * from reviews
+    {% if is_incremental() %}
+    where month_year >= (select max(month_year) from {{ this }})
+    {% endif %}
+)
+
+select
+    month_year,
+    EXTRACT(year FROM month_year) as year,
+    EXTRACT(month FROM month_year) as month,
+    beer_style,
+    count(*) as review_count,
+    {{ hll_accumulate('beer_name') }} as beers_hll,
+    {{ hll_accumulate('brewery_name') }} as breweries_hll,
+    max(review_time) as max_review_time
+from new_reviews
+group by 1, 2, 3, 4
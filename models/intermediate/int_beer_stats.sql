@@ -0,0 +1,119 @@
+-- Incremental per-beer aggregate of additive rating measures.
+-- Every recommendation model (int_reco_*) and overall_rankings reads this instead of the raw reviews.
+{{ config(
+    materialized='incremental',
+    unique_key='beer_key',
+    incremental_strategy='delete+insert'
+) }}
+
+/*
+PURPOSE:
+The four int_reco_* strategies and overall_rankings each grouped stg_beer_reviews by
+beer on their own - five scans for one set of rankings. This table holds, per
+beer_name x brewery_name x beer_style x beer_abv (beer_key of dim_beer):
+- review_count (all reviews, as in overall_rankings) and max_review_time
+- count, sum, sum of squares, min and max of every rating component
+  (averages and standard deviations are derived from the moments when read);
+  aroma, appearance, palate and taste only count reviews with an overall rating,
+  the population int_reco_style_diversity always averaged them over
+- complete_count and complete_*_sum over reviews with all five ratings present,
+  for strategies that only use complete records (int_reco_balanced_excellence)
+
+The moments are aggregated from fct_reviews by the integer beer_key; the names and
+the other keys of each beer are joined from dim_beer afterwards, one row per beer.
+
+INCREMENTAL RUNS:
+Only reviews newer than the latest review_time already loaded are aggregated; their
+moments are added to the stored rows of the same beers (counts and sums add up,
+min/max take the extremes) and those beers are replaced. Reviews arriving with an
+older review_time than what is loaded (or without review_time) need a --full-refresh,
+as does switching from the earlier md5 string beer_key to the integer one, or from
+component moments over all reviews to those over reviews with an overall rating.
+*/
+
+{%- set rating_columns = ['review_overall', 'review_aroma', 'review_appearance', 'review_palate', 'review_taste'] %}
+{%- set key_columns = ['beer_key', 'beer_name_key', 'brewery_key', 'style_key', 'beer_name', 'brewery_name', 'beer_style', 'beer_abv'] %}
+
+with reviews as (
+    select
+        beer_key,
+        review_time,
+        review_overall,
+        {%- for column in rating_columns if column != 'review_overall' %}
+        case when review_overall is not null then {{ column }} end as {{ column }},
+        {%- endfor %}
+        (
+            {%- for column in rating_columns %}
+            {{ column }} is not null{{ " and" if not loop.last }}
+            {%- endfor %}
+        ) as is_complete
+    from {{ ref('fct_reviews') }}
+    {% if is_incremental() %}
+    where review_time > (select max(max_review_time) from {{ this }})
+    {% endif %}
+),
+
+new_stats as (
+    select
+        beer_key,
+        count(*) as review_count,
+        {{ rating_moments(rating_columns) }},
+        {{ rating_extremes(rating_columns) }},
+        sum(case when is_complete then 1 else 0 end) as complete_count,
+        {%- for column in rating_columns %}
+        sum(case when is_complete then {{ column }} end) as complete_{{ column | replace('review_', '') }}_sum,
+        {%- endfor %}
+        max(review_time) as max_review_time
+    from reviews
+    group by beer_key
+)
+
+{% if is_incremental() %}
+-- Add the new moments to the stored rows of the beers that received reviews
+, merged as (
+    select * from new_stats
+    union all
+    select beer_key, review_count,
+        {%- for column in rating_columns %}
+        {{ column }}_count, {{ column }}_sum, {{ column }}_sum_sq,
+        {%- endfor %}
+        {%- for column in rating_columns %}
+        {{ column }}_min, {{ column }}_max,
+        {%- endfor %}
+        complete_count,
+        {%- for column in rating_columns %}
+        complete_{{ column | replace('review_', '') }}_sum,
+        {%- endfor %}
+        max_review_time
+    from {{ this }}
+    where beer_key in (select beer_key from new_stats)
+),
+
+stats as (
+    select
+        beer_key,
+        sum(review_count) as review_count,
+        {{ rollup_moments(rating_columns) }},
+        {{ rollup_extremes(rating_columns) }},
+        sum(complete_count) as complete_count,
+        {%- for column in rating_columns %}
+        sum(complete_{{ column | replace('review_', '') }}_sum) as complete_{{ column | replace('review_', '') }}_sum,
+        {%- endfor %}
+        max(max_review_time) as max_review_time
+    from merged
+    group by beer_key
+)
+{% else %}
+, stats as (
+    select * from new_stats
+)
+{% endif %}
+
+-- Names and attribute keys of each beer, from the beer dimension
+select
+    {%- for column in key_columns %}
+    b.{{ column }},
+    {%- endfor %}
+    s.* exclude (beer_key)
+from stats s
+inner join {{ ref('dim_beer') }} b on s.beer_key = b.beer_key
@@ -1,20 +1,34 @@
 {{ config(materialized='view') }}
 
-with brewery_abv_stats as (
-    select 
+-- Per-brewery ABV statistics, merged from the monthly sketches in int_brewery_sketches
+-- (moments for avg / stddev, HyperLogLog for distinct beers, t-digest for quantiles).
+
+with brewery_sketches as (
+    select
+        brewery_key,
+        brewery_name,
+        sum(review_count) as total_reviews,
+        {{ rollup_moments(['beer_abv']) }},
+        {{ rollup_extremes(['beer_abv']) }},
+        {{ hll_combine('beers_hll') }} as beers_hll,
+        {{ tdigest_combine('abv_digest') }} as abv_digest
+    from {{ ref('int_brewery_sketches') }}
+    group by brewery_key, brewery_name
+    having sum(review_count) >= 5),  -- Only breweries with at least 5 beers for statistical significance
+
+brewery_abv_stats as (
+    select
         brewery_name,
-        count(*) as total_reviews,
-        count(distinct beer_name) as distinct_beers,
-        avg(beer_abv) as avg_abv,
-        max(beer_abv) as max_abv,
-        min(beer_abv) as min_abv,
-        stddev(beer_abv) as stddev_abv
-    from {{ref('stg_beer_reviews')}}
-    where beer_abv is not null
-      and beer_abv > 0  -- Filter out invalid ABV values
-    group by brewery_name
-    having count(*) >= 5)  -- Only breweries with at least 5 beers for statistical significance
+        total_reviews,
+        {{ hll_estimate('beers_hll') }} as distinct_beers,
+        {{ avg_from_moments('beer_abv', 'avg_abv') }},
+        beer_abv_max as max_abv,
+        beer_abv_min as min_abv,
+        {{ stddev_from_moments('beer_abv', 'stddev_abv') }},
+        {{ tdigest_estimate('abv_digest', 0.5) }} as median_abv,
+        {{ tdigest_estimate('abv_digest', 0.95) }} as p95_abv
+    from brewery_sketches)
 
 select * from brewery_abv_stats
 --where avg_abv < 18
-order by avg_abv desc
\ No newline at end of file
+order by avg_abv desc
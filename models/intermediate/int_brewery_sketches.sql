@@ -0,0 +1,68 @@
+-- Incremental brewery x month sketches of ABV: moments, extremes, distinct beers (HLL)
+-- and a t-digest of the ABV distribution. int_brewery_abv_stats rolls them up per brewery.
+{{ config(
+    materialized='incremental',
+    unique_key=['brewery_key', 'month_year'],
+    incremental_strategy='delete+insert'
+) }}
+
+/*
+PURPOSE:
+Brewery strength statistics used to be a GROUP BY brewery over every review with
+COUNT(DISTINCT beer_name) and no quantiles. Per brewery and month this stores only
+mergeable state:
+- review_count, count / sum / sum of squares and min / max of beer_abv
+- beers_hll: HyperLogLog state of beer_name_key, i.e. the brewery's distinct beer
+  names (hll_combine merges months)
+- abv_digest: t-digest state of beer_abv (tdigest_combine merges months; medians,
+  p95 and any other quantile are estimated from the merged digest)
+so brewery totals, ABV quantiles and their rankings come from merging a few rows per
+brewery instead of rescanning the reviews (macros/sketches.sql).
+
+The reviews are grouped and sketched by the integer keys of fct_reviews; brewery_name
+is joined from dim_brewery for the aggregated rows only.
+
+Reviews without review_time land in a month_year = NULL row on full builds. Incremental
+runs recompute from the latest loaded month onwards; reviews arriving for older months
+(or without review_time) need a --full-refresh.
+*/
+
+with reviews as (
+    select
+        brewery_key,
+        beer_name_key,
+        beer_abv,
+        review_time,
+        DATE_TRUNC('month', TO_TIMESTAMP(review_time)) as month_year
+    from {{ ref('fct_reviews') }}
+    where beer_abv is not null
+      and beer_abv > 0  -- Filter out invalid ABV values
+),
+
+new_reviews as (
+    select * from reviews
+    {% if is_incremental() %}
+    where month_year >= (select max(month_year) from {{ this }})
+    {% endif %}
+),
+
+monthly_sketches as (
+    select
+        brewery_key,
+        month_year,
+        count(*) as review_count,
+        {{ rating_moments(['beer_abv']) }},
+        {{ rating_extremes(['beer_abv']) }},
+        {{ hll_accumulate('beer_name_key') }} as beers_hll,
+        {{ tdigest_accumulate('beer_abv') }} as abv_digest,
+        max(review_time) as max_review_time
+    from new_reviews
+    group by 1, 2
+)
+
+select
+    s.brewery_key,
+    b.brewery_name,
+    s.* exclude (brewery_key)
+from monthly_sketches s
+inner join {{ ref('dim_brewery') }} b on s.brewery_key = b.brewery_key
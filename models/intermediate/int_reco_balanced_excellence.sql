@@ -42,30 +42,28 @@ VALIDATION CRITERIA:
 - No beer recommended if any single dimension scores below average
 */
 
-with beer_ratings as (
-    select * from {{ ref('stg_beer_reviews') }}
+with beer_stats as (
+    -- Per-beer rating moments (one shared aggregate of stg_beer_reviews)
+    select * from {{ ref('int_beer_stats') }}
 ),
 
 balanced_ratings as (
+    -- complete_* measures only count reviews with all rating dimensions present
     select 
+        beer_key,
+        beer_name_key,
         beer_name,
         brewery_name,
         beer_style,
         beer_abv,
-        avg(review_overall) as avg_overall,
-        avg(review_aroma) as avg_aroma,
-        avg(review_taste) as avg_taste,
-        avg(review_appearance) as avg_appearance,
-        avg(review_palate) as avg_palate,
-        count(*) as review_count
-    from beer_ratings
-    where review_overall is not null
-      and review_aroma is not null
-      and review_taste is not null
-      and review_appearance is not null
-      and review_palate is not null
-    group by beer_name, brewery_name, beer_style, beer_abv
-    having count(*) >= 15  -- Higher threshold for balanced analysis
+        complete_overall_sum / complete_count as avg_overall,
+        complete_aroma_sum / complete_count as avg_aroma,
+        complete_taste_sum / complete_count as avg_taste,
+        complete_appearance_sum / complete_count as avg_appearance,
+        complete_palate_sum / complete_count as avg_palate,
+        complete_count as review_count
+    from beer_stats
+    where complete_count >= 15  -- Higher threshold for balanced analysis
 ),
 
 balanced_scores as (
@@ -93,6 +91,8 @@ ranked_balanced as (
 )
 
 select 
+    beer_key,
+    beer_name_key,
     beer_name,
     brewery_name,
     beer_style,
@@ -32,23 +32,24 @@ VALIDATION CRITERIA:
 - Rankings based on: (1) avg_overall_rating DESC, (2) review_count DESC
 */
 
-with beer_ratings as (
-    select * from {{ ref('stg_beer_reviews') }}
+with beer_stats as (
+    -- Per-beer rating moments (one shared aggregate of stg_beer_reviews)
+    select * from {{ ref('int_beer_stats') }}
 ),
 
 aggregated_ratings as (
     select 
+        beer_key,
+        beer_name_key,
         beer_name,
         brewery_name,
         beer_style,
         beer_abv,
-        avg(review_overall) as avg_overall_rating,
-        count(*) as review_count,
-        stddev(review_overall) as rating_stddev
-    from beer_ratings
-    where review_overall is not null
-    group by beer_name, brewery_name, beer_style, beer_abv
-    having count(*) >= 10  -- Minimum 10 reviews for reliability
+        {{ avg_from_moments('review_overall', 'avg_overall_rating') }},
+        review_overall_count as review_count,
+        {{ stddev_from_moments('review_overall', 'rating_stddev') }}
+    from beer_stats
+    where review_overall_count >= 10  -- Minimum 10 reviews for reliability
 ),
 
 ranked_beers as (
@@ -59,6 +60,8 @@ ranked_beers as (
 )
 
 select 
+    beer_key,
+    beer_name_key,
     beer_name,
     brewery_name,
     beer_style,
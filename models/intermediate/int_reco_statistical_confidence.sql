@@ -1,24 +1,25 @@
 {{ config(materialized='view') }}
 
-with beer_ratings as (
-    select * from {{ ref('stg_beer_reviews') }}
+with beer_stats as (
+    -- Per-beer rating moments (one shared aggregate of stg_beer_reviews)
+    select * from {{ ref('int_beer_stats') }}
 ),
 
 statistical_analysis as (
     select 
+        beer_key,
+        beer_name_key,
         beer_name,
         brewery_name,
         beer_style,
         beer_abv,
-        avg(review_overall) as avg_rating,
-        count(*) as review_count,
-        stddev(review_overall) as rating_stddev,
-        min(review_overall) as min_rating,
-        max(review_overall) as max_rating
-    from beer_ratings
-    where review_overall is not null
-    group by beer_name, brewery_name, beer_style, beer_abv
-    having count(*) >= 20  -- High review threshold for statistical confidence
+        {{ avg_from_moments('review_overall', 'avg_rating') }},
+        review_overall_count as review_count,
+        {{ stddev_from_moments('review_overall', 'rating_stddev') }},
+        review_overall_min as min_rating,
+        review_overall_max as max_rating
+    from beer_stats
+    where review_overall_count >= 20  -- High review threshold for statistical confidence
 ),
 
 confidence_scores as (
@@ -38,6 +39,8 @@ ranked_confidence as (
 ),
 
 final as (select 
+    beer_key,
+    beer_name_key,
     beer_name,
     brewery_name,
     beer_style,
@@ -1,33 +1,35 @@
 {{ config(materialized='view') }}
 
-with beer_ratings as (
-    select * from {{ ref('stg_beer_reviews') }}
+with beer_stats as (
+    -- Per-beer rating moments (one shared aggregate of stg_beer_reviews)
+    select * from {{ ref('int_beer_stats') }}
 ),
 
 style_analysis as (
     select 
+        beer_key,
+        beer_name_key,
+        style_key,
         beer_name,
         brewery_name,
         beer_style,
         beer_abv,
-        avg(review_overall) as avg_overall_rating,
-        avg(review_aroma) as avg_aroma,
-        avg(review_taste) as avg_taste,
-        avg(review_appearance) as avg_appearance,
-        avg(review_palate) as avg_palate,
-        count(*) as review_count
-    from beer_ratings
-    where review_overall is not null
-      and beer_style is not null
-    group by beer_name, brewery_name, beer_style, beer_abv
-    having count(*) >= 10  -- Minimum reviews for reliability
+        {{ avg_from_moments('review_overall', 'avg_overall_rating') }},
+        {{ avg_from_moments('review_aroma', 'avg_aroma') }},
+        {{ avg_from_moments('review_taste', 'avg_taste') }},
+        {{ avg_from_moments('review_appearance', 'avg_appearance') }},
+        {{ avg_from_moments('review_palate', 'avg_palate') }},
+        review_overall_count as review_count
+    from beer_stats
+    where beer_style is not null
+      and review_overall_count >= 10  -- Minimum reviews for reliability
 ),
 
 top_by_style as (
     select 
         *,
         row_number() over (
-            partition by beer_style 
+            partition by style_key 
             order by avg_overall_rating desc, review_count desc
         ) as style_rank,
         -- Calculate composite score for overall ranking
@@ -56,6 +58,8 @@ final_selection as (
 )
 
 select 
+    beer_key,
+    beer_name_key,
     beer_name,
     brewery_name,
     beer_style,
@@ -1,20 +1,26 @@
 {{ config(materialized='view') }}
 
-with beer_style_ratings as (
+with style_ratings as (
+    -- Grouped by the integer style_key of the review facts; names only for the few style rows
     select 
-        beer_style,
+        style_key,
         AVG(review_overall) as avg_overall_rating,
-        COUNT(*) as total_reviews,
-        COUNT(DISTINCT beer_name) as unique_beers
-    from {{ ref('stg_beer_reviews') }}
-    where beer_style is not null
-      and review_overall is not null
-    group by beer_style
+        COUNT(*) as total_reviews
+    from {{ ref('fct_reviews') }}
+    where review_overall is not null
+    group by style_key
     having COUNT(*) >= 1000  -- Only styles with at least 1000 reviews
 ),
 
+beer_style_ratings as (
+    select r.*
+    from style_ratings r
+    inner join {{ ref('dim_style') }} d on r.style_key = d.style_key
+    where d.beer_style is not null
+),
+
 top_1_style as (
-    select beer_style
+    select style_key
     from beer_style_ratings
     order by avg_overall_rating desc
     limit 1
@@ -22,24 +28,24 @@ top_1_style as (
 
 filtered_reviews as (
     select 
-        s.beer_name,
-        s.brewery_name,
-        s.beer_style,
-        s.beer_abv,
-        s.review_overall,
-        s.review_aroma,
-        s.review_taste,
-        s.review_appearance,
-        s.review_palate,
-        s.review_time,
-        s.review_datetime
-    from {{ ref('stg_beer_reviews') }} s
-    inner join top_1_style t on s.beer_style = t.beer_style
-    where s.review_overall is not null
-      and s.review_aroma is not null
-      and s.review_taste is not null
-      and s.review_appearance is not null
-      and s.review_palate is not null
+        f.beer_key,
+        f.brewery_key,
+        f.style_key,
+        f.beer_abv,
+        f.review_overall,
+        f.review_aroma,
+        f.review_taste,
+        f.review_appearance,
+        f.review_palate,
+        f.review_time,
+        TO_TIMESTAMP(f.review_time) as review_datetime
+    from {{ ref('fct_reviews') }} f
+    inner join top_1_style t on f.style_key = t.style_key
+    where f.review_overall is not null
+      and f.review_aroma is not null
+      and f.review_taste is not null
+      and f.review_appearance is not null
+      and f.review_palate is not null
 )
 
-select * from filtered_reviews 
\ No newline at end of file
+select * from filtered_reviews 
@@ -2,9 +2,9 @@
 
 with strong_beers as (
     select 
-        beer_name,
-        brewery_name,
-        beer_style,
+        beer_key,
+        brewery_key,
+        style_key,
         beer_abv,
         review_overall,
         review_aroma,
@@ -12,8 +12,8 @@ with strong_beers as (
         review_appearance,
         review_palate,
         review_time,
-        review_datetime
-    from {{ ref('stg_beer_reviews') }}
+        TO_TIMESTAMP(review_time) as review_datetime
+    from {{ ref('fct_reviews') }}
     where beer_abv > 10.0
       and beer_abv is not null
       and review_overall is not null
@@ -23,4 +23,4 @@ with strong_beers as (
       and review_palate is not null
 )
 
-select * from strong_beers 
\ No newline at end of file
+select * from strong_beers 
@@ -0,0 +1,38 @@
+-- Beer dimension: one row per beer_name x brewery_name x beer_style x beer_abv with its
+-- integer surrogate key (macros/surrogate_key.sql) and the keys of its brewery and style.
+{{ config(
+    materialized='incremental',
+    unique_key='beer_key',
+    incremental_strategy='delete+insert'
+) }}
+
+/*
+KEYS:
+- beer_key: the beer as int_beer_stats counts it (name, brewery, style and ABV)
+- beer_name_key: name and brewery only, for rollups over styles / ABVs of one beer
+  (overall_rankings)
+- brewery_key, style_key: the rows of dim_brewery and dim_style
+
+This is the only place where the beer attribute strings are grouped; fct_reviews
+carries the same keys (computed from the same columns), and the per-beer models
+aggregate the facts by beer_key and join the names back from here.
+
+Incremental runs only add the beers of reviews newer than the latest review_time
+already loaded (and refresh max_review_time of the beers seen again).
+*/
+
+select
+    {{ surrogate_key(['beer_name', 'brewery_name', 'beer_style', 'beer_abv']) }} as beer_key,
+    {{ surrogate_key(['beer_name', 'brewery_name']) }} as beer_name_key,
+    {{ surrogate_key(['brewery_name']) }} as brewery_key,
+    {{ surrogate_key(['beer_style']) }} as style_key,
+    beer_name,
+    brewery_name,
+    beer_style,
+    beer_abv,
+    max(review_time) as max_review_time
+from {{ ref('stg_beer_reviews') }}
+{% if is_incremental() %}
+where review_time > (select max(max_review_time) from {{ this }})
+{% endif %}
+group by beer_name, brewery_name, beer_style, beer_abv
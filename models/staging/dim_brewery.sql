@@ -0,0 +1,21 @@
+-- Brewery dimension: one row per brewery_name with its integer surrogate key (macros/surrogate_key.sql).
+{{ config(
+    materialized='incremental',
+    unique_key='brewery_key',
+    incremental_strategy='delete+insert'
+) }}
+
+/*
+Incremental runs only add the breweries of reviews newer than the latest review_time
+already loaded (and refresh max_review_time of the breweries seen again).
+*/
+
+select
+    {{ surrogate_key(['brewery_name']) }} as brewery_key,
+    brewery_name,
+    max(review_time) as max_review_time
+from {{ ref('stg_beer_reviews') }}
+{% if is_incremental() %}
+where review_time > (select max(max_review_time) from {{ this }})
+{% endif %}
+group by brewery_name
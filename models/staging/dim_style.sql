@@ -0,0 +1,23 @@
+-- Style dimension: one row per beer_style with its integer surrogate key (macros/surrogate_key.sql).
+{{ config(
+    materialized='incremental',
+    unique_key='style_key',
+    incremental_strategy='delete+insert'
+) }}
+
+/*
+Reviews without a style share the key of beer_style = NULL, so every style_key in
+fct_reviews has its row here. Incremental runs only add the styles of reviews newer
+than the latest review_time already loaded (and refresh max_review_time of the
+styles seen again).
+*/
+
+select
+    {{ surrogate_key(['beer_style']) }} as style_key,
+    beer_style,
+    max(review_time) as max_review_time
+from {{ ref('stg_beer_reviews') }}
+{% if is_incremental() %}
+where review_time > (select max(max_review_time) from {{ this }})
+{% endif %}
+group by beer_style
@@ -0,0 +1,40 @@
+-- Review fact table: the ratings, ABV and review_time of every review, keyed by the
+-- integer surrogate keys of dim_beer, dim_brewery and dim_style instead of name strings.
+{{ config(
+    materialized='incremental',
+    incremental_strategy='append'
+) }}
+
+/*
+PURPOSE:
+The per-beer and per-style models (int_beer_stats, the style filters behind the
+feature importance regressions, feature_importance_segment_stats, ...) used to group
+and join stg_beer_reviews on beer_name, brewery_name and beer_style - several
+variable-length strings per row and comparison. Here each review carries 8-byte keys
+instead; the names are joined back from the (much smaller) dimension tables after
+aggregating.
+
+beer_abv stays on the fact as a measure, since the ABV filters and averages run on it.
+
+INCREMENTAL RUNS:
+Only reviews newer than the latest review_time already loaded are appended. Reviews
+arriving with an older review_time than what is loaded (or without review_time) need
+a --full-refresh.
+*/
+
+select
+    {{ surrogate_key(['beer_name', 'brewery_name', 'beer_style', 'beer_abv']) }} as beer_key,
+    {{ surrogate_key(['beer_name', 'brewery_name']) }} as beer_name_key,
+    {{ surrogate_key(['brewery_name']) }} as brewery_key,
+    {{ surrogate_key(['beer_style']) }} as style_key,
+    beer_abv,
+    review_time,
+    review_overall,
+    review_aroma,
+    review_appearance,
+    review_palate,
+    review_taste
+from {{ ref('stg_beer_reviews') }}
+{% if is_incremental() %}
+where review_time > (select max(review_time) from {{ this }})
+{% endif %}
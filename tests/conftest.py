@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+from beer_analysis.local.bench import ensure_dataset
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='session')
+def project_dir():
+    return PROJECT_DIR
+
+
+@pytest.fixture(scope='session')
+def synthetic_data_dir(tmp_path_factory):
+    """Data directory with 20,000 synthetic beer_reviews_raw rows (generated once per session)."""
+    return ensure_dataset(str(tmp_path_factory.mktemp('data')), 20_000, workers=1)
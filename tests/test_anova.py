@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from beer_analysis.anova import anova_by_group, one_way_anova, welch_anova
+
+
+def monthly_groups(seed=0):
+    """Half-point ratings in 12 monthly groups of unequal size, mean and spread."""
+    rng = np.random.default_rng(seed)
+    return [
+        np.round(rng.normal(3.8 + 0.05 * np.cos(month / 12 * 2 * np.pi), 0.4 + 0.03 * month, 40 + 7 * month) * 2) / 2
+        for month in range(12)
+    ]
+
+
+def moments(groups):
+    return [len(g) for g in groups], [g.sum() for g in groups], [(g * g).sum() for g in groups]
+
+
+def test_one_way_anova_matches_scipy():
+    groups = monthly_groups()
+    expected = stats.f_oneway(*groups)
+
+    result = one_way_anova(*moments(groups))
+
+    assert result['f_statistic'] == pytest.approx(expected.statistic, rel=1e-9)
+    assert result['p_value'] == pytest.approx(expected.pvalue, rel=1e-7)
+    assert result['df_between'] == 11
+    assert result['df_within'] == sum(len(g) for g in groups) - 12
+
+
+def test_welch_anova_matches_scipy():
+    groups = monthly_groups(seed=1)
+    expected = stats.f_oneway(*groups, equal_var=False)
+
+    result = welch_anova(*moments(groups))
+
+    assert result['f_statistic'] == pytest.approx(expected.statistic, rel=1e-9)
+    assert result['p_value'] == pytest.approx(expected.pvalue, rel=1e-7)
+
+
+def test_empty_groups_are_ignored():
+    groups = monthly_groups()
+    counts, sums, sums_sq = moments(groups)
+    expected = one_way_anova(counts, sums, sums_sq)
+
+    result = one_way_anova(counts + [0], sums + [0.0], sums_sq + [0.0])
+
+    assert result['f_statistic'] == pytest.approx(expected['f_statistic'], rel=1e-12)
+
+
+def test_single_group_has_no_test():
+    assert np.isnan(one_way_anova([10], [40.0], [170.0])['p_value'])
+    assert np.isnan(welch_anova([10], [40.0], [170.0])['p_value'])
+
+
+def test_anova_by_group_runs_every_series():
+    rows = []
+    for style, seed in (('Stout', 0), ('Witbier', 1)):
+        for month, group in enumerate(monthly_groups(seed), start=1):
+            rows.append({'BEER_STYLE': style, 'MONTH': month, 'N': len(group),
+                         'RATING_SUM': group.sum(), 'RATING_SUM_SQ': (group * group).sum()})
+
+    result = anova_by_group(pd.DataFrame(rows), 'BEER_STYLE')
+
+    assert list(result['BEER_STYLE']) == ['Stout', 'Witbier']
+    assert result['p_value'].iloc[1] == pytest.approx(stats.f_oneway(*monthly_groups(1)).pvalue, rel=1e-7)
+    assert result['welch_p_value'].iloc[0] == pytest.approx(
+        stats.f_oneway(*monthly_groups(0), equal_var=False).pvalue, rel=1e-7
+    )
@@ -0,0 +1,23 @@
+from beer_analysis.cache import ResultCache
+from beer_analysis.local.bench import run_scale
+
+
+def test_benchmarked_python_model_recomputes_every_repeat(project_dir, synthetic_data_dir, monkeypatch):
+    lookups = []
+    original = ResultCache.lookup
+
+    def spy(self):
+        cached = original(self)
+        lookups.append((self.model_name, cached is not None))
+        return cached
+
+    monkeypatch.setattr(ResultCache, 'lookup', spy)
+
+    scale = run_scale(project_dir, synthetic_data_dir, ['feature_importance_regression'], repeats=2)
+
+    result = scale['models']['feature_importance_regression']
+    assert result['status'] == 'success'
+    assert len(result['runs']) == 2
+    runs = [hit for name, hit in lookups if name == 'feature_importance_regression']
+    # The untimed setup run plus both repeats, none served from the cache
+    assert runs == [False, False, False]
@@ -0,0 +1,47 @@
+import numpy as np
+
+from beer_analysis.bootstrap import CHUNK_REPLICATES, bootstrap_replicates, bootstrap_settings
+from beer_analysis.regression import GramAccumulator
+
+
+def block_grams(seed=0, n=2_000, n_blocks=64):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(3.5, 0.6, size=(n, 4))
+    y = X @ np.array([0.1, 0.5, 0.05, 0.2]) + rng.normal(0, 0.3, n)
+    return GramAccumulator(4, n_blocks=n_blocks, seed=seed).update(X, y).block_grams
+
+
+def test_block_assignment_is_reproducible_for_a_seed():
+    np.testing.assert_array_equal(block_grams(seed=3), block_grams(seed=3))
+
+
+def test_replicates_are_reproducible_for_a_seed():
+    grams = block_grams()
+
+    first = bootstrap_replicates(grams, replicates=300, seed=7, processes=1)
+    second = bootstrap_replicates(grams, replicates=300, seed=7, processes=1)
+    other = bootstrap_replicates(grams, replicates=300, seed=8, processes=1)
+
+    np.testing.assert_array_equal(first['coefficients'], second['coefficients'])
+    np.testing.assert_array_equal(first['ranks'], second['ranks'])
+    assert not np.array_equal(first['coefficients'], other['coefficients'])
+
+
+def test_replicates_do_not_depend_on_the_process_count():
+    grams = block_grams()
+    replicates = CHUNK_REPLICATES + 50
+
+    serial = bootstrap_replicates(grams, replicates=replicates, seed=7, processes=1)
+    parallel = bootstrap_replicates(grams, replicates=replicates, seed=7, processes=2)
+
+    assert len(serial['r_squared']) == replicates
+    np.testing.assert_array_equal(serial['coefficients'], parallel['coefficients'])
+    np.testing.assert_array_equal(serial['r_squared'], parallel['r_squared'])
+
+
+def test_settings_parse_rendered_config_strings():
+    settings = bootstrap_settings({'bootstrap_replicates': '500', 'bootstrap_seed': 'None', 'bootstrap_blocks': ''})
+
+    assert settings['bootstrap_replicates'] == 500
+    assert settings['seed'] == 0
+    assert settings['processes'] is None
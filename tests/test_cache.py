@@ -0,0 +1,102 @@
+import duckdb
+import pandas as pd
+import pytest
+
+from beer_analysis.cache import ResultCache, cache_settings
+from beer_analysis.local.runtime import LocalSession, LocalThis
+
+
+class FakeDbt:
+    def __init__(self, session, name='seasonality_analysis'):
+        self.session = session
+        self.this = LocalThis('memory', 'analytics', name)
+
+    def ref(self, name):
+        return self.session.table(f"main.{name}")
+
+
+def model(dbt, session):
+    return 'v1'
+
+
+def changed_model(dbt, session):
+    return 'v2'
+
+
+@pytest.fixture
+def session():
+    connection = duckdb.connect()
+    connection.execute(
+        "create table main.seasonality_cube as "
+        "select * from (values (1, 'Stout', 4.25, 10), (2, 'Stout', 3.5, 12)) t(month, beer_style, review_overall_sum, review_overall_count)"
+    )
+    yield LocalSession(connection)
+    connection.close()
+
+
+def run(session, function=model, params=None, output=None):
+    """One model run: the cached relation on a hit, otherwise `output` stored."""
+    dbt = FakeDbt(session)
+    cache = ResultCache(dbt, session, function, ['seasonality_cube'], params=params or {})
+    cached = cache.lookup()
+    if cached is not None:
+        return 'hit', cached.to_pandas()
+    output = pd.DataFrame({'month': [1, 2], 'analysis_date': pd.Timestamp('2020-01-01')}) if output is None else output
+    return 'miss', cache.store(output).to_pandas()
+
+
+def test_unchanged_inputs_hit(session):
+    assert run(session)[0] == 'miss'
+    status, output = run(session)
+
+    assert status == 'hit'
+    assert list(output['MONTH']) == [1, 2]
+    # The reused output is stamped with the time of the hit
+    assert (output['ANALYSIS_DATE'] > pd.Timestamp('2020-01-01')).all()
+
+
+def test_changed_ref_data_misses(session):
+    run(session)
+    session.connection.execute("update main.seasonality_cube set review_overall_sum = 4.0 where month = 1")
+
+    assert run(session)[0] == 'miss'
+
+
+def test_float_noise_below_hash_precision_hits(session):
+    run(session)
+    session.connection.execute("update main.seasonality_cube set review_overall_sum = review_overall_sum + 1e-12")
+
+    assert run(session)[0] == 'hit'
+
+
+def test_changed_code_misses(session):
+    run(session)
+
+    assert run(session, function=changed_model)[0] == 'miss'
+
+
+def test_changed_params_miss(session):
+    run(session, params={'target_styles': ['Stout']})
+
+    assert run(session, params={'target_styles': ['Stout']})[0] == 'hit'
+    assert run(session, params={'target_styles': ['Porter']})[0] == 'miss'
+
+
+def test_disabled_cache_always_recomputes(session):
+    settings = cache_settings('false', None, None)
+    dbt = FakeDbt(session)
+    for _ in range(2):
+        cache = ResultCache(dbt, session, model, ['seasonality_cube'], **settings)
+        assert cache.lookup() is None
+        cache.store(pd.DataFrame({'month': [1]}))
+
+
+def test_entries_beyond_max_entries_are_evicted(session):
+    for styles in (['a'], ['b'], ['c']):
+        dbt = FakeDbt(session)
+        cache = ResultCache(dbt, session, model, ['seasonality_cube'], params={'styles': styles}, max_entries=2)
+        assert cache.lookup() is None
+        cache.store(pd.DataFrame({'month': [1]}))
+
+    registry = session.connection.execute("select count(*) from memory.analytics.SEASONALITY_ANALYSIS__CACHE").fetchone()[0]
+    assert registry == 2
@@ -0,0 +1,86 @@
+import duckdb
+import pandas as pd
+
+from beer_analysis.local.runtime import LocalSession
+from beer_analysis.names import NameIndex
+
+
+def beer_stats(rows):
+    return pd.DataFrame(rows, columns=['beer_key', 'beer_name', 'brewery_name', 'review_count', 'max_review_time'])
+
+
+CATALOGUE = beer_stats([
+    (1, 'Pliny the Elder', 'Russian River Brewing Company', 120, 100),
+    (2, 'Pliny the Younger', 'Russian River Brewing Company', 40, 100),
+    (3, 'Two Hearted Ale', "Bell's Brewery", 90, 100),
+    (4, 'Two Hearted Ale - Nitro', "Bell's Brewery", 5, 100),
+    (5, 'Hefeweissbier', 'Bayerische Staatsbrauerei Weihenstephan', 70, 100),
+])
+
+
+def review_count(index, name, kind):
+    matches = index.lookup(name, kind=kind, k=1, min_similarity=1.0)
+    return int(matches['review_count'].iloc[0])
+
+
+def test_lookup_tolerates_typos():
+    index = NameIndex.from_beer_stats(CATALOGUE)
+
+    matches = index.lookup('plinny the eldr', kind='beer')
+
+    assert matches['name'].iloc[0] == 'Pliny the Elder'
+    assert list(matches['rank']) == list(range(1, len(matches) + 1))
+    assert matches['similarity'].is_monotonic_decreasing
+
+
+def test_complete_ranks_word_prefixes_by_reviews():
+    index = NameIndex.from_beer_stats(CATALOGUE)
+
+    assert list(index.complete('pli', kind='beer')['name']) == ['Pliny the Elder', 'Pliny the Younger']
+    assert list(index.complete('hearted', kind='beer')['name']) == ['Two Hearted Ale', 'Two Hearted Ale - Nitro']
+    assert list(index.complete('weihen', kind='brewery')['name']) == ['Bayerische Staatsbrauerei Weihenstephan']
+
+
+def test_resolve_exact_only_accepts_normalized_equal_names():
+    index = NameIndex.from_beer_stats(CATALOGUE)
+
+    assert index.resolve_exact('PLINY the elder!') == 'Pliny the Elder'
+    assert index.resolve_exact('Two Hearted Ale') == 'Two Hearted Ale'
+    assert index.resolve_exact('Pliny the Eldest') is None
+    assert index.resolve_exact('Elder the Pliny') is None
+    # Fuzzy resolve still guesses, for interactive use
+    assert index.resolve('Pliny the Eldest') == 'Pliny the Elder'
+
+
+def test_add_beer_stats_applies_review_count_deltas():
+    index = NameIndex.from_beer_stats(CATALOGUE)
+    assert review_count(index, 'Russian River Brewing Company', 'brewery') == 160
+
+    # Beer 1 grows from 120 to 150 reviews; beer 6 is new
+    new_names = index.add_beer_stats(beer_stats([
+        (1, 'Pliny the Elder', 'Russian River Brewing Company', 150, 200),
+        (6, 'Blind Pig', 'Russian River Brewing Company', 25, 210),
+    ]))
+
+    assert new_names == 1
+    assert review_count(index, 'Pliny the Elder', 'beer') == 150
+    assert review_count(index, 'Blind Pig', 'beer') == 25
+    assert review_count(index, 'Russian River Brewing Company', 'brewery') == 215
+    assert index.watermark == 210
+
+
+def test_update_from_relation_reads_rows_after_the_watermark():
+    connection = duckdb.connect()
+    connection.register('catalogue', CATALOGUE)
+    connection.execute("create table int_beer_stats as select * from catalogue")
+    relation = LocalSession(connection).table('int_beer_stats')
+    index = NameIndex.from_relation(relation)
+    assert index.watermark == 100
+
+    connection.execute("update int_beer_stats set review_count = 100, max_review_time = 300 where beer_key = 3")
+    connection.execute("insert into int_beer_stats values (7, 'Oberon Ale', 'Bell''s Brewery', 12, 300)")
+
+    assert index.update_from_relation(relation) == 1
+    assert review_count(index, 'Two Hearted Ale', 'beer') == 100
+    assert review_count(index, "Bell's Brewery", 'brewery') == 117
+    assert index.watermark == 300
@@ -0,0 +1,65 @@
+import pyarrow as pa
+
+from beer_analysis.query import ConnectionPool, fetch_arrow
+
+
+class FakeSnowflakeCursor:
+    """Cursor shaped like the Snowflake connector's: result chunks come as pyarrow Tables."""
+
+    def __init__(self, chunks, description):
+        self.chunks = chunks
+        self.description = description
+        self.closed = False
+
+    def execute(self, sql):
+        self.sql = sql
+
+    def fetch_arrow_batches(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSnowflakeConnection:
+    def __init__(self, chunks, description=()):
+        self.cursor_instance = FakeSnowflakeCursor(chunks, description)
+
+    def cursor(self):
+        return self.cursor_instance
+
+
+def test_fetch_arrow_concatenates_snowflake_table_chunks():
+    chunks = [
+        pa.table({'MONTH': [1, 2], 'N': [10, 20]}),
+        pa.table({'MONTH': [3], 'N': [30]}),
+    ]
+    conn = FakeSnowflakeConnection(chunks)
+
+    table = fetch_arrow(conn, 'select 1')
+
+    assert table.num_rows == 3
+    assert table.column('MONTH').to_pylist() == [1, 2, 3]
+    assert conn.cursor_instance.closed
+
+
+def test_fetch_arrow_keeps_column_names_of_empty_snowflake_result():
+    conn = FakeSnowflakeConnection([], description=[('MONTH',), ('N',)])
+
+    table = fetch_arrow(conn, 'select 1')
+
+    assert table.num_rows == 0
+    assert table.column_names == ['MONTH', 'N']
+
+
+def test_pool_close_closes_the_factory():
+    closed = []
+
+    def factory():
+        return FakeSnowflakeConnection([])
+
+    factory.close = lambda: closed.append(True)
+    with ConnectionPool(factory, size=1) as pool:
+        with pool.connection():
+            pass
+    assert closed == [True]
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from beer_analysis.local.runner import LocalRunner
+from beer_analysis.recommend import INDEX_COLUMNS, RecommendationIndex
+
+RECO_MODELS = ['int_reco_highest_overall', 'int_reco_balanced_excellence',
+               'int_reco_statistical_confidence', 'int_reco_style_diversity']
+
+
+@pytest.fixture(scope='module')
+def built(project_dir, synthetic_data_dir):
+    """The int_reco_* SQL outputs and an index over the same int_beer_stats."""
+    runner = LocalRunner(project_dir, synthetic_data_dir)
+    results = runner.run(select=['+' + name for name in RECO_MODELS], verbose=False)
+    assert all(result.status == 'success' for result in results)
+    sql = {name: runner.relation(name).to_pandas() for name in RECO_MODELS}
+    index = RecommendationIndex.from_relation(runner.relation('int_beer_stats'))
+    yield index, sql
+    runner.close()
+
+
+def assert_same_scores(result, expected, columns):
+    """
+    The ranked score columns agree, whatever order tied beers come in.
+
+    The SQL models round scores to 3 decimals.
+    """
+    assert len(result) == len(expected)
+    np.testing.assert_allclose(result[columns].to_numpy(float), expected[columns].to_numpy(float), atol=5e-4 + 1e-9)
+
+
+def test_highest_overall_matches_sql(built):
+    index, sql = built
+    expected = sql['int_reco_highest_overall'].sort_values('OVERALL_RANK')
+
+    result = index.recommend('highest_overall', n=10)
+
+    assert_same_scores(result, expected.rename(columns=str.lower).head(10), ['avg_overall_rating', 'review_count'])
+
+
+def test_balanced_matches_sql(built):
+    index, sql = built
+    expected = sql['int_reco_balanced_excellence'].sort_values('BALANCED_RANK').rename(columns=str.lower)
+
+    result = index.recommend('balanced', n=10)
+
+    assert_same_scores(result, expected.head(10), ['balanced_score', 'min_dimension_score', 'review_count'])
+
+
+def test_confidence_matches_sql(built):
+    index, sql = built
+    expected = sql['int_reco_statistical_confidence'].sort_values('CONFIDENCE_RANK').rename(columns=str.lower)
+
+    result = index.recommend('confidence', n=10)
+
+    assert_same_scores(result, expected.head(10), ['confidence_score', 'review_count'])
+
+
+def test_diversity_matches_sql(built):
+    index, sql = built
+    expected = sql['int_reco_style_diversity'].sort_values('DIVERSITY_RANK').rename(columns=str.lower)
+
+    result = index.recommend('diversity', n=len(index))
+
+    assert list(result['beer_style']) == list(expected['beer_style'])
+    assert_same_scores(result, expected, ['avg_overall_rating', 'review_count'])
+
+
+def test_filtered_query_matches_filtered_sql(built):
+    index, sql = built
+    ranked = sql['int_reco_highest_overall'].sort_values('OVERALL_RANK').rename(columns=str.lower)
+    style = ranked['beer_style'].value_counts().index[0]
+    expected = ranked[(ranked['beer_style'] == style) & ranked['beer_abv'].between(4.0, 7.5)]
+
+    result = index.recommend('highest_overall', n=5, styles=style, abv_min=4.0, abv_max=7.5)
+
+    assert len(expected) > 0
+    assert len(result) == min(5, len(expected))
+    assert (result['beer_style'] == style).all()
+    assert np.all((result['beer_abv'] >= 4.0) & (result['beer_abv'] <= 7.5))
+    assert_same_scores(result, expected.head(5), ['avg_overall_rating', 'review_count'])
+
+
+def test_beers_without_style_are_left_out_of_diversity():
+    rows = []
+    for name, style, overall in [('a', None, 5.0), ('b', 'IPA', 4.0), ('c', 'Stout', 3.5)]:
+        row = dict.fromkeys(INDEX_COLUMNS, 0)
+        row.update(BEER_NAME=name, BREWERY_NAME='x', BEER_STYLE=style, BEER_ABV=5.0,
+                   REVIEW_OVERALL_COUNT=20, REVIEW_OVERALL_SUM=overall * 20)
+        rows.append(row)
+    index = RecommendationIndex.from_beer_stats(pd.DataFrame(rows))
+
+    assert list(index.recommend('diversity', n=5)['beer_name']) == ['b', 'c']
+    assert list(index.recommend('highest_overall', n=5)['beer_name']) == ['a', 'b', 'c']
@@ -0,0 +1,87 @@
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from beer_analysis.regression import FEATURE_COLS, TARGET_COL, GramAccumulator, fit_from_gram
+
+
+def make_ratings(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(3.5, 0.6, size=(n, len(FEATURE_COLS)))
+    y = 0.5 + X @ np.array([0.1, 0.5, 0.05, 0.2]) + rng.normal(0, 0.3, n)
+    return X, y
+
+
+def lstsq_fit(X, y):
+    design = np.column_stack([np.ones(len(y)), X])
+    coefficients, _, _, _ = np.linalg.lstsq(design, y, rcond=None)
+    residuals = y - design @ coefficients
+    mse = residuals @ residuals / (len(y) - design.shape[1])
+    std_errors = np.sqrt(np.diag(mse * np.linalg.inv(design.T @ design)))
+    r_squared = 1 - residuals @ residuals / ((y - y.mean()) @ (y - y.mean()))
+    return coefficients, std_errors, r_squared
+
+
+def record_batch(X, y):
+    columns = {name: X[:, i] for i, name in enumerate(FEATURE_COLS)}
+    columns[TARGET_COL] = y
+    return pa.RecordBatch.from_pydict(columns)
+
+
+def test_fit_from_gram_matches_lstsq():
+    X, y = make_ratings()
+    coefficients, std_errors, r_squared = lstsq_fit(X, y)
+
+    fit = fit_from_gram(GramAccumulator(X.shape[1]).update(X, y).gram)
+
+    np.testing.assert_allclose(fit['coefficients'], coefficients, rtol=1e-9)
+    np.testing.assert_allclose(fit['std_errors'], std_errors, rtol=1e-9)
+    assert fit['r_squared'] == pytest.approx(r_squared, rel=1e-9)
+    assert fit['n'] == len(y)
+
+
+def test_arrow_batches_add_up_to_one_fit():
+    X, y = make_ratings()
+    whole = GramAccumulator(X.shape[1]).update(X, y)
+
+    split = GramAccumulator(X.shape[1])
+    for start, end in [(0, 1), (1, 200), (200, 200), (200, 500)]:
+        split.update_arrow(record_batch(X[start:end], y[start:end]), FEATURE_COLS, TARGET_COL)
+
+    np.testing.assert_allclose(split.gram, whole.gram, rtol=1e-12)
+
+
+def test_merged_accumulators_match_one_pass():
+    X, y = make_ratings()
+    left = GramAccumulator(X.shape[1], n_blocks=8).update(X[:300], y[:300])
+    right = GramAccumulator(X.shape[1], n_blocks=8, seed=1).update(X[300:], y[300:])
+
+    merged = left.merge(right)
+
+    np.testing.assert_allclose(merged.gram, GramAccumulator(X.shape[1]).update(X, y).gram, rtol=1e-12)
+    np.testing.assert_allclose(merged.block_grams.sum(axis=0), merged.gram, rtol=1e-12)
+
+
+def test_arrow_rows_with_nulls_are_dropped():
+    X, y = make_ratings()
+    batch = record_batch(X, y)
+    aroma = batch.column(0).to_pylist()
+    aroma[3] = None
+    aroma[10] = float('nan')
+    batch = pa.RecordBatch.from_arrays([pa.array(aroma)] + batch.columns[1:], names=batch.schema.names)
+    complete = np.ones(len(y), dtype=bool)
+    complete[[3, 10]] = False
+    coefficients, _, _ = lstsq_fit(X[complete], y[complete])
+
+    fit = fit_from_gram(GramAccumulator(X.shape[1]).update_arrow(batch, FEATURE_COLS, TARGET_COL).gram)
+
+    assert fit['n'] == len(y) - 2
+    np.testing.assert_allclose(fit['coefficients'], coefficients, rtol=1e-9)
+
+
+def test_missing_arrow_column_raises():
+    X, y = make_ratings(n=10)
+    batch = record_batch(X, y).drop_columns(['REVIEW_PALATE'])
+
+    with pytest.raises(KeyError, match='REVIEW_PALATE'):
+        GramAccumulator(X.shape[1]).update_arrow(batch, FEATURE_COLS, TARGET_COL)
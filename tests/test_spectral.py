@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from beer_analysis.spectral import SeriesMatrix, adjust_p_values, period_ordinals, spectral_seasonality
+
+
+def monthly_matrix(seed=0, months=120):
+    """A 12-month sinusoid on a trend, and white noise, as monthly rating sums of 100 reviews."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(months)
+    seasonal = 3.8 + 0.002 * t + 0.2 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 0.01, months)
+    noise = 3.8 + rng.normal(0, 0.1, months)
+    labels = ['Stout'] * months + ['Lager'] * months
+    periods = np.concatenate([t, t]) + 360
+    means = np.concatenate([seasonal, noise])
+    return SeriesMatrix.from_aggregates(labels, periods, means * 100, np.full(2 * months, 100.0), total=False)
+
+
+def test_sinusoid_is_found_at_its_period():
+    matrix = monthly_matrix()
+
+    spectrum = spectral_seasonality(matrix, reference_period=12)
+
+    stout = matrix.labels.index('Stout')
+    assert spectrum.top_periods[stout, 0] == pytest.approx(12)
+    assert spectrum.seasonal_strength[stout] > 0.95
+    assert spectrum.reference_strength[stout] > 0.95
+    assert spectrum.p_value[stout] < 1e-20
+    assert spectrum.sufficient[stout]
+
+
+def test_white_noise_is_not_significant():
+    matrix = monthly_matrix()
+
+    spectrum = spectral_seasonality(matrix, reference_period=12)
+
+    lager = matrix.labels.index('Lager')
+    assert spectrum.p_value[lager] > 0.01
+    assert spectrum.reference_strength[lager] < 0.2
+
+
+def test_gaps_below_min_reviews_are_not_series_points():
+    matrix = monthly_matrix()
+    stout = matrix.labels.index('Stout')
+    gaps = np.random.default_rng(1).choice(matrix.n_periods, 15, replace=False)
+    matrix.counts[stout, gaps] = 5
+
+    spectrum = spectral_seasonality(matrix, min_reviews=10, reference_period=12)
+
+    assert spectrum.observed_points[stout] == matrix.n_periods - 15
+    assert spectrum.top_periods[stout, 0] == pytest.approx(12)
+
+
+def test_summary_has_one_row_per_series_and_rank():
+    spectrum = spectral_seasonality(monthly_matrix(), top=2)
+
+    summary = spectrum.summary('monthly', step_days=365.25 / 12)
+
+    assert len(summary) == 4
+    assert list(summary['period_rank']) == [1, 2, 1, 2]
+
+
+def test_benjamini_hochberg_q_values():
+    p_values = np.array([0.01, 0.04, np.nan, 0.03, 0.5])
+
+    q_values = adjust_p_values(p_values)
+
+    np.testing.assert_allclose(q_values, [0.04, 0.04 * 4 / 3, np.nan, 0.04 * 4 / 3, 0.5])
+
+
+def test_period_ordinals():
+    # 1970-01-05 was the first Monday
+    assert list(period_ordinals([0, 3, 4, 10, 11], 'weekly')) == [0, 0, 1, 1, 2]
+    assert list(period_ordinals([0, 31, 59], 'monthly')) == [0, 1, 2]
@@ -0,0 +1,38 @@
+import pyarrow.parquet as pq
+
+from beer_analysis.synthetic import COLUMNS, STYLES, GeneratorConfig, generate
+
+
+def read(paths):
+    return pq.ParquetDataset(paths).read().to_pandas()
+
+
+def test_output_does_not_depend_on_worker_count(tmp_path):
+    config = GeneratorConfig(12_000, chunk_rows=3_000, seed=5)
+
+    serial = read(generate(str(tmp_path / 'serial'), config, workers=1, verbose=False))
+    parallel = read(generate(str(tmp_path / 'parallel'), config, workers=3, verbose=False))
+
+    assert len(serial) == 12_000
+    assert list(serial.columns) == COLUMNS
+    assert serial.equals(parallel)
+
+
+def test_seed_changes_the_output(tmp_path):
+    first = read(generate(str(tmp_path / 'a'), GeneratorConfig(3_000, seed=1), workers=1, verbose=False))
+    second = read(generate(str(tmp_path / 'b'), GeneratorConfig(3_000, seed=2), workers=1, verbose=False))
+
+    assert not first['review_overall'].equals(second['review_overall'])
+
+
+def test_styles_without_a_season_have_no_seasonal_shift(tmp_path):
+    # Without noise and mood a beer's rating only moves with its style's season
+    config = GeneratorConfig(20_000, seed=3, rating_noise=0.0, mood_std=0.0, seasonal_amplitude=0.5)
+    reviews = read(generate(str(tmp_path / 'flat'), config, workers=1, verbose=False))
+    seasons = {style: season for style, _, _, _, season in STYLES}
+    ratings_per_beer = reviews.groupby(['beer_name', 'beer_style'], observed=True)['review_overall'].nunique()
+
+    varying = ratings_per_beer.groupby(level='beer_style', observed=True).max()
+
+    assert all(varying[style] == 1 for style in varying.index if seasons[style] == 0)
+    assert any(varying[style] > 1 for style in varying.index if seasons[style] != 0)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from statsmodels.miscmodels.ordinal_model import OrderedModel
+
+from beer_analysis.regression import FEATURE_COLS
+from beer_analysis.tuples import fit_ordinal_logit, interaction_terms, weighted_ols
+
+
+def half_points(values):
+    return np.clip(np.round(values * 2) / 2, 1, 5)
+
+
+def reviews(n=3_000, seed=0):
+    """Row-level half-point ratings: two features and an overall driven by them."""
+    rng = np.random.default_rng(seed)
+    quality = rng.normal(3.7, 0.5, n)
+    X = np.column_stack([half_points(quality + rng.normal(0, 0.4, n)), half_points(quality + rng.normal(0, 0.4, n))])
+    y = half_points(0.3 + 0.35 * X[:, 0] + 0.55 * X[:, 1] + rng.normal(0, 0.35, n))
+    return X, y
+
+
+def compress(X, y):
+    """Distinct (features, overall) tuples with their counts, like rating_tuples."""
+    tuples, counts = np.unique(np.column_stack([X, y]), axis=0, return_counts=True)
+    return tuples[:, :-1], tuples[:, -1], counts.astype(float)
+
+
+def test_weighted_ols_on_tuples_equals_row_level_lstsq():
+    X, y = reviews()
+    design = np.column_stack([np.ones(len(y)), X])
+    expected, _, _, _ = np.linalg.lstsq(design, y, rcond=None)
+
+    fit = weighted_ols(*compress(X, y))
+
+    assert len(compress(X, y)[1]) < len(y) / 10
+    np.testing.assert_allclose(fit['coefficients'], expected, rtol=1e-9)
+    assert fit['n'] == len(y)
+
+
+def test_ordinal_logit_matches_statsmodels():
+    X, y = reviews()
+    reference = OrderedModel(y, X, distr='logit').fit(method='bfgs', maxiter=2_000, gtol=1e-8, disp=False)
+    thresholds = reference.model.transform_threshold_params(reference.params)[1:-1]
+
+    fit = fit_ordinal_logit(*compress(X, y))
+
+    np.testing.assert_allclose(fit['feature_coefficients'], reference.params[:2], rtol=1e-4)
+    np.testing.assert_allclose(fit['thresholds'], thresholds, rtol=1e-4, atol=1e-4)
+    np.testing.assert_allclose(fit['std_errors'], reference.bse[:2], rtol=1e-3)
+    assert fit['log_likelihood'] == pytest.approx(reference.llf, rel=1e-8)
+    assert list(fit['categories']) == sorted(set(y))
+
+
+def test_ordinal_logit_needs_two_categories():
+    X = np.ones((5, 1))
+    with pytest.raises(ValueError):
+        fit_ordinal_logit(X, np.full(5, 4.0), np.ones(5))
+
+
+def test_interaction_terms_are_centered_products():
+    X, y = reviews(n=200)
+    features, y, weights = compress(X, y)
+
+    terms, names = interaction_terms(features, FEATURE_COLS[:2], weights)
+
+    assert names == FEATURE_COLS[:2] + [f"{FEATURE_COLS[0]}:{FEATURE_COLS[1]}"]
+    np.testing.assert_allclose(np.average(terms[:, :2], axis=0, weights=weights), 0, atol=1e-12)
+    np.testing.assert_allclose(terms[:, 2], terms[:, 0] * terms[:, 1])